@@ -0,0 +1,170 @@
+"""Archive of the raw API responses received by the tap, for replays without API access.
+
+Every page is appended as a gzip member of its own to the current segment file,
+and indexed by stream, context and fetch time in the run's index file. Both are
+append-only, so a crashed sync leaves a valid archive of the pages received up
+to the crash, and several processes can archive into the same directory.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import threading
+import time
+import typing as t
+import zlib
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from singer_sdk.helpers.types import Context
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+def archive_context_key(context: Context | None) -> str:
+    """Return the key of a stream context in the archive index."""
+    return json.dumps(context or None, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ResponseArchive:
+    """Append-only archive of response bodies, in gzip segments of about `segment_bytes`."""
+
+    def __init__(self, directory: str | Path, *, segment_bytes: int = DEFAULT_SEGMENT_BYTES) -> None:
+        """Create a new archive, or open an existing one to replay it.
+
+        Args:
+            directory: Directory of the segment and index files.
+            segment_bytes: Size from which a new segment file is started.
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self._run = f"{time.time_ns()}-{os.getpid()}"
+        self._segment: t.BinaryIO | None = None
+        self._segment_count = 0
+        self._index: t.TextIO | None = None
+        self._pages: dict[tuple[str, str], list[dict]] | None = None
+        self._lock = threading.Lock()
+
+    def append(self, stream: str, context: Context | None, content: bytes) -> None:
+        """Archive the body of a response.
+
+        Args:
+            stream: The name of the stream the response belongs to.
+            context: Stream partition or context dictionary of the request.
+            content: The response body.
+        """
+        member = gzip.compress(content, compresslevel=6, mtime=0)
+        with self._lock:
+            segment, index = self._segment, self._index
+            if segment is None or index is None or segment.tell() >= self.segment_bytes:
+                segment, index = self._start_segment()
+            offset = segment.tell()
+            segment.write(member)
+            segment.flush()
+            entry = {
+                "stream": stream,
+                "context": archive_context_key(context),
+                "segment": Path(segment.name).name,
+                "offset": offset,
+                "size": len(member),
+                "fetched_at": time.time(),
+            }
+            index.write(json.dumps(entry) + "\n")
+            index.flush()
+
+    def _start_segment(self) -> tuple[t.BinaryIO, t.TextIO]:
+        if self._segment is not None:
+            self._segment.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segment_count += 1
+        self._segment = (self.directory / f"{self._run}-{self._segment_count:05d}.gz").open("ab")
+        if self._index is None:
+            self._index = (self.directory / f"index-{self._run}.jsonl").open("a", encoding="utf-8")
+        return self._segment, self._index
+
+    def close(self) -> None:
+        """Close the current segment and index files."""
+        with self._lock:
+            for file in (self._segment, self._index):
+                if file is not None:
+                    file.close()
+            self._segment = self._index = None
+
+    def pages(
+        self,
+        stream: str,
+        context: Context | None,
+        *,
+        run: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> Iterator[bytes]:
+        """Yield the archived response bodies of a stream context, in the order they were fetched.
+
+        Args:
+            stream: The name of the stream.
+            context: Stream partition or context dictionary.
+            run: Only yield the pages of this run, see `runs`.
+            since: Skip pages fetched before this Unix time.
+            until: Skip pages fetched after this Unix time.
+
+        Yields:
+            The response bodies.
+        """
+        for entry in self._load_index().get((stream, archive_context_key(context)), []):
+            if (
+                (run is not None and entry["run"] != run)
+                or (since is not None and entry["fetched_at"] < since)
+                or (until is not None and entry["fetched_at"] > until)
+            ):
+                continue
+            yield self._read(entry)
+
+    def stream_pages(self, stream: str) -> Iterator[bytes]:
+        """Yield the archived response bodies of a stream, for all contexts.
+
+        Args:
+            stream: The name of the stream.
+
+        Yields:
+            The response bodies.
+        """
+        for (name, _), entries in self._load_index().items():
+            if name == stream:
+                for entry in entries:
+                    yield self._read(entry)
+
+    def streams(self) -> list[str]:
+        """Return the names of the streams with archived pages."""
+        return sorted({name for name, _ in self._load_index()})
+
+    def runs(self) -> list[str]:
+        """Return the ids of the archived runs, from the first to the last one started."""
+        started: dict[str, float] = {}
+        for entries in self._load_index().values():
+            for entry in entries:
+                started[entry["run"]] = min(entry["fetched_at"], started.get(entry["run"], entry["fetched_at"]))
+        return sorted(started, key=started.__getitem__)
+
+    def _read(self, entry: dict) -> bytes:
+        with (self.directory / entry["segment"]).open("rb") as segment:
+            segment.seek(entry["offset"])
+            return zlib.decompress(segment.read(entry["size"]), wbits=31)
+
+    def _load_index(self) -> dict[tuple[str, str], list[dict]]:
+        with self._lock:
+            if self._pages is None:
+                entries: list[dict] = []
+                for path in sorted(self.directory.glob("index-*.jsonl")):
+                    run = path.stem[len("index-") :]
+                    with path.open(encoding="utf-8") as index:
+                        # A crash may leave a partial last line.
+                        entries.extend({**json.loads(line), "run": run} for line in index if line.endswith("\n"))
+                self._pages = {}
+                for entry in sorted(entries, key=lambda entry: entry["fetched_at"]):
+                    self._pages.setdefault((entry["stream"], entry["context"]), []).append(entry)
+            return self._pages
@@ -0,0 +1,239 @@
+"""Parquet batch encoding typed from the stream schemas."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+from uuid import uuid4
+
+from singer_sdk.batch import BaseBatcher
+
+if t.TYPE_CHECKING:
+    import pyarrow as pa
+    from singer_sdk.helpers._batch import BatchConfig
+
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+Converter = t.Callable[[t.Any], t.Any]
+
+
+def _non_null_types(node: dict) -> list[str]:
+    """Return the JSON schema types of a node, excluding null."""
+    if "anyOf" in node:
+        types: list[str] = []
+        for option in node["anyOf"]:
+            types.extend(_non_null_types(option))
+        return types
+    node_type = node.get("type", [])
+    if isinstance(node_type, str):
+        node_type = [node_type]
+    return [node_type_ for node_type_ in node_type if node_type_ != "null"]
+
+
+def _to_json_string(value: t.Any) -> str | None:  # noqa: ANN401
+    """Encode values without a fixed shape as JSON strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, default=str)
+
+
+def _to_string(value: t.Any) -> str | None:  # noqa: ANN401
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+def _to_int(value: t.Any) -> int | None:  # noqa: ANN401
+    return None if value is None else int(value)
+
+
+def _to_float(value: t.Any) -> float | None:  # noqa: ANN401
+    return None if value is None else float(value)
+
+
+def _to_bool(value: t.Any) -> bool | None:  # noqa: ANN401
+    return None if value is None else bool(value)
+
+
+def _struct_type_for(properties: dict) -> tuple[pa.DataType, Converter]:
+    import pyarrow as pa  # noqa: PLC0415
+
+    fields = []
+    converters: list[tuple[str, Converter]] = []
+    for name, child in properties.items():
+        child_type, child_converter = arrow_type_for(child)
+        fields.append(pa.field(name, child_type))
+        converters.append((name, child_converter))
+
+    def convert_object(value: t.Any) -> dict | None:  # noqa: ANN401
+        if not isinstance(value, dict):
+            return None
+        return {name: converter(value.get(name)) for name, converter in converters}
+
+    return pa.struct(fields), convert_object
+
+
+def _list_type_for(items: dict) -> tuple[pa.DataType, Converter]:
+    import pyarrow as pa  # noqa: PLC0415
+
+    item_type, item_converter = arrow_type_for(items) if items else (pa.string(), _to_json_string)
+
+    def convert_array(value: t.Any) -> list | None:  # noqa: ANN401
+        if not isinstance(value, list):
+            return None
+        return [item_converter(item) for item in value]
+
+    return pa.list_(item_type), convert_array
+
+
+def arrow_type_for(node: dict) -> tuple[pa.DataType, Converter]:
+    """Map a JSON schema node to an Arrow type and a value converter.
+
+    Objects with declared properties become structs and arrays become lists.
+    Nodes without a single concrete type (untyped objects, unions) are stored as
+    JSON strings so no data is lost.
+
+    Args:
+        node: A JSON schema node.
+
+    Returns:
+        A tuple of the Arrow type and a callable converting raw values to it.
+    """
+    import pyarrow as pa  # noqa: PLC0415
+
+    types = _non_null_types(node)
+    if len(types) != 1:
+        return pa.string(), _to_json_string
+
+    node_type = types[0]
+    if node_type == "object":
+        if not node.get("properties"):
+            return pa.string(), _to_json_string
+        return _struct_type_for(node["properties"])
+    if node_type == "array":
+        return _list_type_for(node.get("items") or {})
+
+    scalar_types: dict[str, tuple[pa.DataType, Converter]] = {
+        "string": (pa.string(), _to_string),
+        "integer": (pa.int64(), _to_int),
+        "number": (pa.float64(), _to_float),
+        "boolean": (pa.bool_(), _to_bool),
+    }
+    return scalar_types.get(node_type, (pa.string(), _to_json_string))
+
+
+class _ColumnBuffer:
+    """Accumulates converted values column by column for one row group."""
+
+    def __init__(self, schema: dict) -> None:
+        import pyarrow as pa  # noqa: PLC0415
+
+        fields = []
+        self._converters: list[tuple[str, Converter]] = []
+        for name, node in schema.get("properties", {}).items():
+            arrow_type, converter = arrow_type_for(node)
+            fields.append(pa.field(name, arrow_type))
+            self._converters.append((name, converter))
+        self.arrow_schema = pa.schema(fields)
+        self._columns: list[list[t.Any]] = [[] for _ in self._converters]
+        self.num_rows = 0
+
+    def append(self, record: dict) -> None:
+        """Convert a record and append its values to the column buffers."""
+        for column, (name, converter) in zip(self._columns, self._converters):
+            column.append(converter(record.get(name)))
+        self.num_rows += 1
+
+    def flush(self) -> pa.RecordBatch:
+        """Return the buffered rows as a record batch and reset the buffers."""
+        import pyarrow as pa  # noqa: PLC0415
+
+        arrays = [pa.array(column, type=field.type) for column, field in zip(self._columns, self.arrow_schema)]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.arrow_schema)
+        self._columns = [[] for _ in self._converters]
+        self.num_rows = 0
+        return batch
+
+
+class IntercomParquetBatcher(BaseBatcher):
+    """Parquet batcher with Arrow column types derived from the stream schema.
+
+    Records are converted into per-column buffers as they arrive and written out
+    one row group at a time, so at most `row_group_size` rows are held in memory.
+    A new file is started every `batch_size` records.
+    """
+
+    def __init__(
+        self,
+        tap_name: str,
+        stream_name: str,
+        batch_config: BatchConfig,
+        *,
+        schema: dict,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            tap_name: The name of the tap.
+            stream_name: The name of the stream.
+            batch_config: The batch configuration.
+            schema: The JSON schema of the records to encode.
+            row_group_size: The max number of rows per Parquet row group.
+        """
+        super().__init__(tap_name, stream_name, batch_config)
+        self.schema = schema
+        self.row_group_size = max(1, min(row_group_size, self.batch_config.batch_size))
+
+    def get_batches(self, records: t.Iterable[dict]) -> t.Iterator[list[str]]:
+        """Yield manifest of batches.
+
+        Args:
+            records: The records to batch.
+
+        Yields:
+            A list of file paths (called a manifest).
+        """
+        import pyarrow.parquet as pq  # noqa: PLC0415
+
+        sync_id = f"{self.tap_name}--{self.stream_name}-{uuid4()}"
+        prefix = self.batch_config.storage.prefix or ""
+        compression = self.batch_config.encoding.compression
+        storage = self.batch_config.storage
+        records = iter(records)
+        buffer = _ColumnBuffer(self.schema)
+
+        file_index = 0
+        exhausted = False
+        while not exhausted:
+            first_record = next(records, None)
+            if first_record is None:
+                break
+            file_index += 1
+            filename = f"{prefix}{sync_id}={file_index}.parquet"
+            if compression == "gzip":
+                filename = f"{filename}.gz"
+
+            with (
+                storage.open(filename, "wb") as f,
+                pq.ParquetWriter(f, buffer.arrow_schema, compression=compression or "snappy") as writer,
+            ):
+                buffer.append(first_record)
+                rows_in_file = 1
+                while rows_in_file < self.batch_config.batch_size:
+                    record = next(records, None)
+                    if record is None:
+                        exhausted = True
+                        break
+                    buffer.append(record)
+                    rows_in_file += 1
+                    if buffer.num_rows >= self.row_group_size:
+                        writer.write_batch(buffer.flush())
+                if buffer.num_rows:
+                    writer.write_batch(buffer.flush())
+
+            yield [storage.get_url(filename)]
@@ -0,0 +1,145 @@
+"""Size limits on the `body` of conversation parts.
+
+Bodies above the limit can be truncated, replaced by their hash, or spilled to
+gzip side files and replaced by a reference. Every spilled body is a gzip member
+of its own, appended to the file, so the files stay readable if a sync crashes
+and a single body can be read from its offset without decompressing the rest.
+"""
+
+from __future__ import annotations
+
+import enum
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+
+DEFAULT_MAX_BODY_BYTES = 64 * 1024
+
+
+class BodyMode(str, enum.Enum):
+    """What to do with bodies above the size limit."""
+
+    KEEP = "keep"
+    TRUNCATE = "truncate"
+    HASH = "hash"
+    SPILL = "spill"
+
+
+class BodySpillFile:
+    """Append-only gzip side file of the bodies dropped from records."""
+
+    def __init__(self, directory: str | Path, name: str = "conversation_parts") -> None:
+        """Create a new side file, named after the stream, the sync's start time and process.
+
+        Args:
+            directory: Directory of the side files.
+            name: Prefix of the file name.
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / f"{name}-bodies-{int(time.time())}-{os.getpid()}.jsonl.gz"
+        self._lock = threading.Lock()
+
+    def write(self, record: dict, body: str) -> str:
+        """Append a body to the file.
+
+        Args:
+            record: The record the body belongs to.
+            body: The body.
+
+        Returns:
+            The reference of the body: the file name and the offset of its gzip member.
+        """
+        line = json.dumps({"id": record.get("id"), "conversation_id": record.get("conversation_id"), "body": body})
+        member = gzip.compress(line.encode() + b"\n", mtime=0)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with self.path.open("ab") as file:
+                offset = file.tell()
+                file.write(member)
+        return f"{self.path.name}:{offset}"
+
+
+def read_spilled_body(directory: str | Path, ref: str) -> str:
+    """Return a body spilled to a side file.
+
+    Args:
+        directory: Directory of the side files.
+        ref: The `body_ref` of the record.
+
+    Returns:
+        The body.
+    """
+    name, offset = ref.rsplit(":", 1)
+    with (Path(directory) / name).open("rb") as file:
+        file.seek(int(offset))
+        decompressor = zlib.decompressobj(wbits=31)
+        data = b""
+        while not decompressor.eof:
+            chunk = file.read(64 * 1024)
+            if not chunk:
+                break
+            data += decompressor.decompress(chunk)
+    return json.loads(data)["body"]
+
+
+class BodyLimiter:
+    """Applies the size limit to the `body` of records.
+
+    Records whose body was changed get the SHA-256 and the UTF-8 length of the
+    original body, so changes can still be detected downstream.
+    """
+
+    def __init__(
+        self,
+        mode: BodyMode = BodyMode.KEEP,
+        max_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        spill: BodySpillFile | None = None,
+    ) -> None:
+        """Create a new limiter.
+
+        Args:
+            mode: What to do with bodies above the limit.
+            max_bytes: The limit, in UTF-8 bytes.
+            spill: The side file, required to spill bodies.
+
+        Raises:
+            ValueError: If bodies are spilled without side file.
+        """
+        if mode == BodyMode.SPILL and spill is None:
+            msg = "Spilling bodies requires a side file."
+            raise ValueError(msg)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.spill = spill
+
+    def apply(self, record: dict) -> dict:
+        """Limit the size of a record's body.
+
+        Args:
+            record: The record, changed in place.
+
+        Returns:
+            The same record.
+        """
+        body = record.get("body")
+        if self.mode == BodyMode.KEEP or not body or len(body) * 4 <= self.max_bytes:
+            # No UTF-8 character takes more than 4 bytes, so short bodies need no encoding.
+            return record
+        encoded = body.encode()
+        if len(encoded) <= self.max_bytes:
+            return record
+
+        record["body_sha256"] = hashlib.sha256(encoded).hexdigest()
+        record["body_length"] = len(encoded)
+        if self.mode == BodyMode.TRUNCATE:
+            record["body"] = encoded[: self.max_bytes].decode(errors="ignore")
+        else:
+            record["body"] = None
+            if self.mode == BodyMode.SPILL and self.spill is not None:
+                record["body_ref"] = self.spill.write(record, body)
+        return record
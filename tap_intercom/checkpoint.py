@@ -0,0 +1,57 @@
+"""Policy deciding when a stream emits a STATE message."""
+
+from __future__ import annotations
+
+import time
+
+DEFAULT_CHECKPOINT_RECORDS = 10000
+
+
+class CheckpointPolicy:
+    """Checkpoint every `records` records, every `seconds` seconds or every `pages` pages.
+
+    Whichever limit is reached first triggers a checkpoint, and all counters start
+    over once state has been written. A limit of None is never reached.
+    """
+
+    def __init__(
+        self,
+        *,
+        records: int | None = DEFAULT_CHECKPOINT_RECORDS,
+        seconds: float | None = None,
+        pages: int | None = None,
+    ) -> None:
+        """Create a new policy.
+
+        Args:
+            records: Records processed between checkpoints.
+            seconds: Seconds between checkpoints.
+            pages: Pages requested between checkpoints.
+        """
+        self.records = records
+        self.seconds = seconds
+        self.pages = pages
+        self.reset()
+
+    def reset(self) -> None:
+        """Start counting from the last checkpoint."""
+        self._records = 0
+        self._pages = 0
+        self._checkpointed_at = time.monotonic()
+
+    def record_done(self) -> None:
+        """Count a processed record."""
+        self._records += 1
+
+    def page_done(self) -> None:
+        """Count a requested page."""
+        self._pages += 1
+
+    @property
+    def due(self) -> bool:
+        """Return whether a checkpoint is due."""
+        return (
+            (self.records is not None and self._records >= self.records)
+            or (self.pages is not None and self._pages >= self.pages)
+            or (self.seconds is not None and time.monotonic() - self._checkpointed_at >= self.seconds)
+        )
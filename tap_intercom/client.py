@@ -2,16 +2,56 @@
 
 from __future__ import annotations
 
+import contextlib
+import datetime as dt
+import hashlib
+import json
 import logging
+import sys
+import threading
 import time
 import typing as t
+from collections import Counter, deque
+from functools import cached_property
+from http import HTTPStatus
+from importlib import resources
 
+import backoff
+import requests
+from singer_sdk import SchemaDirectory, StreamSchema, metrics
 from singer_sdk.authenticators import BearerTokenAuthenticator
-from singer_sdk.pagination import BaseHATEOASPaginator, JSONPathPaginator
+from singer_sdk.exceptions import ConfigValidationError, RetriableAPIError
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+from singer_sdk.mapper import SameRecordTransform
+from singer_sdk.pagination import BaseHATEOASPaginator, JSONPathPaginator, SinglePagePaginator
+from singer_sdk.singerlib import ActivateVersionMessage, RecordMessage
 from singer_sdk.streams import RESTStream
 
+from tap_intercom.archive import archive_context_key
+from tap_intercom.batch import DEFAULT_ROW_GROUP_SIZE, IntercomParquetBatcher
+from tap_intercom.checkpoint import DEFAULT_CHECKPOINT_RECORDS, CheckpointPolicy
+from tap_intercom.deadline import RunDeadlineReachedError
+from tap_intercom.dedupe import DEFAULT_MAX_ENTRIES, DedupeIndex, dedupe_index_path
+from tap_intercom.latency import HedgedSender, HedgeSkippedError, LatencyTracker, timed
+from tap_intercom.passthrough import RawRecord, get_raw_decoder
+from tap_intercom.pipeline import ReadAhead
+from tap_intercom.progress import ProgressMetric, SearchProgress
+from tap_intercom.ratelimit import ConcurrencyMetric
+from tap_intercom.retry import RETRY_MAX_SECONDS, CircuitBreaker, decorrelated_jitter, retry_wait
+from tap_intercom.sharding import shard_of, shard_range
+from tap_intercom.snapshot import RecordSnapshot, snapshot_path
+
 if t.TYPE_CHECKING:
-    import requests
+    from concurrent.futures import Future
+
+    from singer_sdk.helpers._batch import BaseBatchFileEncoding, BatchConfig
+    from singer_sdk.helpers.types import Context
+
+    from tap_intercom.archive import ResponseArchive
+    from tap_intercom.ratelimit import AIMDLimiter
+    from tap_intercom.tap import TapIntercom
+
+SCHEMAS_DIR = SchemaDirectory(resources.files(__package__) / "json_schemas")
 
 T = t.TypeVar("T")
 TPageToken = t.TypeVar("TPageToken")
@@ -19,21 +59,338 @@ TPageToken = t.TypeVar("TPageToken")
 LOGGER = logging.getLogger(__name__)
 
 
+WORKSPACE_READ_AHEAD_RECORDS = 1000
+
+
+class IntercomStreamSchema(StreamSchema):
+    """Stream schema descriptor adding `workspace_id` and `_sdc_deleted_at` when needed."""
+
+    def get_stream_schema(self, stream: IntercomStream, stream_class: type[IntercomStream]) -> dict:  # type: ignore[override]
+        """Return the stream schema, with a `workspace_id` property if `workspaces` is set.
+
+        Streams emitting tombstones for deleted records also get `_sdc_deleted_at`.
+
+        Args:
+            stream: The stream instance to get the schema for.
+            stream_class: The stream class.
+
+        Returns:
+            A JSON schema dictionary.
+        """
+        schema = super().get_stream_schema(stream, stream_class)
+        if stream is None:
+            return schema
+        # Cached on the instance, the schema is read for every record.
+        extended_schema = stream.__dict__.get("_extended_schema")
+        if extended_schema is None:
+            properties = dict(schema["properties"])
+            if stream.config.get("workspaces"):
+                properties = {"workspace_id": {"type": "string"}, **properties}
+            if (
+                stream.snapshot_diff
+                and stream.config.get("snapshot_diff_dir")
+                and stream.config.get("snapshot_diff_tombstones")
+            ):
+                properties["_sdc_deleted_at"] = {"type": ["string", "null"], "format": "date-time"}
+            extended_schema = schema if properties == schema["properties"] else {**schema, "properties": properties}
+            stream.__dict__["_extended_schema"] = extended_schema
+        return extended_schema
+
+
 class IntercomStream(RESTStream):
     """Intercom stream class."""
 
     primary_keys: t.ClassVar[list[str]] = ["id"]
     records_jsonpath = "$.data[*]"
+    # Whether slow requests can be hedged when `hedge_requests` is enabled.
+    hedge_requests = False
+    # Whether requests go through the adaptive concurrency limiter, and child
+    # records are fetched ahead, when `max_concurrent_requests` is above 1.
+    adaptive_concurrency = False
+    # Whether records can be written as the raw JSON the API sent when `raw_passthrough`
+    # is enabled. Only for unpaginated endpoints whose records need no post-processing.
+    raw_passthrough = False
+    # Whether only new and changed records are emitted when `snapshot_diff_dir` is set.
+    # Only for small full-table streams, whose records' hashes are all kept in a file.
+    snapshot_diff = False
+    # Loaded from the precompiled `json_schemas/<stream name>.json` on first use.
+    schema = IntercomStreamSchema(SCHEMAS_DIR)
+    # STATE messages are written according to `checkpoint_policy` instead.
+    STATE_MSG_FREQUENCY = sys.maxsize
+    # Sorted streams may still go back slightly, e.g. after a search restart. The
+    # bookmark then goes back too, which is safe, rather than failing the sync.
+    check_sorted = False
+
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the stream."""
+        super().__init__(*args, **kwargs)
+        if self.config.get("workspaces"):
+            self.primary_keys = ["workspace_id", *self.primary_keys]  # type: ignore[misc]
+        if self.observed:
+            # Streams override these, so they are traced per instance rather than here.
+            self.parse_response = self._traced_parse_response(self.parse_response)  # type: ignore[method-assign,assignment]
+            self.post_process = self._traced_post_process(self.post_process)  # type: ignore[method-assign,assignment]
+
+    @property
+    def tap(self) -> TapIntercom:
+        """Return the tap this stream belongs to."""
+        return t.cast("TapIntercom", self._tap)
+
+    @cached_property
+    def observed(self) -> bool:
+        """Return whether pipeline stages are traced or memory profiled."""
+        return bool(self.config.get("trace_file") or self.config.get("memory_profile_file"))
+
+    def span(self, name: str, **attributes: t.Any) -> t.ContextManager[dict]:
+        """Trace the block as a span of this stream, and profile its memory, if enabled.
+
+        Args:
+            name: Name of the span within the stream, e.g. `request`.
+            attributes: Attributes of the span.
+
+        Returns:
+            A context manager yielding the attributes, which the block can add to.
+        """
+        if not self.observed:
+            return contextlib.nullcontext(attributes)
+        return self._observe(name, attributes)
+
+    @contextlib.contextmanager
+    def _observe(self, name: str, attributes: dict) -> t.Iterator[dict]:
+        tracer, profiler = self.tap.tracer, self.tap.memory_profiler
+        try:
+            if tracer is None:
+                yield attributes
+            else:
+                with tracer.span(f"{self.name}.{name}", self.name, **attributes) as traced:
+                    yield traced
+        finally:
+            if profiler is not None:
+                profiler.stage_done(self.name, name)
+
+    def _traced_parse_response(
+        self,
+        parse_response: t.Callable[[requests.Response], t.Iterable[dict]],
+    ) -> t.Callable[[requests.Response], list[dict]]:
+        def traced(response: requests.Response) -> list[dict]:
+            with self.span("decode", bytes=len(response.content)) as attributes:
+                records = list(parse_response(response))
+                attributes["records"] = len(records)
+            return records
+
+        return traced
+
+    def _traced_post_process(
+        self,
+        post_process: t.Callable[[dict, Context | None], dict | None],
+    ) -> t.Callable[[dict, Context | None], dict | None]:
+        def traced(row: dict, context: Context | None = None) -> dict | None:
+            with self.span("post_process"):
+                return post_process(row, context)
+
+        return traced
 
     @property
     def url_base(self) -> str:
         """Return the API URL root, configurable via tap settings."""
-        return "https://api.intercom.io"
+        return self.config.get("api_url", "https://api.intercom.io").rstrip("/")
 
     @property
     def authenticator(self) -> BearerTokenAuthenticator:
         """Return the authenticator."""
-        return BearerTokenAuthenticator(token=self.config["access_token"])
+        return BearerTokenAuthenticator(token=self.config.get("access_token") or "")
+
+    @property
+    def partitions(self) -> list[dict] | None:
+        """Return one partition per workspace for top-level streams, if `workspaces` is set."""
+        if self.tap.workspaces and not self.parent_stream_type:
+            return [{"workspace_id": workspace_id} for workspace_id in self.tap.workspaces]
+        return super().partitions
+
+    def get_workspace(self, context: Context | None) -> dict | None:
+        """Return the workspace a context belongs to, if extracting several workspaces.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The workspace config, or None.
+        """
+        workspace_id = (context or {}).get("workspace_id")
+        return None if workspace_id is None else self.tap.workspaces[workspace_id]
+
+    def get_url_base(self, context: Context | None) -> str:
+        """Return the API URL root of the context's workspace.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The API URL root.
+        """
+        workspace = self.get_workspace(context)
+        if workspace and workspace.get("api_url"):
+            return workspace["api_url"].rstrip("/")
+        return self.url_base
+
+    def get_url(self, context: Context | None) -> str:
+        """Return the stream entity URL, in the context's workspace.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The URL.
+        """
+        return self.get_url_base(context) + super().get_url(context)[len(self.url_base) :]
+
+    def authorize(self, request: requests.PreparedRequest, context: Context | None) -> requests.PreparedRequest:
+        """Authenticate a request with the access token of the context's workspace.
+
+        Args:
+            request: The request to authenticate.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The same request.
+        """
+        workspace = self.get_workspace(context)
+        if workspace is not None:
+            request.headers["Authorization"] = f"Bearer {workspace['access_token']}"
+        return request
+
+    def _sync_records(
+        self,
+        context: Context | None = None,
+        *,
+        write_messages: bool = True,
+    ) -> t.Generator[dict, t.Any, t.Any]:
+        """Sync records, unless the run does not need this top-level stream synced here.
+
+        A top-level stream already synced in the background is waited for, see
+        `TapIntercom.start_parallel_syncs`, one not started before the run deadline
+        is skipped, and with `estimate_only` its size is only estimated.
+
+        Args:
+            context: Stream partition or context dictionary.
+            write_messages: Whether to write Singer messages.
+
+        Yields:
+            Each record from the source.
+        """
+        if self.parent_stream_type:
+            with self.span("sync", context=context):
+                yield from self.sync_stream_records(context, write_messages=write_messages)
+            return
+
+        tap = self.tap
+        background = tap.in_background_sync
+        try:
+            if not background:
+                tap.start_parallel_syncs(self)
+                if tap.wait_for_parallel_sync(self):
+                    return
+            yield from self._sync_top_level_records(context, write_messages=write_messages)
+        except Exception:
+            if not background:
+                tap.finish_sync()
+            raise
+
+    def _sync_top_level_records(self, context: Context | None, *, write_messages: bool) -> t.Iterator[dict]:
+        if self.tap.deadline_reached:
+            self.logger.info("Skipping stream '%s', the run deadline is reached.", self.name)
+            return
+        if self.config.get("estimate_only"):
+            if self.selected:
+                self.log_record_estimate()
+            return
+        profiler = self.tap.memory_profiler
+        if profiler is not None:
+            profiler.stream_started()
+        with self.span("sync", context=context):
+            yield from self.sync_stream_records(context, write_messages=write_messages)
+        if profiler is not None:
+            profiler.stream_done(self.name, self.tap.state)
+
+    def sync_stream_records(self, context: Context | None, *, write_messages: bool) -> t.Iterator[dict]:
+        """Sync the records of this stream and its child streams, as the SDK does.
+
+        Args:
+            context: Stream partition or context dictionary.
+            write_messages: Whether to write Singer messages.
+
+        Returns:
+            A generator of each record from the source.
+        """
+        return super()._sync_records(context, write_messages=write_messages)
+
+    def log_sync_costs(self) -> None:
+        """Log the sync costs, and once the last stream's are logged, end the sync."""
+        super().log_sync_costs()
+        # The SDK logs the costs of every stream, in order, once all streams are synced.
+        if self is list(self.tap.streams.values())[-1]:
+            self.tap.finish_sync()
+
+    def _sync_children(self, child_context: Context | None) -> None:
+        with self.span("children", context=child_context):
+            super()._sync_children(child_context)
+
+    def _write_record_message(self, record: dict) -> None:
+        if not self.observed:
+            super()._write_record_message(record)
+            return
+        with self.span("write"):
+            super()._write_record_message(record)
+
+    def prepare_request(self, context: Context | None, next_page_token: object) -> requests.PreparedRequest:
+        """Prepare a request, authenticated for the context's workspace.
+
+        Args:
+            context: Stream partition or context dictionary.
+            next_page_token: Token for the next page of data.
+
+        Returns:
+            The prepared request.
+
+        Raises:
+            RunDeadlineReachedError: If this is an incremental stream and the run deadline is reached.
+        """
+        # Incremental streams resume from their bookmark, other streams would start over
+        # and child streams must complete the records already written by their parent.
+        if self.replication_key and self.tap.deadline_reached:
+            raise RunDeadlineReachedError
+        return self.authorize(super().prepare_request(context, next_page_token), context)
+
+    def get_filters(self, context: Context | None) -> list[dict]:
+        """Return the search filters of this stream, from the context's workspace if it has any.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The configured filters.
+        """
+        workspace = self.get_workspace(context)
+        filters = workspace.get("filters") if workspace and workspace.get("filters") is not None else None
+        if filters is None:
+            filters = self.config.get("filters") or {}
+        return filters.get(self.name, [])
+
+    def generate_child_contexts(self, record: dict, context: Context | None) -> t.Iterable[Context | None]:
+        """Generate child contexts, carrying over the workspace of the parent.
+
+        Args:
+            record: Individual record in the stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A child context for each child stream.
+        """
+        workspace_id = (context or {}).get("workspace_id")
+        for child_context in super().generate_child_contexts(record, context):
+            if workspace_id is not None and child_context is not None:
+                child_context = {**child_context, "workspace_id": workspace_id}  # noqa: PLW2901
+            yield child_context
 
     @property
     def http_headers(self) -> dict:
@@ -53,7 +410,236 @@ class IntercomStream(RESTStream):
         result["Intercom-Version"] = "2.14"
         return result
 
-    def get_url_params(self, context: dict | None, next_page_token: object) -> dict:  # noqa: ARG002
+    @cached_property
+    def circuit_breaker(self) -> CircuitBreaker:
+        """Return the circuit breaker of this stream's endpoint template."""
+        return CircuitBreaker(self.path)
+
+    def backoff_wait_generator(self) -> t.Generator[float, None, None]:
+        """Return the wait generator of a request, honoring the API's rate-limit headers.
+
+        Returns:
+            The wait generator.
+        """
+        jitter = decorrelated_jitter()
+        return self.backoff_runtime(value=lambda exception: retry_wait(exception, jitter))
+
+    def request_decorator(self, func: t.Callable) -> t.Callable:
+        """Return a decorator retrying failed requests like the SDK's, for a limited total time.
+
+        Requests are retried up to `backoff_max_tries` times, but no longer than
+        `backoff_max_time` seconds in total: a long `Retry-After` or an open
+        circuit cannot hold up a sync indefinitely.
+
+        Args:
+            func: Function to decorate.
+
+        Returns:
+            A decorated method.
+        """
+        return backoff.on_exception(
+            self.backoff_wait_generator,
+            (
+                ConnectionResetError,
+                RetriableAPIError,
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.ContentDecodingError,
+            ),
+            max_tries=self.backoff_max_tries,
+            max_time=self.backoff_max_time,
+            on_backoff=self.backoff_handler,
+            jitter=self.backoff_jitter,
+        )(func)
+
+    def backoff_max_time(self) -> float:
+        """Return the max number of seconds spent retrying a request, including the waits."""
+        return RETRY_MAX_SECONDS
+
+    def backoff_jitter(self, value: float) -> float:
+        """Return the wait unchanged, jitter is part of `backoff_wait_generator`.
+
+        Args:
+            value: The wait in seconds.
+
+        Returns:
+            The same wait.
+        """
+        return value
+
+    @cached_property
+    def latency(self) -> LatencyTracker:
+        """Return the recent request latencies of this stream's endpoint template."""
+        return LatencyTracker()
+
+    @property
+    def timeout(self) -> float:  # type: ignore[override]
+        """Return the request timeout, adapted to the endpoint's latency if enabled."""
+        timeout = super().timeout
+        if self.config.get("adaptive_timeouts"):
+            return self.latency.timeout(timeout)
+        return timeout
+
+    @cached_property
+    def _request_costs(self) -> Counter:
+        return Counter()
+
+    @cached_property
+    def _request_costs_lock(self) -> threading.Lock:
+        # Hedges and prefetched child records are sent from other threads.
+        return threading.Lock()
+
+    def _send_request(
+        self,
+        prepared_request: requests.PreparedRequest,
+        workspace_id: str | None,
+        *,
+        hedge: bool = False,
+    ) -> requests.Response:
+        """Send a single request once the workspace's concurrency and rate limiters allow it.
+
+        A hedge is skipped instead when the concurrency limit is reached: the slot
+        it would wait for is usually its own primary's.
+        """
+        limiter = self.tap.get_concurrency_limiter(workspace_id) if self.adaptive_concurrency else None
+        if limiter is not None and not limiter.acquire(blocking=not hedge):
+            raise HedgeSkippedError
+        response = None
+        try:
+            rate_limiter = self.tap.get_rate_limiter(workspace_id)
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            with self._request_costs_lock:
+                self._request_costs["requests"] += 1
+                if hedge:
+                    self._request_costs["hedged_requests"] += 1
+            response = self.requests_session.send(
+                prepared_request,
+                timeout=self.timeout,
+                allow_redirects=self.allow_redirects,
+            )
+        finally:
+            if limiter is not None:
+                self._release_concurrency(limiter, response)
+        return response
+
+    def _release_concurrency(self, limiter: AIMDLimiter, response: requests.Response | None) -> None:
+        limit = limiter.release(
+            None if response is None else response.elapsed.total_seconds(),
+            throttled=response is not None and response.status_code == HTTPStatus.TOO_MANY_REQUESTS,
+        )
+        if limit is not None:
+            self._log_metric(
+                metrics.Point(
+                    "gauge",
+                    metric=ConcurrencyMetric.CONCURRENCY_LIMIT,  # type: ignore[arg-type]
+                    value=limit,
+                    tags={metrics.Tag.STREAM: self.name, metrics.Tag.ENDPOINT: self.path},
+                ),
+            )
+
+    @cached_property
+    def _sender(self) -> t.Callable[[requests.PreparedRequest, str | None], requests.Response]:
+        send = timed(self._send_request, self.latency)
+        if not (self.hedge_requests and self.config.get("hedge_requests")):
+            return send
+        # A primary and a hedge for each of the concurrent requests.
+        max_workers = 2 * (self.config.get("max_concurrent_requests") or 1)
+        return HedgedSender(send, self.latency, max_workers=max_workers).send
+
+    def calculate_sync_cost(
+        self,
+        request: requests.PreparedRequest,  # noqa: ARG002
+        response: requests.Response,  # noqa: ARG002
+        context: Context | None,  # noqa: ARG002
+    ) -> dict[str, int]:
+        """Return the requests sent since the last call, including retries and hedges.
+
+        Args:
+            request: The API request that was just sent.
+            response: The response of the request.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The number of `requests` and `hedged_requests`.
+        """
+        with self._request_costs_lock:
+            costs = {
+                "requests": self._request_costs["requests"],
+                "hedged_requests": self._request_costs["hedged_requests"],
+            }
+            self._request_costs.subtract(costs)
+        return costs
+
+    def _request(self, prepared_request: requests.PreparedRequest, context: Context | None) -> requests.Response:
+        """Send a request through the endpoint's circuit breaker.
+
+        Rate-limited responses do not count as failures: the limit is shared by
+        the whole workspace and says nothing about the endpoint's health.
+
+        Args:
+            prepared_request: The request to send.
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The validated response.
+        """
+        with self.span("request", endpoint=self.path, method=prepared_request.method) as attributes:
+            response = self._send_through_breaker(prepared_request, context)
+            attributes["status_code"] = response.status_code
+            attributes["bytes"] = len(response.content)
+        archive = self.tap.response_archive
+        if archive is not None:
+            archive.append(self.name, context, response.content)
+        return response
+
+    def _send_through_breaker(
+        self, prepared_request: requests.PreparedRequest, context: Context | None
+    ) -> requests.Response:
+        workspace_id = (context or {}).get("workspace_id")
+        response = self._call_through_breaker(
+            self.circuit_breaker,
+            lambda: self._sender(prepared_request, workspace_id),
+            prepared_request,
+            context,
+        )
+        self.checkpoint_policy.page_done()
+        return response
+
+    def _call_through_breaker(
+        self,
+        breaker: CircuitBreaker,
+        send: t.Callable[[], requests.Response],
+        prepared_request: requests.PreparedRequest,
+        context: Context | None,
+    ) -> requests.Response:
+        probe = breaker.before_request()
+        try:
+            response = send()
+            self._write_request_duration_log(
+                endpoint=breaker.endpoint,
+                response=response,
+                context=context,
+                extra_tags={"url": prepared_request.path_url} if self._LOG_REQUEST_METRIC_URLS else None,
+            )
+            self.validate_response(response)
+        except RetriableAPIError as e:
+            if e.response is None or e.response.status_code != HTTPStatus.TOO_MANY_REQUESTS:
+                breaker.record_failure()
+            raise
+        except (ConnectionResetError, requests.exceptions.RequestException):
+            breaker.record_failure()
+            raise
+        else:
+            breaker.record_success()
+            return response
+        finally:
+            # A rate-limited or fatal probe says nothing about the endpoint, the next request probes again.
+            if probe:
+                breaker.end_probe()
+
+    def get_url_params(self, context: Context | None, next_page_token: object) -> dict:  # noqa: ARG002
         """Return URL params for the request.
 
         Args:
@@ -70,7 +656,7 @@ class IntercomStream(RESTStream):
 
     def prepare_request_payload(
         self,
-        context: dict | None,
+        context: Context | None,
         next_page_token: object,
     ) -> dict | None:
         """Prepare the data payload for the REST API request.
@@ -88,26 +674,17 @@ class IntercomStream(RESTStream):
         """
         if self.http_method == "POST":
             body = {}
-            start_date = self.get_starting_replication_key_value(context)
-            signpost = self.get_replication_key_signpost(context)
-            end_date = self.config.get("end_date")
+            start_date, upper_bound = self.get_search_window(context, next_page_token)
 
-            # Preserve the existing signpost behavior when end_date is not provided.
-            upper_bound = signpost if end_date is None else int(end_date)
-            if signpost is not None and end_date is not None:
-                upper_bound = min(signpost, int(end_date))
-
-            if start_date or upper_bound or self.config.get("filters", {}).get(self.name):
+            if start_date or upper_bound or self.get_filters(context):
                 body["query"] = {
                     "operator": "AND",
                     "value": [
                         {"field": f["field"], "operator": f["operator"], "value": f["value"]}
-                        for f in self.config.get("filters", {}).get(self.name, [])
+                        for f in self.get_filters(context)
                     ],
                 }
                 if start_date:
-                    if start_date != self.config.get("start_date"):
-                        start_date -= int(self.config["replication_lookback_window_seconds"])
                     body["query"]["value"].append(
                         {
                             "field": self.replication_key,
@@ -126,11 +703,87 @@ class IntercomStream(RESTStream):
                             "value": upper_bound + 1,
                         },
                     )
-            if next_page_token:
-                body["pagination"] = {"per_page": 150, "starting_after": next_page_token}
+            if self.replication_key:
+                # Ascending order lets a search restart from the highest value seen.
+                body["sort"] = {"field": self.replication_key, "order": "ascending"}
+            starting_after, per_page = next_page_token, None
+            if isinstance(next_page_token, SearchPageToken):
+                starting_after, per_page = next_page_token.starting_after, next_page_token.per_page
+            if starting_after:
+                body["pagination"] = {"per_page": per_page or 150, "starting_after": starting_after}
+            elif per_page:
+                body["pagination"] = {"per_page": per_page}
             return body
         return None
 
+    def get_search_window(
+        self, context: Context | None, next_page_token: object = None
+    ) -> tuple[int | None, int | None]:
+        """Return the `updated_at` window to search.
+
+        Args:
+            context: Stream partition or context dictionary.
+            next_page_token: Token of the page to request, if any.
+
+        Returns:
+            The exclusive lower and inclusive upper bound of the window, if any.
+        """
+        start_date = self.get_starting_replication_key_value(context)
+        signpost = self.get_replication_key_signpost(context)
+        end_date = self.config.get("end_date")
+
+        # Preserve the existing signpost behavior when end_date is not provided.
+        upper_bound = signpost if end_date is None else int(end_date)
+        if signpost is not None and end_date is not None:
+            upper_bound = min(signpost, int(end_date))
+
+        if start_date and start_date != self.config.get("start_date"):
+            start_date -= int(self.config["replication_lookback_window_seconds"])
+        if self.shard_count > 1:
+            start_date, upper_bound = self.get_shard_window(start_date, upper_bound)
+        if isinstance(next_page_token, SearchPageToken) and next_page_token.updated_after is not None:
+            # Restarted search after a cursor loop, see IntercomSearchPaginator.
+            start_date = max(start_date or 0, next_page_token.updated_after)
+        return start_date, upper_bound
+
+    @property
+    def shard_count(self) -> int:
+        """Return the number of tap processes the extraction is split across."""
+        return int(self.config.get("shard_count") or 1)
+
+    @property
+    def shard_index(self) -> int:
+        """Return the index of the shard handled by this tap process."""
+        return int(self.config.get("shard_index") or 0)
+
+    def get_shard_window(self, lower_bound: int | None, upper_bound: int | None) -> tuple[int, int]:
+        """Narrow a search window to the `updated_at` range owned by this shard.
+
+        The window is split on `end_date`, which every shard shares, rather than on
+        the signpost, which depends on when each process started. It starts from the
+        bookmark, or `start_date` on a first run: split from 1970, nearly every record
+        would fall into the last shard.
+
+        Args:
+            lower_bound: Exclusive lower bound of the window, if any.
+            upper_bound: Inclusive upper bound of the window.
+
+        Returns:
+            The exclusive lower and inclusive upper bound of this shard's part.
+
+        Raises:
+            ConfigValidationError: If no `end_date` is configured, or neither a bookmark nor `start_date`.
+        """
+        end_date = self.config.get("end_date")
+        if end_date is None:
+            msg = "Sharded extraction requires `end_date`, so that all shards split the same window."
+            raise ConfigValidationError(msg)
+        if lower_bound is None:
+            msg = "Sharded extraction requires `start_date` without a bookmark, or shards would split from 1970."
+            raise ConfigValidationError(msg)
+        first, last = shard_range(lower_bound + 1, int(end_date), self.shard_index, self.shard_count)
+        return first - 1, min(last, upper_bound) if upper_bound else last
+
     def compare_start_date(self, value: str, start_date_value: str) -> str:
         """Compare a bookmark value to a start date and return the most recent value.
 
@@ -145,7 +798,7 @@ class IntercomStream(RESTStream):
 
     def get_replication_key_signpost(
         self,
-        context: dict | None,  # noqa: ARG002
+        context: Context | None,  # noqa: ARG002
     ) -> int | None:
         """Overrides the signpost to be the Unix integer at sync start for incremental streams.
 
@@ -172,7 +825,7 @@ class IntercomStream(RESTStream):
     def post_process(
         self,
         row: dict,
-        context: dict | None = None,  # noqa: ARG002
+        context: Context | None = None,  # noqa: ARG002
     ) -> dict | None:
         """As needed, append or transform raw data to match expected structure.
 
@@ -183,32 +836,654 @@ class IntercomStream(RESTStream):
         Returns:
             The resulting record dict, or `None` if the record should be excluded.
         """
+        if self.owned_by_other_shard(row):
+            # Returning None also skips the record's children.
+            return None
         if row.get("custom_attributes"):
             row["custom_attributes"] = {
                 key.lower().replace(" ", "_"): value for key, value in row["custom_attributes"].items()
             }
         return row
 
-    def get_new_paginator(self) -> JSONPathPaginator:
+    def owned_by_other_shard(self, record: dict) -> bool:
+        """Return whether a full-table record is extracted by another shard.
+
+        Args:
+            record: A top-level record, as read from the API.
+
+        Returns:
+            Whether the record is left to another shard.
+        """
+        return (
+            self.shard_count > 1
+            and not self.replication_key
+            and not self.parent_stream_type
+            and shard_of(record["id"], self.shard_count) != self.shard_index
+        )
+
+    def get_dedupe_index(self, context: Context | None) -> DedupeIndex | None:
+        """Return the index of records emitted by previous runs, if deduplication applies.
+
+        Only incremental streams replaying a lookback window need one.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The dedupe index of the stream partition, or None.
+        """
+        directory = self.config.get("dedupe_index_dir")
+        if not directory or not self.replication_key or not self.config.get("replication_lookback_window_seconds"):
+            return None
+        return DedupeIndex(
+            dedupe_index_path(directory, self.name, context),
+            max_entries=self.config.get("dedupe_index_max_entries") or DEFAULT_MAX_ENTRIES,
+        )
+
+    def get_records(self, context: Context | None) -> t.Iterable[dict]:
+        """Return a generator of record-type dictionary objects.
+
+        Records already emitted by a previous run with the same `updated_at`, as
+        replayed by the lookback window, are skipped before any further processing,
+        and so are full-table records unchanged since the previous run's snapshot.
+        With `max_concurrent_requests`, the child records of upcoming records are
+        fetched ahead in the background. Once the run deadline is reached, records
+        with children are no longer yielded, even if they were already read.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            One item per record.
+        """
+        records = super().get_records(context)
+        index = self.get_dedupe_index(context)
+        if index is not None:
+            records = self._skip_emitted(records, index, context)
+        snapshot = self.get_record_snapshot(context)
+        if snapshot is not None:
+            records = self._emit_changes(records, snapshot, context)
+        if self.tap.get_concurrency_limiter((context or {}).get("workspace_id")) is not None:
+            records = self._prefetch_children(records, context)
+        if self.replication_key and self.is_sorted and self.has_selected_descendents:
+            records = self._stop_at_deadline(records)
+        yield from self.checkpoint_records(records)
+        if self.progress.pages:
+            self.report_progress(self.progress)
+
+    @cached_property
+    def progress(self) -> SearchProgress:
+        """Return the progress of this stream's searches."""
+        return SearchProgress(on_report=self.report_progress)
+
+    def report_progress(self, progress: SearchProgress) -> None:
+        """Log the progress of this stream's searches, as a message and as metrics.
+
+        Args:
+            progress: The progress to report.
+        """
+        pages_per_minute, eta = progress.pages_per_minute, progress.eta_seconds
+        self.logger.info(
+            "Progress of '%s': %d of %d records (%.1f%%), %s pages/min, ETA %s.",
+            self.name,
+            progress.done,
+            progress.total,
+            100 * progress.done / progress.total if progress.total else 100.0,
+            "-" if pages_per_minute is None else f"{pages_per_minute:.1f}",
+            "-" if eta is None else dt.timedelta(seconds=round(eta)),
+        )
+        values = {
+            ProgressMetric.RECORDS_DONE: progress.done,
+            ProgressMetric.RECORDS_TOTAL: progress.total,
+            ProgressMetric.PAGES_PER_MINUTE: pages_per_minute,
+            ProgressMetric.ETA_SECONDS: eta,
+        }
+        for metric, value in values.items():
+            if value is not None:
+                self._log_metric(
+                    metrics.Point(
+                        "gauge",
+                        metric=metric,  # type: ignore[arg-type]
+                        value=value,
+                        tags={metrics.Tag.STREAM: self.name},
+                    )
+                )
+
+    def estimate_record_count(self, context: Context | None) -> int | None:
+        """Return how many records a sync of the context would search, without reading them.
+
+        A single search for one record is sent, and its `total_count` returned.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The number of records matching the search, or None if this is not a search stream.
+        """
+        if self.http_method != "POST":
+            return None
+        self._write_starting_replication_value(context)
+        prepared_request = self.prepare_request(context, SearchPageToken(None, per_page=1))
+        response = self.request_decorator(self._request)(prepared_request, context)
+        return response.json().get("total_count")
+
+    def log_record_estimate(self) -> int | None:
+        """Log how many records a sync of this stream would extract, for `estimate_only`.
+
+        Returns:
+            The number of records over all partitions, or None if this is not a search stream.
+        """
+        total = 0
+        for partition in self.partitions or [{}]:
+            count = self.estimate_record_count(partition or None)
+            if count is None:
+                self.logger.info("Stream '%s' is not a search stream and cannot be estimated.", self.name)
+                return None
+            total += count
+        self.logger.info("Stream '%s' would extract %d records.", self.name, total)
+        return total
+
+    @cached_property
+    def checkpoint_policy(self) -> CheckpointPolicy:
+        """Return the policy deciding when this stream writes a STATE message."""
+        return CheckpointPolicy(
+            records=self.config.get("state_checkpoint_records") or DEFAULT_CHECKPOINT_RECORDS,
+            seconds=self.config.get("state_checkpoint_seconds"),
+            pages=self.config.get("state_checkpoint_pages"),
+        )
+
+    def checkpoint_records(self, records: t.Iterable[dict]) -> t.Iterator[dict]:
+        """Yield records, writing a STATE message whenever the checkpoint policy says so.
+
+        Args:
+            records: The records of the stream.
+
+        Yields:
+            The same records.
+        """
+        if self.config.get("batch_config"):
+            # State must not get ahead of the batch files, the SDK writes it after each batch.
+            yield from records
+            return
+        policy = self.checkpoint_policy
+        for record in records:
+            yield record
+            # The sync only asks for the next record once this one, its bookmark and
+            # its child records are processed.
+            policy.record_done()
+            if policy.due:
+                self._write_state_message()
+                policy.reset()
+
+    def _write_state_message(self) -> None:
+        """Write a STATE message, including any state changed by child streams.
+
+        With `checkpoint_children_with_parent`, child streams leave it to their
+        parent instead of writing state after every parent record.
+        """
+        if self.parent_stream_type and self.config.get("checkpoint_children_with_parent"):
+            return
+        if any(not child._is_state_flushed for child in self.child_streams):  # noqa: SLF001
+            self._is_state_flushed = False
+        super()._write_state_message()
+        if self._is_state_flushed:
+            for child in self.child_streams:
+                child._is_state_flushed = True  # noqa: SLF001
+
+    # With `max_parallel_streams`, other threads write the whole state while this stream
+    # updates its entry: every change to the state holds the tap's state lock.
+
+    def _write_replication_key_signpost(self, context: Context | None, value: t.Any) -> None:  # noqa: ANN401
+        with self.tap.state_lock:
+            super()._write_replication_key_signpost(context, value)
+
+    def _write_starting_replication_value(self, context: Context | None) -> None:
+        with self.tap.state_lock:
+            super()._write_starting_replication_value(context)
+
+    def _increment_stream_state(self, latest_record: dict, *, context: Context | None = None) -> None:
+        with self.tap.state_lock:
+            super()._increment_stream_state(latest_record, context=context)
+
+    def _finalize_state(self, state: dict | None = None) -> None:
+        with self.tap.state_lock:
+            super()._finalize_state(state)
+
+    def _skip_emitted(self, records: t.Iterable[dict], index: DedupeIndex, context: Context | None) -> t.Iterator[dict]:
+        # The index is saved once the records are read, which may be before the target
+        # commits them. Only the records up to the bookmark this run started from are
+        # known to be committed, any record above it is emitted again.
+        committed = self.get_context_state(context).get("replication_key_value")
+        latest = self.get_starting_replication_key_value(context) or 0
+        suppressed = 0
+        for record in records:
+            updated_at = record.get(self.replication_key)
+            if updated_at is not None:
+                if not index.seen(record["id"], updated_at):
+                    index.add(record["id"], updated_at)
+                elif committed is not None and updated_at <= committed:
+                    suppressed += 1
+                    continue
+                latest = max(latest, updated_at)
+            yield record
+
+        index.save(min_updated_at=latest - int(self.config["replication_lookback_window_seconds"]))
+        self.logger.info("Suppressed %d records already emitted by a previous run.", suppressed)
+
+    def get_record_snapshot(self, context: Context | None) -> RecordSnapshot | None:
+        """Return the snapshot of the records emitted by the previous run, if only changes are emitted.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The record snapshot of the stream partition, or None.
+        """
+        directory = self.config.get("snapshot_diff_dir")
+        # ACTIVATE_VERSION messages would make targets delete the unchanged records.
+        if not directory or not self.snapshot_diff or self.emit_activate_version_messages:
+            return None
+        selected = sorted(str(breadcrumb) for breadcrumb, is_selected in self.mask.items() if is_selected)
+        version = json.dumps([self.schema, selected, self.config.get("stream_maps")], sort_keys=True, default=str)
+        return RecordSnapshot(
+            snapshot_path(directory, self.name, context),
+            version=hashlib.blake2b(version.encode(), digest_size=16).hexdigest(),
+            committed=self.get_context_state(context).get("snapshot"),
+        )
+
+    def _emit_changes(
+        self,
+        records: t.Iterable[dict],
+        snapshot: RecordSnapshot,
+        context: Context | None,
+    ) -> t.Iterator[dict]:
+        unchanged = 0
+        for record in records:
+            if snapshot.changed(record):
+                yield record
+            else:
+                unchanged += 1
+        removed = snapshot.removed()
+        if self.config.get("snapshot_diff_tombstones"):
+            deleted_at = dt.datetime.now(dt.timezone.utc).isoformat()
+            for record_id in removed:
+                yield {"id": record_id, "_sdc_deleted_at": deleted_at}
+        snapshot.save()
+        # The next STATE message, written after these records, commits the new snapshot.
+        with self.tap.state_lock:
+            self.get_context_state(context)["snapshot"] = snapshot.run
+        self.logger.info(
+            "Skipped %d records of '%s' unchanged since the previous run, %d records were removed.",
+            unchanged,
+            self.name,
+            len(removed),
+        )
+
+    def _stop_at_deadline(self, records: t.Iterable[dict]) -> t.Iterator[dict]:
+        """Stop yielding records read ahead once the run deadline is reached, before their children are synced.
+
+        Records sharing the replication key value of the last record yielded are
+        still yielded: the next run only searches for records updated after it.
+        """
+        last = None
+        for record in records:
+            value = record[self.replication_key]
+            if value != last and self.tap.deadline_reached:
+                self.logger.info(
+                    "Stopped syncing '%s' at the run deadline, the next run resumes from its bookmark.",
+                    self.name,
+                )
+                return
+            last = value
+            yield record
+
+    def _prefetch_children(self, records: t.Iterable[dict], context: Context | None) -> t.Iterator[dict]:
+        """Fetch the children of the next records in the background while yielding records.
+
+        Records are read up to `max_concurrent_requests` ahead, the number of
+        requests actually in flight is left to the adaptive concurrency limiter.
+        """
+        children = self.prefetched_children
+        if not children:
+            yield from records
+            return
+
+        read_ahead = self.config["max_concurrent_requests"]
+        window: deque[dict] = deque()
+        prefetched: list[tuple[IntercomStream, tuple]] = []
+        try:
+            for record in records:
+                if not self.owned_by_other_shard(record):
+                    for child_context in self.generate_child_contexts(record, context):
+                        if child_context is None:
+                            continue
+                        prefetched.extend((child, child.prefetch(child_context)) for child in children)
+                window.append(record)
+                if len(window) > read_ahead:
+                    yield window.popleft()
+            while window:
+                yield window.popleft()
+        finally:
+            # Drop what was fetched for records that were filtered out, or never synced.
+            for child, key in prefetched:
+                future = child.prefetched.pop(key, None)
+                if future is not None:
+                    future.cancel()
+
+    @property
+    def prefetched_children(self) -> list[IntercomStream]:
+        """Return the selected child streams whose records can be fetched ahead."""
+        return [
+            child
+            for child in self.child_streams
+            if isinstance(child, IntercomStream)
+            and child.adaptive_concurrency
+            and (child.selected or child.has_selected_descendents)
+        ]
+
+    @cached_property
+    def prefetched(self) -> dict[tuple, Future]:
+        """Return the records being fetched ahead, by context."""
+        return {}
+
+    def prefetch(self, context: Context) -> tuple:
+        """Start fetching the records of a context in the background.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Returns:
+            The key of the fetch in `prefetched`.
+        """
+        key = tuple(sorted(context.items()))
+        self.prefetched[key] = self.tap.request_executor.submit(self._request_all_records, context)
+        return key
+
+    def _request_all_records(self, context: Context) -> list[dict]:
+        return list(self.fetch_records(context))
+
+    def request_records(self, context: Context | None) -> t.Iterable[dict]:
+        """Request records from REST endpoint(s), or take them from a background fetch.
+
+        Streams with selected child streams are paged through in a background
+        thread, up to `parent_read_ahead_records` records ahead, so the next pages
+        load while the child records of the current one are synced.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            An item for every record in the response.
+        """
+        future = self.prefetched.pop(tuple(sorted(context.items())), None) if context else None
+        if future is not None:
+            yield from future.result()
+            return
+        reader = self._get_workspace_reader(context)
+        if reader is not None:
+            yield from reader
+            return
+        read_ahead = self.config.get("parent_read_ahead_records")
+        if read_ahead and self.has_selected_descendents:
+            # Page through the parent in the background while child records are synced.
+            yield from ReadAhead(self.fetch_records(context), read_ahead, name=f"{self.name}-pages").start()
+            return
+        yield from self.fetch_records(context)
+
+    def fetch_records(self, context: Context | None) -> t.Iterable[dict]:
+        """Request records from the API, or from the response archive when replaying it.
+
+        Incremental streams stop after the current page once the run deadline is reached.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            An item for every record in the response.
+        """
+        if self.replaying:
+            yield from self.replay_records(context)
+            return
+        try:
+            yield from super().request_records(context)
+        except RunDeadlineReachedError:
+            self.logger.info(
+                "Stopped paging through '%s' at the run deadline, the next run resumes from its bookmark.",
+                self.name,
+            )
+
+    @property
+    def replaying(self) -> bool:
+        """Return whether records are replayed from the response archive instead of requested."""
+        return (self.config.get("archive") or {}).get("mode") == "replay"
+
+    def replay_records(self, context: Context | None) -> t.Iterator[dict]:
+        """Yield the records of the archived responses of a context, in the order they were received.
+
+        Only the pages of one archived run are replayed. The context of a child
+        stream is replayed once, even if its parent record is replayed again.
+
+        Args:
+            context: Stream partition or context dictionary.
+
+        Yields:
+            An item for every record in the archived responses.
+        """
+        if self.parent_stream_type:
+            key = archive_context_key(context)
+            with self._replayed_lock:
+                if key in self._replayed_contexts:
+                    return
+                self._replayed_contexts.add(key)
+        options = self.config["archive"]
+        archive = t.cast("ResponseArchive", self.tap.response_archive)
+        for content in archive.pages(
+            self.name,
+            context,
+            run=self.tap.replay_run,
+            since=options.get("replay_since"),
+            until=options.get("replay_until"),
+        ):
+            response = requests.Response()
+            response.status_code = HTTPStatus.OK
+            response._content = content  # noqa: SLF001
+            yield from self.parse_response(response)
+
+    @cached_property
+    def _replayed_contexts(self) -> set[str]:
+        return set()
+
+    @cached_property
+    def _replayed_lock(self) -> threading.Lock:
+        return threading.Lock()
+
+    @cached_property
+    def _workspace_readers(self) -> dict[str, ReadAhead[dict]]:
+        return {}
+
+    def _get_workspace_reader(self, context: Context | None) -> ReadAhead[dict] | None:
+        """Return the background reader of a workspace's records.
+
+        The SDK syncs partitions one after the other. So that workspaces are
+        extracted concurrently, the first partition to be synced starts reading
+        the records of every workspace in the background, up to
+        `WORKSPACE_READ_AHEAD_RECORDS` ahead of the sync.
+        """
+        if self.parent_stream_type or len(self.tap.workspaces) <= 1 or not context or "workspace_id" not in context:
+            return None
+        if not self._workspace_readers:
+            for partition in self.partitions or []:
+                # Normally written when the SDK starts syncing the partition, the
+                # search window of the partition depends on it.
+                self._write_starting_replication_value(partition)
+                self._workspace_readers[partition["workspace_id"]] = ReadAhead(
+                    self.fetch_records(partition),
+                    WORKSPACE_READ_AHEAD_RECORDS,
+                    name=f"{self.name}-{partition['workspace_id']}",
+                ).start()
+        return self._workspace_readers.pop(context["workspace_id"], None)
+
+    @cached_property
+    def _raw_decoder(self) -> t.Callable[[bytes], list] | None:
+        """Return the decoder of raw records, if records can be passed through as is.
+
+        Any transformation of the records rules passthrough out: workspace ids,
+        sharding, batch files, stream maps, flattening and deselected properties.
+        """
+        if not (self.raw_passthrough and self.config.get("raw_passthrough")):
+            return None
+        if self.config.get("workspaces") or self.shard_count > 1 or self.config.get("batch_config"):
+            return None
+        stream_maps = self.stream_maps
+        if (
+            len(stream_maps) != 1
+            or type(stream_maps[0]) is not SameRecordTransform
+            or stream_maps[0].flattening_enabled
+            or stream_maps[0].stream_alias != self.name
+            or not all(self.mask.values())
+        ):
+            return None
+        return get_raw_decoder(self.records_jsonpath)
+
+    def parse_raw_records(self, response: requests.Response) -> list[RawRecord] | None:
+        """Return the records of a response as raw JSON, if they can be passed through.
+
+        Args:
+            response: A raw :class:`requests.Response`
+
+        Returns:
+            The raw records, or None if they have to be decoded.
+        """
+        decoder = self._raw_decoder
+        content = response.content
+        # Records spanning several lines would break the line-delimited output.
+        if decoder is None or b"\n" in content or b"\r" in content:
+            return None
+        return [RawRecord(raw) for raw in decoder(content)]
+
+    def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
+        """Parse the response and return an iterator of result records.
+
+        Args:
+            response: A raw :class:`requests.Response`
+
+        Returns:
+            The records in the response, raw if they can be passed through.
+        """
+        records = self.parse_raw_records(response)
+        if records is not None:
+            return records
+        interner = self.tap.string_interner
+        if interner is None:
+            return super().parse_response(response)
+        return extract_jsonpath(self.records_jsonpath, interner.loads(response.content))
+
+    def _generate_record_messages(self, record: dict) -> t.Generator[RecordMessage, None, None]:
+        """Write raw records as they are, skipping type conformance and stream maps.
+
+        Args:
+            record: A single stream record.
+
+        Yields:
+            Record message objects.
+        """
+        if not isinstance(record, RawRecord):
+            yield from super()._generate_record_messages(record)
+            return
+        yield RecordMessage(
+            stream=self.name,
+            record=record.to_message_record(),  # type: ignore[arg-type]
+            version=self._stream_version,
+            time_extracted=dt.datetime.now(dt.timezone.utc),
+        )
+
+    def _write_activate_version_message(self, full_table_version: int) -> None:
+        """Write out an ACTIVATE_VERSION message through the tap's buffered writer."""
+        self.tap.write_message(ActivateVersionMessage(stream=self.name, version=full_table_version))
+
+    def get_batches(
+        self,
+        batch_config: BatchConfig,
+        context: Context | None = None,
+    ) -> t.Iterable[tuple[BaseBatchFileEncoding, list[str]]]:
+        """Batch generator function.
+
+        Parquet batches are written with Arrow column types derived from the stream
+        schema, other encodings are left to the SDK.
+
+        Args:
+            batch_config: Batch config for this stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A tuple of (encoding, manifest) for each batch.
+        """
+        if batch_config.encoding.format != "parquet":
+            yield from super().get_batches(batch_config, context)
+            return
+
+        schema = self.effective_schema
+        selected_properties = {
+            name: node
+            for name, node in schema.get("properties", {}).items()
+            if self.mask.get(("properties", name), True)
+        }
+        batcher = IntercomParquetBatcher(
+            self.tap_name,
+            self.name,
+            batch_config,
+            schema={**schema, "properties": selected_properties},
+            row_group_size=self.config.get("parquet_row_group_size") or DEFAULT_ROW_GROUP_SIZE,
+        )
+        records = self._sync_records(context, write_messages=False)
+        for manifest in batcher.get_batches(records):
+            yield batch_config.encoding, manifest
+
+    def get_new_paginator(self) -> JSONPathPaginator | SinglePagePaginator:
         """Return a new paginator instance for the stream.
 
         Returns:
             JSONPathPaginator: Paginator for handling paginated API responses.
         """
+        if self._raw_decoder is not None:
+            # Passed through records come from unpaginated endpoints, no need to decode the response.
+            return SinglePagePaginator()
         return IntercomSearchPaginator(
             "$.pages.next.starting_after",
             logger=self.logger,
+            records_jsonpath=self.records_jsonpath,
+            replication_key=self.replication_key,
+            progress=self.progress if self.http_method == "POST" else None,
         )
 
 
+class SearchPageToken(t.NamedTuple):
+    """Page token of a search, optionally restarted above an `updated_at` floor."""
+
+    starting_after: str | None
+    updated_after: int | None = None
+    # Page size, when not the default 150.
+    per_page: int | None = None
+
+
 class IntercomSearchPaginator(JSONPathPaginator):
-    """JSONPath paginator with loop protection for repeated cursor tokens.
+    """JSONPath paginator with recovery from repeated cursor tokens.
 
     Some Intercom search endpoints can return cursor sequences that revisit
     previously seen tokens (for example: A -> B -> A -> B) when the underlying
     dataset is changing quickly. The base paginator only detects consecutive
     repeats, so we guard against any previously seen cursor to prevent infinite
     loops.
+
+    Searches are sorted by ascending replication key, so when a loop is detected
+    every record below the highest value seen has been read already. The search
+    is then restarted without a cursor, above that value, rather than stopped.
+    Records sharing the highest value are read again, which is harmless. When a
+    loop happens without any progress the paginator stops as before.
+
+    The `total_count` of the first page and the records of every page are added
+    to the search's progress, if given. A restarted search rebases the total on
+    the records read so far plus the `total_count` of its own first page.
     """
 
     def __init__(
@@ -216,31 +1491,69 @@ class IntercomSearchPaginator(JSONPathPaginator):
         jsonpath: str,
         *args: t.Any,
         logger: logging.Logger | None = None,
+        records_jsonpath: str | None = None,
+        replication_key: str | None = None,
+        progress: SearchProgress | None = None,
         **kwargs: t.Any,
     ) -> None:
-        """Create a new guarded paginator."""
+        """Create a new guarded paginator.
+
+        Args:
+            jsonpath: JSONPath of the next page token.
+            args: Paginator positional arguments for base class.
+            logger: Logger for loop warnings.
+            records_jsonpath: JSONPath of the records, to track the highest
+                replication key value seen.
+            replication_key: Replication key the search is sorted on. Without it,
+                pagination stops on a loop.
+            progress: Progress of the stream's searches.
+            kwargs: Paginator keyword arguments for base class.
+        """
         super().__init__(jsonpath, *args, **kwargs)
         self._logger = logger or LOGGER
+        self._records_jsonpath = records_jsonpath
+        self._replication_key = replication_key
+        self._progress = progress
         self._seen_tokens: set[t.Any] = set()
+        self._updated_after: int | None = None
+        self._max_replication_value: int | None = None
+        # Records counted and total added by the current search, to rebase its progress on a restart.
+        self._search_done = 0
+        self._search_total = 0
+        self._total_pending = True
+        self.restart_count = 0
 
     def advance(self, response: requests.Response) -> None:
-        """Advance the page token and stop gracefully if a token repeats."""
+        """Advance the page token, restarting the search if a token repeats."""
         self._page_count += 1
+        data = response.json()
+        records = []
+        if self._records_jsonpath and (self._progress is not None or self._replication_key):
+            records = list(extract_jsonpath(self._records_jsonpath, data))
+        if self._progress is not None:
+            if self._total_pending and data.get("total_count") is not None:
+                self._progress.add_total(data["total_count"])
+                self._search_total += data["total_count"]
+            self._total_pending = False
+            self._progress.page_done(len(records))
+            self._search_done += len(records)
 
         if not self.has_more(response):
             self._finished = True
             return
 
-        new_value = self.get_next(response)
+        if self._replication_key:
+            values = [
+                record[self._replication_key] for record in records if record.get(self._replication_key) is not None
+            ]
+            if self._max_replication_value is not None:
+                values.append(self._max_replication_value)
+            self._max_replication_value = max(values, default=None)
+
+        new_value = next(extract_jsonpath(self._jsonpath, data), None)
 
         if new_value and new_value in self._seen_tokens:
-            self._logger.warning(
-                "Loop detected in pagination. Token %s was seen earlier (page %s). "
-                "Stopping pagination for this stream to avoid an infinite loop.",
-                new_value,
-                self._page_count,
-            )
-            self._finished = True
+            self._restart_or_stop(new_value)
             return
 
         if not new_value:
@@ -248,7 +1561,37 @@ class IntercomSearchPaginator(JSONPathPaginator):
             return
 
         self._seen_tokens.add(new_value)
-        self._value = new_value
+        self._value = new_value if self._updated_after is None else SearchPageToken(new_value, self._updated_after)  # type: ignore[assignment]
+
+    def _restart_or_stop(self, token: str) -> None:
+        # Restart just below the highest value seen, so records sharing it are not skipped.
+        floor = None if self._max_replication_value is None else self._max_replication_value - 1
+        if floor is None or (self._updated_after is not None and floor <= self._updated_after):
+            self._logger.warning(
+                "Loop detected in pagination. Token %s was seen earlier (page %s) and no progress "
+                "was made since the last restart. Stopping pagination for this stream.",
+                token,
+                self._page_count,
+            )
+            self._finished = True
+            return
+
+        self.restart_count += 1
+        self._logger.warning(
+            "Loop detected in pagination. Token %s was seen earlier (page %s). Restarting the search above %s=%s.",
+            token,
+            self._page_count,
+            self._replication_key,
+            floor,
+        )
+        self._seen_tokens.clear()
+        self._updated_after = floor
+        self._value = SearchPageToken(None, floor)  # type: ignore[assignment]
+        if self._progress is not None:
+            # Records read so far count as done, the restarted search adds the total above the floor.
+            self._progress.add_total(self._search_done - self._search_total)
+            self._search_total = self._search_done
+            self._total_pending = True
 
 
 class IntercomHATEOASPaginator(BaseHATEOASPaginator):
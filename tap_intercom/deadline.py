@@ -0,0 +1,41 @@
+"""Deadline of a run, after which incremental streams stop requesting pages."""
+
+from __future__ import annotations
+
+import time
+
+# Time kept in reserve for the pages in flight, their child records and the final STATE.
+DEADLINE_MARGIN_SECONDS = 60.0
+
+
+class RunDeadlineReachedError(Exception):
+    """Raised instead of requesting a page once the run deadline is reached."""
+
+
+class RunDeadline:
+    """Deadline `seconds` after the run started, reached a safety margin early.
+
+    The margin is `DEADLINE_MARGIN_SECONDS`, or a tenth of the run time for
+    short runs.
+    """
+
+    def __init__(self, seconds: float, *, margin: float | None = None) -> None:
+        """Start the clock.
+
+        Args:
+            seconds: Max duration of the run.
+            margin: Seconds before the deadline from which no new pages are requested.
+        """
+        self.seconds = seconds
+        self.margin = min(DEADLINE_MARGIN_SECONDS, seconds / 10) if margin is None else margin
+        self._started_at = time.monotonic()
+
+    @property
+    def remaining_seconds(self) -> float:
+        """Return the seconds left until no new pages are requested."""
+        return self.seconds - self.margin - (time.monotonic() - self._started_at)
+
+    @property
+    def reached(self) -> bool:
+        """Return whether no new pages should be requested."""
+        return self.remaining_seconds <= 0
@@ -0,0 +1,105 @@
+"""Persistent index of records already emitted, to suppress lookback-window replays."""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import typing as t
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+
+def fingerprint(record_id: object, updated_at: int) -> int:
+    """Return a 64-bit fingerprint of a record version."""
+    digest = hashlib.blake2b(f"{record_id}\x00{updated_at}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class DedupeIndex:
+    """Sorted array of fingerprints of the `(id, updated_at)` pairs already emitted.
+
+    Each entry takes 16 bytes: the fingerprint, kept sorted for binary search, and
+    its `updated_at` for pruning. Replays never reach further back than the
+    lookback window, so entries older than the bookmark minus the window are
+    dropped on save, and at most `max_entries` of the newest entries are kept.
+    """
+
+    def __init__(self, path: Path, *, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """Load the index stored at `path`, if any.
+
+        Args:
+            path: File the index is stored in.
+            max_entries: The max number of entries to keep.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._fingerprints = array("Q")
+        self._updated_at = array("q")
+        self._new_fingerprints = array("Q")
+        self._new_updated_at = array("q")
+        if path.exists():
+            with path.open("rb") as f:
+                count = array("Q")
+                count.fromfile(f, 1)
+                self._fingerprints.fromfile(f, count[0])
+                self._updated_at.fromfile(f, count[0])
+
+    def __len__(self) -> int:
+        """Return the number of entries loaded from the previous runs."""
+        return len(self._fingerprints)
+
+    def seen(self, record_id: object, updated_at: int) -> bool:
+        """Return whether this version of the record was emitted by a previous run."""
+        value = fingerprint(record_id, updated_at)
+        position = bisect_left(self._fingerprints, value)
+        return position < len(self._fingerprints) and self._fingerprints[position] == value
+
+    def add(self, record_id: object, updated_at: int) -> None:
+        """Record that this version of the record was emitted in the current run."""
+        self._new_fingerprints.append(fingerprint(record_id, updated_at))
+        self._new_updated_at.append(updated_at)
+
+    def save(self, min_updated_at: int) -> None:
+        """Merge this run's entries, prune and write the index atomically.
+
+        Args:
+            min_updated_at: Entries with an older `updated_at` can no longer be
+                replayed and are dropped.
+        """
+        new_entries = sorted(zip(self._new_fingerprints, self._new_updated_at))
+        merged = heapq.merge(zip(self._fingerprints, self._updated_at), new_entries)
+        fingerprints = array("Q")
+        updated_ats = array("q")
+        for value, updated_at in merged:
+            if updated_at >= min_updated_at:
+                fingerprints.append(value)
+                updated_ats.append(updated_at)
+
+        if len(fingerprints) > self.max_entries:
+            # Keep the newest entries. Ties at the cutoff may keep a few extra.
+            cutoff = sorted(updated_ats)[-self.max_entries]
+            keep = [i for i, updated_at in enumerate(updated_ats) if updated_at >= cutoff]
+            fingerprints = array("Q", (fingerprints[i] for i in keep))
+            updated_ats = array("q", (updated_ats[i] for i in keep))
+
+        self._fingerprints = fingerprints
+        self._updated_at = updated_ats
+        self._new_fingerprints = array("Q")
+        self._new_updated_at = array("q")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            array("Q", [len(fingerprints)]).tofile(f)
+            self._fingerprints.tofile(f)
+            self._updated_at.tofile(f)
+        tmp_path.replace(self.path)
+
+
+def dedupe_index_path(directory: str, stream_name: str, context: t.Mapping | None) -> Path:
+    """Return the index file of a stream partition."""
+    suffix = "".join(f"-{key}={value}" for key, value in sorted((context or {}).items()))
+    return Path(directory) / f"{stream_name}{suffix}.idx"
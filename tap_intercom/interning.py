@@ -0,0 +1,82 @@
+"""Bounded interning of the short strings repeated across records.
+
+Keys such as `type` or `custom_attributes` names, and values such as `state`,
+`priority` or admin and team ids, repeat in every record. `json` only shares keys
+within a single response, so every buffered page holds its own copies. Decoding
+through `StringInterner.object_pairs_hook` makes all records share one copy.
+"""
+
+from __future__ import annotations
+
+import decimal
+import json
+import typing as t
+
+DEFAULT_INTERN_MAX_LENGTH = 64
+DEFAULT_INTERN_CAPACITY = 100_000
+
+
+class StringInterner:
+    """Table of shared strings, up to `capacity` entries of at most `max_length` characters.
+
+    Unlike `sys.intern`, the table belongs to the tap and stops growing once full:
+    strings already in it are still shared, new ones are kept as they are. Long
+    strings, such as bodies, are rarely repeated and never interned.
+    """
+
+    def __init__(self, *, max_length: int = DEFAULT_INTERN_MAX_LENGTH, capacity: int = DEFAULT_INTERN_CAPACITY) -> None:
+        """Create an empty table.
+
+        Args:
+            max_length: Max length of the strings to intern.
+            capacity: Max number of strings in the table.
+        """
+        self.max_length = max_length
+        self.capacity = capacity
+        self._strings: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        """Return the number of strings in the table."""
+        return len(self._strings)
+
+    def intern(self, value: str) -> str:
+        """Return the shared copy of a string, adding it to the table if there is room.
+
+        Args:
+            value: The string.
+
+        Returns:
+            An equal string, shared when possible.
+        """
+        if len(value) > self.max_length:
+            return value
+        shared = self._strings.get(value)
+        if shared is not None:
+            return shared
+        if len(self._strings) >= self.capacity:
+            return value
+        # setdefault keeps a single copy when threads add the same string concurrently.
+        return self._strings.setdefault(value, value)
+
+    def object_pairs_hook(self, pairs: list[tuple[str, t.Any]]) -> dict:
+        """Build a decoded JSON object from its pairs, with interned keys and short string values.
+
+        Args:
+            pairs: The object's key-value pairs.
+
+        Returns:
+            The object.
+        """
+        intern = self.intern
+        return {intern(key): intern(value) if type(value) is str else value for key, value in pairs}
+
+    def loads(self, content: bytes | str) -> t.Any:  # noqa: ANN401
+        """Decode a JSON document as `requests` would for the SDK, with interned strings.
+
+        Args:
+            content: The JSON document.
+
+        Returns:
+            The decoded document.
+        """
+        return json.loads(content, parse_float=decimal.Decimal, object_pairs_hook=self.object_pairs_hook)
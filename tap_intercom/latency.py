@@ -0,0 +1,170 @@
+"""Latency tracking, adaptive timeouts and hedged requests."""
+
+from __future__ import annotations
+
+import threading
+import time
+import typing as t
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+if t.TYPE_CHECKING:
+    import requests
+
+DEFAULT_RESERVOIR_SIZE = 1000
+MIN_SAMPLES = 50
+TIMEOUT_FACTOR = 5
+MIN_TIMEOUT_SECONDS = 10.0
+DEFAULT_HEDGE_WORKERS = 4
+
+
+class LatencyTracker:
+    """Latency percentiles over the most recent requests to one endpoint."""
+
+    def __init__(self, size: int = DEFAULT_RESERVOIR_SIZE, min_samples: int = MIN_SAMPLES) -> None:
+        """Create an empty tracker.
+
+        Args:
+            size: Number of most recent latencies kept.
+            min_samples: Number of latencies needed before percentiles are reported.
+        """
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Add the latency of a completed request."""
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        """Return a latency percentile, or None while there are too few samples.
+
+        Args:
+            fraction: The percentile as a fraction, e.g. 0.95.
+
+        Returns:
+            The latency in seconds below which `fraction` of the requests completed.
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def timeout(self, default: float) -> float:
+        """Return a timeout adapted to the endpoint's p99 latency.
+
+        Args:
+            default: Timeout used while there are too few samples, and the upper limit.
+
+        Returns:
+            The timeout in seconds.
+        """
+        p99 = self.percentile(0.99)
+        if p99 is None:
+            return default
+        return min(default, max(MIN_TIMEOUT_SECONDS, p99 * TIMEOUT_FACTOR))
+
+
+class HedgeSkippedError(Exception):
+    """Raised by a send function instead of sending a hedge there is no capacity for."""
+
+
+class HedgedSender:
+    """Sends a duplicate request when the first one is slower than usual.
+
+    The duplicate is sent once the primary request has not completed after the
+    endpoint's p95 latency, and whichever response arrives first is used. The
+    other request is left to complete in the background.
+
+    Requests run on a pool of `max_workers` threads, and are never queued behind
+    busy ones: while all workers are busy, e.g. with requests stuck on a slow API,
+    requests are sent without hedging, so hedges do not add load when the API is
+    slow across the board. Hedges are sent with `hedge=True`, so that the send
+    function can skip them in the same way, by raising `HedgeSkippedError`,
+    rather than wait for capacity that only frees up once the primary returned.
+    """
+
+    def __init__(
+        self,
+        send: t.Callable[..., requests.Response],
+        latency: LatencyTracker,
+        *,
+        max_workers: int = DEFAULT_HEDGE_WORKERS,
+    ) -> None:
+        """Create a new sender.
+
+        Args:
+            send: Sends a single request, or a hedge with `hedge=True`.
+            latency: The latencies of the endpoint.
+            max_workers: Max number of requests in flight on the sender's threads.
+        """
+        self._send = send
+        self.latency = latency
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _submit(self, request: requests.PreparedRequest, *args: t.Any, **kwargs: t.Any) -> Future | None:
+        """Send a request on a free worker, or return None if all workers are busy."""
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None
+            self._in_flight += 1
+        future = self._executor.submit(self._send, request, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def send(self, request: requests.PreparedRequest, *args: t.Any) -> requests.Response:
+        """Send a request, hedging it if it is slower than the endpoint's p95 latency.
+
+        Args:
+            request: The request to send.
+            args: Further arguments of the send function.
+
+        Returns:
+            The first successful response, or the error of the last one to fail.
+        """
+        delay = self.latency.percentile(0.95)
+        primary = None if delay is None else self._submit(request, *args)
+        if primary is None:
+            return self._send(request, *args)
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        hedge = self._submit(request.copy(), *args, hedge=True)
+        if hedge is None:
+            return primary.result()
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+            if hedge in done and isinstance(hedge.exception(), HedgeSkippedError):
+                return primary.result()
+            if not pending:
+                return future.result()
+
+
+def timed(
+    send: t.Callable[..., requests.Response],
+    latency: LatencyTracker,
+) -> t.Callable[..., requests.Response]:
+    """Wrap a send function to record the latency of every completed request."""
+
+    def timed_send(request: requests.PreparedRequest, *args: t.Any, **kwargs: t.Any) -> requests.Response:
+        start = time.monotonic()
+        response = send(request, *args, **kwargs)
+        latency.record(time.monotonic() - start)
+        return response
+
+    return timed_send
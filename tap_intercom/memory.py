@@ -0,0 +1,194 @@
+"""Memory profile of a sync: peak memory per stream and pipeline stage, and top allocation sites.
+
+Profiling uses `tracemalloc`, which slows the sync down considerably, so it is
+meant for diagnostic runs. Stage peaks are sampled when a stage ends, so they
+measure the memory still held at that point, e.g. a decoded page or a paginator's
+seen tokens. Stream peaks are the highest traced memory during the stream's sync.
+With `max_parallel_streams` above 1, concurrent streams include each other's memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import tracemalloc
+import typing as t
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore[assignment]
+
+if t.TYPE_CHECKING:
+    import logging
+
+MEMORY_PROFILE_FRAMES = 10
+TOP_ALLOCATION_SITES = 20
+TOP_STREAM_ALLOCATION_SITES = 5
+
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>")
+
+
+def peak_rss_bytes() -> int | None:
+    """Return the peak resident set size of the process so far, where the platform reports it."""
+    if resource is None:  # pragma: no cover
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def rss_bytes() -> int | None:
+    """Return the current resident set size of the process on Linux, else the peak so far."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:  # noqa: PTH123
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:  # pragma: no cover
+        return peak_rss_bytes()
+
+
+def top_allocation_sites(snapshot: tracemalloc.Snapshot, limit: int) -> list[dict]:
+    """Return the source lines holding the most memory in a snapshot.
+
+    Args:
+        snapshot: The allocation snapshot.
+        limit: The number of sites to return.
+
+    Returns:
+        The sites, with their allocated size and number of blocks.
+    """
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(inclusive=False, filename_pattern=f) for f in _IGNORED_FILES])
+    return [
+        {
+            "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_bytes": stat.size,
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+class StagePeak:
+    """Peak memory sampled at the end of a stream's pipeline stage."""
+
+    __slots__ = ("calls", "peak_rss_bytes", "peak_traced_bytes")
+
+    def __init__(self) -> None:
+        """Create an empty peak."""
+        self.calls = 0
+        self.peak_traced_bytes = 0
+        self.peak_rss_bytes: int | None = None
+
+
+class MemoryProfiler:
+    """Records memory peaks per stream and stage, and allocation snapshots per stream."""
+
+    def __init__(self, *, frames: int = MEMORY_PROFILE_FRAMES) -> None:
+        """Start tracing allocations.
+
+        Args:
+            frames: Number of frames stored per allocation traceback.
+        """
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(frames)
+        self._stages: dict[tuple[str, str], StagePeak] = {}
+        self._streams: dict[str, dict] = {}
+        self._peak_traced_bytes = 0
+        self._lock = threading.Lock()
+
+    def stream_started(self) -> None:
+        """Start measuring the peak memory of a top-level stream's sync."""
+        with self._lock:
+            self._peak_traced_bytes = max(self._peak_traced_bytes, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+
+    def stage_done(self, stream: str, stage: str) -> None:
+        """Sample the memory in use at the end of a stage.
+
+        Args:
+            stream: The stream name.
+            stage: The pipeline stage, e.g. `request` or `decode`.
+        """
+        traced, _ = tracemalloc.get_traced_memory()
+        rss = rss_bytes()
+        with self._lock:
+            peak = self._stages.get((stream, stage))
+            if peak is None:
+                peak = self._stages[stream, stage] = StagePeak()
+            peak.calls += 1
+            peak.peak_traced_bytes = max(peak.peak_traced_bytes, traced)
+            if rss is not None:
+                peak.peak_rss_bytes = max(peak.peak_rss_bytes or 0, rss)
+
+    def stream_done(self, stream: str, state: t.Mapping[str, t.Any]) -> None:
+        """Take an allocation snapshot at the end of a top-level stream's sync.
+
+        Args:
+            stream: The stream name.
+            state: The tap state, whose size is recorded.
+        """
+        snapshot = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        summary = {
+            "stream": stream,
+            "traced_bytes": traced,
+            "peak_traced_bytes": peak,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "state_bytes": len(json.dumps(state, default=str)),
+            "top_allocations": top_allocation_sites(snapshot, TOP_STREAM_ALLOCATION_SITES),
+        }
+        with self._lock:
+            self._streams[stream] = summary
+
+    def summary(self) -> dict:
+        """Return the memory profile of the run so far."""
+        with self._lock:
+            stages = [
+                {
+                    "stream": stream,
+                    "stage": stage,
+                    "calls": peak.calls,
+                    "peak_traced_bytes": peak.peak_traced_bytes,
+                    "peak_rss_bytes": peak.peak_rss_bytes,
+                }
+                for (stream, stage), peak in self._stages.items()
+            ]
+            streams = list(self._streams.values())
+            peak_traced_bytes = max(self._peak_traced_bytes, tracemalloc.get_traced_memory()[1])
+        return {
+            "peak_traced_bytes": peak_traced_bytes,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": sorted(stages, key=lambda stage: stage["peak_traced_bytes"], reverse=True),
+            "streams": streams,
+            "top_allocations": top_allocation_sites(tracemalloc.take_snapshot(), TOP_ALLOCATION_SITES),
+        }
+
+    def write_summary(self, path: str | Path, logger: logging.Logger) -> None:
+        """Write the memory profile to a JSON file, log its highlights and stop tracing.
+
+        Args:
+            path: The summary file.
+            logger: Logger for the highlights.
+        """
+        summary = self.summary()
+        if self._started_tracing:
+            tracemalloc.stop()
+        Path(path).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        logger.info(
+            "Memory profile written to %s: peak traced %d bytes, peak RSS %s bytes.",
+            path,
+            summary["peak_traced_bytes"],
+            summary["peak_rss_bytes"],
+        )
+        for stage in summary["stages"][:5]:
+            logger.info(
+                "Memory peak of '%s' %s: %d bytes traced.", stage["stream"], stage["stage"], stage["peak_traced_bytes"]
+            )
+        for site in summary["top_allocations"][:5]:
+            logger.info(
+                "Top allocation site %s: %d bytes in %d blocks.", site["site"], site["size_bytes"], site["count"]
+            )
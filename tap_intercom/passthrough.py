@@ -0,0 +1,72 @@
+"""Passthrough of records as the raw JSON the API sent, without decoding them."""
+
+from __future__ import annotations
+
+import re
+import typing as t
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore[assignment]
+
+_LIST_JSONPATH = re.compile(r"\$\.(\w+)\[\*\]")
+
+
+class RawRecord(dict):
+    """Record carrying the raw JSON of an API record.
+
+    The dict itself is empty, apart from any keys the sync adds along the way,
+    e.g. partition keys. Those are merged into the record when it is written.
+    """
+
+    __slots__ = ("raw",)
+
+    def __init__(self, raw: msgspec.Raw) -> None:
+        """Create a new raw record.
+
+        Args:
+            raw: The JSON of the record, exactly as sent by the API.
+        """
+        super().__init__()
+        self.raw = raw
+
+    def to_message_record(self) -> msgspec.Raw | dict:
+        """Return the record to write, as raw JSON unless keys were added to it."""
+        if not self:
+            return self.raw
+        return {**msgspec.json.decode(self.raw), **self}
+
+
+def get_raw_decoder(records_jsonpath: str) -> t.Callable[[bytes], list[msgspec.Raw]] | None:
+    """Return a decoder of the raw JSON of each record in a response body.
+
+    Only the envelope is decoded: msgspec skips over the records themselves and
+    returns their byte ranges.
+
+    Args:
+        records_jsonpath: JSONPath of the records, either `$` or `$.<key>[*]`.
+
+    Returns:
+        The decoder, or None if msgspec is not installed or the JSONPath is not supported.
+    """
+    if msgspec is None:
+        return None
+    if records_jsonpath == "$":
+        return lambda content: [msgspec.Raw(content.strip())]
+    match = _LIST_JSONPATH.fullmatch(records_jsonpath)
+    if match is None:
+        return None
+    key = match.group(1)
+    decoder = msgspec.json.Decoder(msgspec.defstruct("Page", [(key, list[msgspec.Raw], [])]))
+    return lambda content: getattr(decoder.decode(content), key)
+
+
+def raw_record_id(raw: msgspec.Raw) -> t.Any:  # noqa: ANN401
+    """Return the `id` of a record passed through as raw JSON, decoding nothing else."""
+    return _RECORD_ID_DECODER.decode(raw).id  # type: ignore[attr-defined]
+
+
+_RECORD_ID_DECODER = (
+    msgspec.json.Decoder(msgspec.defstruct("RecordId", [("id", t.Any)])) if msgspec is not None else None
+)
@@ -0,0 +1,256 @@
+"""Report how many bytes each field contributes to the records of each stream.
+
+Reads the response archive of the `archive` setting, saved response fixtures named
+after their stream (e.g. `conversations.json`), or the tap's own output, and
+recommends deselecting the fields that make up most of a stream's bytes:
+
+    python -m tap_intercom.payload_size archive/ --min-share 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import typing as t
+from pathlib import Path
+
+from singer_sdk.helpers.jsonpath import extract_jsonpath
+
+from tap_intercom import streams
+from tap_intercom.archive import ResponseArchive
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_MIN_SHARE = 0.1
+
+SINGER_MESSAGE_TYPES = ("SCHEMA", "RECORD", "STATE", "ACTIVATE_VERSION", "BATCH")
+
+STREAM_TYPES = {stream_type.name: stream_type for stream_type in streams.IntercomStream.__subclasses__()}  # type: ignore[misc]
+
+
+def _size(value: t.Any) -> int:  # noqa: ANN401
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def field_sizes(record: dict, *, max_depth: int = DEFAULT_MAX_DEPTH) -> Iterator[tuple[str, int]]:
+    """Yield the path and encoded size of every field of a record, down to `max_depth` levels.
+
+    Sizes include the field's key. Fields of objects in arrays are reported under
+    `<array>[].<field>`, summed over the array's items.
+
+    Args:
+        record: The record.
+        max_depth: Number of nesting levels to report.
+
+    Yields:
+        Tuples of the field path and its size in bytes.
+    """
+    yield from _object_field_sizes(record, "", 1, max_depth)
+
+
+def _object_field_sizes(value: dict, prefix: str, depth: int, max_depth: int) -> Iterator[tuple[str, int]]:
+    for key, item in value.items():
+        path = f"{prefix}{key}"
+        # The key, its quotes, the colon and the separating comma.
+        yield path, _size(key) + 2 + _size(item)
+        if depth >= max_depth:
+            continue
+        if isinstance(item, dict):
+            yield from _object_field_sizes(item, f"{path}.", depth + 1, max_depth)
+        elif isinstance(item, list):
+            for element in item:
+                if isinstance(element, dict):
+                    yield from _object_field_sizes(element, f"{path}[].", depth + 1, max_depth)
+
+
+class StreamPayload:
+    """Bytes per field of a stream's records."""
+
+    def __init__(self, stream: str, *, max_depth: int = DEFAULT_MAX_DEPTH) -> None:
+        """Create empty statistics.
+
+        Args:
+            stream: The stream name.
+            max_depth: Number of nesting levels to report.
+        """
+        self.stream = stream
+        self.max_depth = max_depth
+        self.records = 0
+        self.bytes = 0
+        # Bytes and number of records containing the field, by field path.
+        self.fields: dict[str, list[int]] = {}
+
+    def add(self, record: dict) -> None:
+        """Add a record to the statistics."""
+        self.records += 1
+        self.bytes += _size(record)
+        seen = set()
+        for path, size in field_sizes(record, max_depth=self.max_depth):
+            stats = self.fields.setdefault(path, [0, 0])
+            stats[0] += size
+            if path not in seen:
+                seen.add(path)
+                stats[1] += 1
+
+    def share(self, path: str) -> float:
+        """Return the share of the stream's bytes taken by a field."""
+        return self.fields[path][0] / self.bytes if self.bytes else 0.0
+
+    def recommend_deselections(self, min_share: float = DEFAULT_MIN_SHARE) -> list[str]:
+        """Return the fields worth deselecting, taking at least `min_share` of the stream's bytes.
+
+        A nested field taking most of its parent's bytes is recommended instead of
+        the parent. Primary keys and replication keys are never recommended, and
+        neither are fields of array items, which cannot be deselected on their own.
+
+        Args:
+            min_share: Minimum share of the stream's bytes.
+
+        Returns:
+            The field paths, largest first.
+        """
+        stream_type = STREAM_TYPES.get(self.stream)
+        required = {*stream_type.primary_keys, stream_type.replication_key} if stream_type else {"id"}
+        candidates = {
+            path
+            for path in self.fields
+            if "[]" not in path and path.split(".")[0] not in required and self.share(path) >= min_share
+        }
+
+        def dominant(path: str) -> bool:
+            parent = path.rpartition(".")[0]
+            return parent in candidates and 2 * self.fields[path][0] >= self.fields[parent][0]
+
+        recommended = [
+            path
+            for path in candidates
+            if ("." not in path or dominant(path))
+            and not any(other.startswith(f"{path}.") and dominant(other) for other in candidates)
+        ]
+        return sorted(recommended, key=self.share, reverse=True)
+
+    def report(self, min_share: float = DEFAULT_MIN_SHARE) -> str:
+        """Return a text report of the bytes per field and the recommended deselections."""
+        average = self.bytes // self.records if self.records else 0
+        lines = [
+            f"{self.stream}: {self.records} records, {self.bytes} bytes ({average} per record)",
+            f"  {'field':<50} {'bytes':>12} {'share':>7} {'records':>8}",
+        ]
+        for path, (size, count) in sorted(self.fields.items(), key=lambda item: item[1][0], reverse=True):
+            lines.append(f"  {path:<50} {size:>12} {self.share(path):>7.1%} {count:>8}")
+        deselections = self.recommend_deselections(min_share)
+        if deselections:
+            lines.append("  Recommended deselections:")
+            lines.extend(f"    {self.stream}.{path} ({self.share(path):.1%} of bytes)" for path in deselections)
+        return "\n".join(lines)
+
+    def to_dict(self, min_share: float = DEFAULT_MIN_SHARE) -> dict:
+        """Return the statistics as a JSON-serializable dictionary."""
+        return {
+            "stream": self.stream,
+            "records": self.records,
+            "bytes": self.bytes,
+            "fields": {
+                path: {"bytes": size, "share": self.share(path), "records": count}
+                for path, (size, count) in sorted(self.fields.items(), key=lambda item: item[1][0], reverse=True)
+            },
+            "recommended_deselections": self.recommend_deselections(min_share),
+        }
+
+
+def response_records(stream: str, body: t.Any) -> Iterable[dict]:  # noqa: ANN401
+    """Return the records of a decoded response body, or of a saved list of records.
+
+    Args:
+        stream: The stream name, whose `records_jsonpath` applies.
+        body: The decoded response body.
+
+    Returns:
+        The records.
+    """
+    if isinstance(body, list):
+        return body
+    stream_type = STREAM_TYPES.get(stream)
+    return extract_jsonpath(stream_type.records_jsonpath if stream_type else "$.data[*]", body)
+
+
+def read_records(path: Path) -> Iterator[tuple[str, dict]]:
+    """Yield the stream name and every record found at a path.
+
+    Args:
+        path: A response archive directory, a JSON file of a response or of records
+            named after the stream, or a file of Singer messages.
+
+    Yields:
+        Tuples of the stream name and a record.
+    """
+    if path.is_dir():
+        archive = ResponseArchive(path)
+        for stream in archive.streams():
+            for page in archive.stream_pages(stream):
+                for record in response_records(stream, json.loads(page)):
+                    yield stream, record
+        return
+    text = path.read_text(encoding="utf-8")
+    try:
+        body = json.loads(text)
+    except json.JSONDecodeError:
+        body = None
+    if body is None or (isinstance(body, dict) and body.get("type") in SINGER_MESSAGE_TYPES):
+        # Singer messages, one per line.
+        for line in text.splitlines():
+            message = json.loads(line) if line.strip() else {}
+            if message.get("type") == "RECORD":
+                yield message["stream"], message["record"]
+        return
+    for record in response_records(path.stem, body):
+        yield path.stem, record
+
+
+def analyze(paths: Iterable[Path], *, max_depth: int = DEFAULT_MAX_DEPTH) -> dict[str, StreamPayload]:
+    """Return the bytes per field of every stream found at the paths.
+
+    Args:
+        paths: Response archives, fixtures or Singer message files.
+        max_depth: Number of nesting levels to report.
+
+    Returns:
+        The statistics by stream name.
+    """
+    payloads: dict[str, StreamPayload] = {}
+    for path in paths:
+        for stream, record in read_records(path):
+            payload = payloads.get(stream)
+            if payload is None:
+                payload = payloads[stream] = StreamPayload(stream, max_depth=max_depth)
+            payload.add(record)
+    return payloads
+
+
+def main(args: list[str]) -> None:
+    """Print the bytes per field of the streams found at the given paths."""
+    parser = argparse.ArgumentParser(prog="python -m tap_intercom.payload_size", description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", type=Path, help="response archives, fixtures or Singer message files")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH, help="nesting levels to report")
+    parser.add_argument(
+        "--min-share",
+        type=float,
+        default=DEFAULT_MIN_SHARE,
+        help="share of a stream's bytes from which a field is recommended for deselection",
+    )
+    parser.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    options = parser.parse_args(args)
+
+    payloads = analyze(options.paths, max_depth=options.max_depth)
+    if options.json:
+        output = json.dumps([payload.to_dict(options.min_share) for payload in payloads.values()], indent=2)
+    else:
+        output = "\n\n".join(payload.report(options.min_share) for payload in payloads.values())
+    sys.stdout.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,91 @@
+"""Bounded background read-ahead of record iterators."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import typing as t
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+T = t.TypeVar("T")
+
+_ITEM, _ERROR, _DONE = range(3)
+_POLL_SECONDS = 0.1
+
+
+class ReadAhead(t.Generic[T]):
+    """Iterate over an iterable in a background thread, up to `maxsize` items ahead.
+
+    The producer blocks while the queue is full, so memory stays bounded however
+    far behind the consumer is. Exceptions raised by the iterable are re-raised
+    to the consumer, and the producer stops when the consumer stops iterating.
+    """
+
+    def __init__(self, iterable: Iterable[T], maxsize: int, *, name: str | None = None) -> None:
+        """Create a new, not yet started, read-ahead.
+
+        Args:
+            iterable: The items to read.
+            maxsize: The max number of items read ahead of the consumer.
+            name: Name of the producer thread.
+        """
+        self._iterable = iterable
+        self._queue: queue.Queue[tuple[int, t.Any]] = queue.Queue(maxsize)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+
+    def start(self) -> ReadAhead[T]:
+        """Start reading in the background.
+
+        Returns:
+            This read-ahead.
+        """
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the producer at its next item."""
+        self._stopped.set()
+
+    def _put(self, kind: int, value: t.Any) -> bool:  # noqa: ANN401
+        while not self._stopped.is_set():
+            try:
+                self._queue.put((kind, value), timeout=_POLL_SECONDS)
+            except queue.Full:
+                continue
+            return True
+        return False
+
+    def _produce(self) -> None:
+        iterator = iter(self._iterable)
+        try:
+            for item in iterator:
+                if not self._put(_ITEM, item):
+                    return
+        except Exception as e:  # noqa: BLE001
+            self._put(_ERROR, e)
+            return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        self._put(_DONE, None)
+
+    def __iter__(self) -> Iterator[T]:
+        """Yield the items read in the background.
+
+        Yields:
+            The items of the iterable, in order.
+        """
+        try:
+            while True:
+                kind, value = self._queue.get()
+                if kind == _DONE:
+                    return
+                if kind == _ERROR:
+                    raise value
+                yield value
+        finally:
+            self.stop()
@@ -0,0 +1,87 @@
+"""Progress and ETA of search streams, from the `total_count` of their results."""
+
+from __future__ import annotations
+
+import enum
+import threading
+import time
+import typing as t
+
+PROGRESS_REPORT_SECONDS = 60.0
+
+
+class ProgressMetric(str, enum.Enum):
+    """Metrics of a search stream's progress."""
+
+    RECORDS_DONE = "records_done"
+    RECORDS_TOTAL = "records_total"
+    PAGES_PER_MINUTE = "pages_per_minute"
+    ETA_SECONDS = "eta_seconds"
+
+
+class SearchProgress:
+    """Thread-safe progress of the searches of one stream.
+
+    Every search adds the `total_count` of its first page to the total, so the
+    progress of several partitions adds up. The ETA assumes the remaining records
+    are read at the average rate so far.
+    """
+
+    def __init__(
+        self,
+        *,
+        on_report: t.Callable[[SearchProgress], None] | None = None,
+        report_seconds: float = PROGRESS_REPORT_SECONDS,
+    ) -> None:
+        """Create a new, empty progress.
+
+        Args:
+            on_report: Called at most every `report_seconds` while pages are read.
+            report_seconds: Seconds between reports.
+        """
+        self.total = 0
+        self.done = 0
+        self.pages = 0
+        self._on_report = on_report
+        self._report_seconds = report_seconds
+        self._started_at: float | None = None
+        self._reported_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_total(self, total_count: int) -> None:
+        """Add the number of records a search matches."""
+        with self._lock:
+            self.total += total_count
+
+    def page_done(self, records: int) -> None:
+        """Count a page of `records` records, reporting progress if a report is due."""
+        with self._lock:
+            now = time.monotonic()
+            if self._started_at is None:
+                self._started_at = now
+            self.done += records
+            self.pages += 1
+            due = now - self._reported_at >= self._report_seconds
+            if due:
+                self._reported_at = now
+        if due and self._on_report is not None:
+            self._on_report(self)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Return the seconds since the first page was read."""
+        return 0.0 if self._started_at is None else time.monotonic() - self._started_at
+
+    @property
+    def pages_per_minute(self) -> float | None:
+        """Return the average number of pages read per minute, if known yet."""
+        elapsed = self.elapsed_seconds
+        return self.pages * 60 / elapsed if elapsed > 0 else None
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Return the estimated seconds until all records are read, if known yet."""
+        elapsed = self.elapsed_seconds
+        if not self.done or elapsed <= 0:
+            return None
+        return max(0, self.total - self.done) * elapsed / self.done
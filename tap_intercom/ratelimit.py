@@ -0,0 +1,135 @@
+"""Client-side rate limiting of Intercom API requests."""
+
+from __future__ import annotations
+
+import enum
+import threading
+import time
+
+# Fraction of the limit kept after a 429 or a latency rise.
+DECREASE_FACTOR = 0.5
+# Latency rise, relative to the long-term baseline, treated as congestion.
+LATENCY_TOLERANCE = 2.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate_per_minute` requests on average.
+
+    Up to a tenth of a minute's worth of requests can be sent in a burst, which
+    matches the 10 second windows Intercom enforces its rate limit over.
+    """
+
+    def __init__(self, rate_per_minute: float) -> None:
+        """Create a new, full bucket.
+
+        Args:
+            rate_per_minute: Average number of requests allowed per minute.
+        """
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1.0, rate_per_minute / 6)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ConcurrencyMetric(str, enum.Enum):
+    """Metrics of the adaptive concurrency controller."""
+
+    CONCURRENCY_LIMIT = "concurrency_limit"
+
+
+class AIMDLimiter:
+    """Adaptive limit on in-flight requests, using additive increase, multiplicative decrease.
+
+    Every healthy response raises the limit by 1 / limit, so by about one
+    request per round of responses. A 429, or a recent latency above
+    `LATENCY_TOLERANCE` times the long-term baseline, cuts the limit by
+    `DECREASE_FACTOR`, at most once per round trip.
+    """
+
+    def __init__(self, max_limit: int, *, min_limit: int = 1, initial_limit: int | None = None) -> None:
+        """Create a new limiter.
+
+        Args:
+            max_limit: The highest limit.
+            min_limit: The lowest limit.
+            initial_limit: The starting limit, defaults to `min_limit`.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(initial_limit or min_limit)
+        self._in_flight = 0
+        self._recent_latency: float | None = None
+        self._baseline_latency: float | None = None
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Return the current limit on in-flight requests."""
+        return int(self._limit)
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """Wait until a request can be sent within the current limit.
+
+        Args:
+            blocking: Whether to wait, rather than return at once when the limit is reached.
+
+        Returns:
+            Whether the request can be sent.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                if not blocking:
+                    return False
+                self._condition.wait()
+            self._in_flight += 1
+            return True
+
+    def release(self, latency: float | None, *, throttled: bool = False) -> int | None:
+        """Adjust the limit after a request completed.
+
+        Args:
+            latency: The request's latency in seconds, None if it failed without response.
+            throttled: Whether the API answered with a 429.
+
+        Returns:
+            The new limit if it changed, else None.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            previous = self.limit
+            if latency is not None:
+                self._recent_latency = (
+                    latency if self._recent_latency is None else 0.8 * self._recent_latency + 0.2 * latency
+                )
+                self._baseline_latency = (
+                    latency if self._baseline_latency is None else 0.99 * self._baseline_latency + 0.01 * latency
+                )
+            congested = (
+                self._recent_latency is not None
+                and self._baseline_latency is not None
+                and self._recent_latency > LATENCY_TOLERANCE * self._baseline_latency
+            )
+            now = time.monotonic()
+            if throttled or congested:
+                if now - self._decreased_at >= (self._recent_latency or 0):
+                    self._limit = max(float(self.min_limit), self._limit * DECREASE_FACTOR)
+                    self._decreased_at = now
+            elif latency is not None:
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+            return self.limit if self.limit != previous else None
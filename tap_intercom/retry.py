@@ -0,0 +1,191 @@
+"""Retry policy for Intercom API requests.
+
+Waits honor `Retry-After` and `X-RateLimit-Reset` when the API sends them, and
+otherwise follow decorrelated jitter, which spreads retries of concurrent
+requests without the long tails of plain exponential backoff. A circuit breaker
+per endpoint template fails fast while an endpoint keeps erroring, without
+affecting requests to other endpoints.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+import typing as t
+from email.utils import parsedate_to_datetime
+
+from singer_sdk.exceptions import RetriableAPIError
+
+if t.TYPE_CHECKING:
+    import requests
+
+RETRY_BASE_SECONDS = 1.0
+RETRY_CAP_SECONDS = 60.0
+RETRY_MAX_SECONDS = 600.0
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+
+class CircuitOpenError(RetriableAPIError):
+    """Raised instead of sending a request while the endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_after: float) -> None:
+        """Create a new error.
+
+        Args:
+            endpoint: The endpoint template of the circuit.
+            retry_after: Seconds until the circuit lets a request through.
+        """
+        super().__init__(f"Circuit open for {endpoint}, retrying in {retry_after:.1f}s.")
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(response: requests.Response, now: float | None = None) -> float | None:
+    """Return how long the API asked to wait before retrying, if it did.
+
+    Args:
+        response: The failed response.
+        now: Current Unix time, defaults to `time.time()`.
+
+    Returns:
+        Seconds to wait, or None when the response has no usable header.
+    """
+    now = time.time() if now is None else now
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+    reset = response.headers.get("X-RateLimit-Reset")
+    if reset:
+        try:
+            return max(0.0, float(reset) - now)
+        except ValueError:
+            pass
+    return None
+
+
+def decorrelated_jitter(
+    base: float = RETRY_BASE_SECONDS,
+    cap: float = RETRY_CAP_SECONDS,
+) -> t.Iterator[float]:
+    """Yield decorrelated jitter waits: each one random between `base` and 3x the last.
+
+    Args:
+        base: The minimum wait.
+        cap: The maximum wait.
+
+    Yields:
+        Seconds to wait before each retry.
+    """
+    wait = base
+    while True:
+        wait = min(cap, random.uniform(base, wait * 3))  # noqa: S311
+        yield wait
+
+
+def retry_wait(
+    exception: Exception,
+    jitter: t.Iterator[float],
+    cap: float = RETRY_CAP_SECONDS,
+) -> float:
+    """Return how long to wait after a failed request.
+
+    Args:
+        exception: The exception raised by the request.
+        jitter: The request's decorrelated jitter generator.
+        cap: The maximum wait when the API does not ask for a specific one.
+
+    Returns:
+        Seconds to wait.
+    """
+    if isinstance(exception, CircuitOpenError):
+        return exception.retry_after
+    response = getattr(exception, "response", None)
+    hint = retry_after_seconds(response) if response is not None else None
+    if hint is not None:
+        # A little jitter on top, so concurrent requests do not all retry at the reset.
+        return hint + random.uniform(0, min(cap, RETRY_BASE_SECONDS))  # noqa: S311
+    return next(jitter)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint template.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests
+    fail fast for `reset_seconds`. Then a single probe request is let through:
+    the circuit closes if it succeeds and opens again if it fails.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_seconds: float = BREAKER_RESET_SECONDS,
+    ) -> None:
+        """Create a new, closed circuit breaker.
+
+        Args:
+            endpoint: The endpoint template, for messages.
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_seconds: Seconds the circuit stays open before a probe.
+        """
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether the circuit is open or half-open."""
+        return self._opened_at is not None
+
+    def before_request(self) -> bool:
+        """Check the circuit before sending a request.
+
+        Returns:
+            Whether the request is the probe of a half-open circuit.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe
+                already in flight.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self._opened_at + self.reset_seconds - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(self.endpoint, remaining)
+            if self._probing:
+                raise CircuitOpenError(self.endpoint, RETRY_BASE_SECONDS)
+            self._probing = True
+            return True
+
+    def end_probe(self) -> None:
+        """Let the next request probe again, after a probe that neither succeeded nor failed, e.g. rate-limited."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
@@ -1,4 +1,14 @@
-"""Contains all stream schemas."""
+"""Contains all stream schemas.
+
+These definitions are the source of the precompiled JSON schemas in
+`tap_intercom/json_schemas`, which the streams load at runtime. After changing a
+schema here, regenerate the JSON files with::
+
+    python -m tap_intercom.schemas
+"""
+
+import json
+from pathlib import Path
 
 from singer_sdk.typing import (
     ArrayType,
@@ -479,6 +489,10 @@ conversation_parts_schema = PropertiesList(
     Property("id", StringType),
     Property("part_type", StringType),
     Property("body", StringType),
+    # Set when the body exceeded the `conversation_parts_body` size limit.
+    Property("body_sha256", StringType),
+    Property("body_length", IntegerType),
+    Property("body_ref", StringType),
     Property("created_at", IntegerType),
     Property("updated_at", IntegerType),
     Property("notified_at", IntegerType),
@@ -918,3 +932,27 @@ articles_extended_schema = PropertiesList(
     Property("created_at", IntegerType),
     Property("updated_at", IntegerType),
 ).to_dict()
+
+SCHEMAS = {
+    "conversations": conversations_schema,
+    "conversation_parts": conversation_parts_schema,
+    "admins": admins_schema,
+    "tags": tags_schema,
+    "teams": teams_schema,
+    "contacts": contacts_schema,
+    "articles": articles_schema,
+    "articles_extended": articles_extended_schema,
+}
+
+JSON_SCHEMAS_DIR = Path(__file__).parent / "json_schemas"
+
+
+def compile_schemas() -> None:
+    """Write every stream schema to `json_schemas/<stream name>.json`."""
+    JSON_SCHEMAS_DIR.mkdir(exist_ok=True)
+    for name, schema in SCHEMAS.items():
+        (JSON_SCHEMAS_DIR / f"{name}.json").write_text(json.dumps(schema, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    compile_schemas()
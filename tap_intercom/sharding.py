@@ -0,0 +1,103 @@
+"""Deterministic sharding of streams across several tap processes.
+
+Search streams are split into contiguous `updated_at` ranges, every other
+top-level stream by a hash of the record `id`. Child streams follow their
+parent, so each shard only fetches the children of the records it owns.
+
+Every shard must be given the same state and `end_date`, so that they all see
+the same extraction window. After a run the state files of all shards can be
+combined with `merge_states`, or from the command line::
+
+    python -m tap_intercom.sharding state-0.json state-1.json > state.json
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import zlib
+from pathlib import Path
+
+
+def shard_of(key: object, shard_count: int) -> int:
+    """Return the shard a key belongs to.
+
+    Uses CRC32 rather than `hash()`, which is salted per process.
+
+    Args:
+        key: The key to assign, usually a record id.
+        shard_count: The total number of shards.
+
+    Returns:
+        The shard index of the key.
+    """
+    return zlib.crc32(str(key).encode()) % shard_count
+
+
+def shard_range(lower: int, upper: int, shard_index: int, shard_count: int) -> tuple[int, int]:
+    """Return the part of an inclusive integer range assigned to a shard.
+
+    Args:
+        lower: The first value of the range.
+        upper: The last value of the range.
+        shard_index: The index of the shard.
+        shard_count: The total number of shards.
+
+    Returns:
+        The inclusive (first, last) values for the shard. The range is empty when
+        first > last, which happens when there are more shards than values.
+    """
+    size = upper - lower + 1
+    first = lower + size * shard_index // shard_count
+    last = lower + size * (shard_index + 1) // shard_count - 1
+    return first, last
+
+
+def _merge_bookmark(merged: dict, bookmark: dict) -> None:
+    value = bookmark.get("replication_key_value")
+    if value is None:
+        for key, item in bookmark.items():
+            merged.setdefault(key, item)
+        return
+    current = merged.get("replication_key_value")
+    if current is None or value > current:
+        merged.update(bookmark)
+
+
+def merge_states(states: list[dict]) -> dict:
+    """Merge the final states of all shards of a run.
+
+    Shards cover disjoint parts of the same window, so once all of them completed
+    the highest bookmark of each stream is the bookmark of the whole run.
+
+    Args:
+        states: The final state of every shard.
+
+    Returns:
+        The merged state.
+    """
+    merged: dict[str, dict] = {}
+    for state in states:
+        for stream_name, bookmark in state.get("bookmarks", {}).items():
+            target = merged.setdefault(stream_name, {})
+            _merge_bookmark(target, {k: v for k, v in bookmark.items() if k != "partitions"})
+            if "partitions" not in bookmark:
+                continue
+            partitions = target.setdefault("partitions", [])
+            for partition in bookmark["partitions"]:
+                match = next((p for p in partitions if p.get("context") == partition.get("context")), None)
+                if match is None:
+                    partitions.append(dict(partition))
+                else:
+                    _merge_bookmark(match, partition)
+    return {"bookmarks": merged}
+
+
+def main(paths: list[str]) -> None:
+    """Print the merged state of the given state files."""
+    states = [json.loads(Path(path).read_text()) for path in paths]
+    sys.stdout.write(json.dumps(merge_states(states)) + "\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,92 @@
+"""Snapshot of the content hashes of a full-table stream's records, to emit only changes."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import typing as t
+import uuid
+from pathlib import Path
+
+from tap_intercom.passthrough import RawRecord, raw_record_id
+
+
+def record_digest(record: dict) -> str:
+    """Return a hash of a record's content, as sent by the API when passed through raw."""
+    if isinstance(record, RawRecord):
+        content = bytes(memoryview(record.raw))
+    else:
+        content = json.dumps(record, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def record_id(record: dict) -> str:
+    """Return the id of a record, decoding it from the raw JSON of passed through records."""
+    return str(raw_record_id(record.raw) if isinstance(record, RawRecord) else record["id"])
+
+
+class RecordSnapshot:
+    """Content hash of every record of a stream by id, as of the previous committed run.
+
+    Every run saves its snapshot to a new file named after its `run` id, which
+    the stream records in its state. Only the snapshot of the run whose state
+    was `committed` is compared to, so when a target fails to load a run's
+    records, the next run emits their changes again.
+
+    The snapshot is tied to a `version` of what is emitted, e.g. the stream's
+    schema and selected properties: when those change, every record is emitted
+    again.
+    """
+
+    def __init__(self, directory: Path, *, version: str, committed: str | None) -> None:
+        """Load the snapshot of the committed run, if any.
+
+        Args:
+            directory: Directory the snapshots of the stream partition are stored in.
+            version: The version of the emitted records.
+            committed: The run id recorded in the committed state.
+        """
+        self.directory = directory
+        self.version = version
+        self.committed = committed
+        self.run = uuid.uuid4().hex
+        self._previous: dict[str, str] = {}
+        self._current: dict[str, str] = {}
+        path = directory / f"{committed}.json"
+        if committed and path.exists():
+            stored = json.loads(path.read_text(encoding="utf-8"))
+            if stored.get("version") == version:
+                self._previous = stored["hashes"]
+
+    def __len__(self) -> int:
+        """Return the number of records in the previous snapshot."""
+        return len(self._previous)
+
+    def changed(self, record: dict) -> bool:
+        """Add a record to the current snapshot, and return whether it is new or changed since the previous one."""
+        key, digest = record_id(record), record_digest(record)
+        self._current[key] = digest
+        return self._previous.get(key) != digest
+
+    def removed(self) -> list[str]:
+        """Return the ids of the records in the previous snapshot that are not in the current one."""
+        return [key for key in self._previous if key not in self._current]
+
+    def save(self) -> None:
+        """Save the current snapshot as this run's, and remove those of runs that were never committed.
+
+        The committed snapshot is kept until the state recording this run is.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f"{self.run}.tmp"
+        tmp_path.write_text(json.dumps({"version": self.version, "hashes": self._current}), encoding="utf-8")
+        tmp_path.replace(self.directory / f"{self.run}.json")
+        for path in self.directory.glob("*.json"):
+            if path.stem not in {self.committed, self.run}:
+                path.unlink()
+
+
+def snapshot_path(directory: str, stream_name: str, context: t.Mapping | None) -> Path:
+    """Return the directory of the snapshots of a stream partition."""
+    suffix = "".join(f"-{key}={value}" for key, value in sorted((context or {}).items()))
+    return Path(directory) / f"{stream_name}{suffix}"
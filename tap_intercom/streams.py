@@ -3,23 +3,20 @@
 from __future__ import annotations
 
 import decimal
+import time
 import typing as t
+from functools import cached_property
 from urllib.parse import parse_qsl
 
+from tap_intercom.bodies import DEFAULT_MAX_BODY_BYTES, BodyLimiter, BodyMode, BodySpillFile
 from tap_intercom.client import IntercomHATEOASPaginator, IntercomStream
-from tap_intercom.schemas import (
-    admins_schema,
-    articles_extended_schema,
-    articles_schema,
-    contacts_schema,
-    conversation_parts_schema,
-    conversations_schema,
-    tags_schema,
-    teams_schema,
-)
+from tap_intercom.workqueue import DEFAULT_CLAIM_SIZE, DEFAULT_LEASE_SECONDS, WorkQueue
 
 if t.TYPE_CHECKING:
     import requests
+    from singer_sdk.helpers.types import Context
+
+WORK_QUEUE_POLL_SECONDS = 5.0
 
 
 class ConversationsStream(IntercomStream):
@@ -30,26 +27,140 @@ class ConversationsStream(IntercomStream):
     replication_key = "updated_at"
     records_jsonpath = "$.conversations[*]"
     http_method = "POST"
-    schema = conversations_schema
-    is_sorted = False
+    # Searches are sorted by ascending `updated_at`.
+    is_sorted = True
+    adaptive_concurrency = True
 
-    def get_child_context(self, record: dict, context: dict | None) -> dict:  # noqa: ARG002
+    def get_child_context(self, record: dict, context: Context | None) -> dict:  # noqa: ARG002
         """Return a context dictionary for child streams."""
         return {"conversation_id": record["id"]}
 
+    @property
+    def work_queue_role(self) -> str | None:
+        """Return the role of this tap in the `work_queue`, if one is configured."""
+        return (self.config.get("work_queue") or {}).get("role")
+
+    @cached_property
+    def work_queue(self) -> WorkQueue:
+        """Return the queue conversation part fetches are distributed through."""
+        options = self.config["work_queue"]
+        return WorkQueue(
+            options["path"],
+            lease_seconds=options.get("lease_seconds") or DEFAULT_LEASE_SECONDS,
+            worker_id=options.get("worker_id"),
+        )
+
+    def sync_stream_records(self, context: Context | None, *, write_messages: bool) -> t.Iterator[dict]:
+        """Sync this stream, or with a `work_queue` worker role, the conversations queued by the producer.
+
+        Args:
+            context: Stream partition or context dictionary.
+            write_messages: Whether to write Singer messages.
+
+        Yields:
+            Each record from the source, none for workers.
+        """
+        if self.work_queue_role == "worker":
+            self.sync_queued_children()
+            return
+        if self.work_queue_role != "producer":
+            yield from super().sync_stream_records(context, write_messages=write_messages)
+            return
+        self.work_queue.set_producing(producing=True)
+        try:
+            yield from super().sync_stream_records(context, write_messages=write_messages)
+        finally:
+            self.work_queue.flush()
+            self.work_queue.set_producing(producing=False)
+
+    @property
+    def prefetched_children(self) -> list[IntercomStream]:
+        """Return the child streams whose records can be fetched ahead, none when producing for workers."""
+        if self.work_queue_role == "producer":
+            return []
+        return super().prefetched_children
+
+    def generate_child_contexts(self, record: dict, context: Context | None) -> t.Iterable[Context | None]:
+        """Generate the child contexts of a record, or queue them for workers when producing.
+
+        Args:
+            record: Individual record in the stream.
+            context: Stream partition or context dictionary.
+
+        Yields:
+            A child context for each child stream sync.
+        """
+        child_contexts = super().generate_child_contexts(record, context)
+        if self.work_queue_role != "producer":
+            yield from child_contexts
+            return
+        for child_context in child_contexts:
+            if child_context is not None:
+                self.work_queue.put(child_context)
+
+    def _write_state_message(self) -> None:
+        """Write a STATE message, once the conversations up to the bookmark are queued."""
+        if self.work_queue_role == "producer":
+            self.work_queue.flush()
+        super()._write_state_message()
+
+    def sync_queued_children(self) -> None:
+        """Sync the child records of the conversations in the queue, until it is drained.
+
+        Conversations are claimed in batches and acknowledged once their child
+        records are written to stdout. The worker waits while the producer is
+        still queueing, or other workers hold leases that may expire. No new
+        batches are claimed once the run deadline is reached.
+        """
+        queue = self.work_queue
+        self.logger.info("Syncing the children of queued conversations: %s.", queue.counts())
+        while not self.tap.deadline_reached:
+            contexts = queue.claim(DEFAULT_CLAIM_SIZE)
+            if not contexts:
+                counts = queue.counts()
+                if not counts["pending"] and not counts["leased"] and not queue.producing:
+                    break
+                time.sleep(min(WORK_QUEUE_POLL_SECONDS, queue.lease_seconds))
+                continue
+
+            for child_context in contexts:
+                if self.tap.get_concurrency_limiter(child_context.get("workspace_id")) is not None:
+                    for child in self.prefetched_children:
+                        child.prefetch(child_context)
+            for child_context in contexts:
+                self._sync_children(child_context)
+            self.tap.message_writer.flush()
+            queue.ack(contexts)
+        if self.tap.deadline_reached:
+            self.logger.info("Stopped claiming queued conversations at the run deadline: %s.", queue.counts())
+            return
+        self.logger.info("Queue drained: %s.", queue.counts())
+
 
 class ConversationPartsStream(IntercomStream):
     """Stream for Intercom conversation parts."""
 
     name = "conversation_parts"
     parent_stream_type = ConversationsStream
-    state_partitioning_keys: t.ClassVar[list[str]] = []
+    state_partitioning_keys: t.ClassVar[list[str]] = ["workspace_id"]
     path = "/conversations/{conversation_id}"
     primary_keys: t.ClassVar[list[str]] = ["id"]
     records_jsonpath = "$.conversation_parts.conversation_parts[*]"
-    schema = conversation_parts_schema
-
-    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
+    hedge_requests = True
+    adaptive_concurrency = True
+
+    @cached_property
+    def body_limiter(self) -> BodyLimiter:
+        """Return the size limit on bodies, from the `conversation_parts_body` setting."""
+        options = self.config.get("conversation_parts_body") or {}
+        mode = BodyMode(options.get("mode") or BodyMode.KEEP)
+        return BodyLimiter(
+            mode,
+            max_bytes=options.get("max_bytes") or DEFAULT_MAX_BODY_BYTES,
+            spill=BodySpillFile(options["spill_dir"], self.name) if mode == BodyMode.SPILL else None,
+        )
+
+    def post_process(self, row: dict, context: Context | None = None) -> dict | None:
         """As needed, append or transform raw data to match expected structure.
 
         Args:
@@ -60,7 +171,7 @@ class ConversationPartsStream(IntercomStream):
             The resulting record dict, or `None` if the record should be excluded.
         """
         row["conversation_id"] = context["conversation_id"]
-        return row
+        return self.body_limiter.apply(row)
 
 
 class AdminsStream(IntercomStream):
@@ -69,7 +180,8 @@ class AdminsStream(IntercomStream):
     name = "admins"
     path = "/admins"
     records_jsonpath = "$.admins[*]"
-    schema = admins_schema
+    raw_passthrough = True
+    snapshot_diff = True
 
 
 class TagsStream(IntercomStream):
@@ -77,7 +189,8 @@ class TagsStream(IntercomStream):
 
     name = "tags"
     path = "/tags"
-    schema = tags_schema
+    raw_passthrough = True
+    snapshot_diff = True
 
 
 class TeamsStream(IntercomStream):
@@ -86,7 +199,8 @@ class TeamsStream(IntercomStream):
     name = "teams"
     path = "/teams"
     records_jsonpath = "$.teams[*]"
-    schema = teams_schema
+    raw_passthrough = True
+    snapshot_diff = True
 
 
 class ContactsStream(IntercomStream):
@@ -96,7 +210,9 @@ class ContactsStream(IntercomStream):
     path = "/contacts/search"
     replication_key = "updated_at"
     http_method = "POST"
-    schema = contacts_schema
+    # Searches are sorted by ascending `updated_at`.
+    is_sorted = True
+    adaptive_concurrency = True
 
 
 class ArticlesStream(IntercomStream):
@@ -105,7 +221,6 @@ class ArticlesStream(IntercomStream):
     name = "articles"
     path = "/articles"
     records_jsonpath = "$.data[*]"
-    schema = articles_schema
 
     def get_new_paginator(self) -> IntercomHATEOASPaginator:
         """Return a new paginator instance for the articles stream.
@@ -117,7 +232,7 @@ class ArticlesStream(IntercomStream):
 
     def get_url_params(
         self,
-        context: dict | None,
+        context: Context | None,
         next_page_token: object,
     ) -> dict:
         """Return URL params for the request.
@@ -136,7 +251,7 @@ class ArticlesStream(IntercomStream):
 
         return params
 
-    def get_child_context(self, record: dict, context: dict | None) -> dict:  # noqa: ARG002
+    def get_child_context(self, record: dict, context: Context | None) -> dict:  # noqa: ARG002
         """Return a context dictionary for child streams."""
         return {"article_id": record["id"]}
 
@@ -147,9 +262,10 @@ class ArticlesExtendedStream(IntercomStream):
     name = "articles_extended"
     path = "/articles/{article_id}"
     records_jsonpath = "$"
-    schema = articles_extended_schema
     parent_stream_type = ArticlesStream
-    state_partitioning_keys: t.ClassVar[list[str]] = []
+    state_partitioning_keys: t.ClassVar[list[str]] = ["workspace_id"]
+    adaptive_concurrency = True
+    raw_passthrough = True
 
     def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
         """Parse the response and return an iterator of result records.
@@ -160,4 +276,8 @@ class ArticlesExtendedStream(IntercomStream):
         Yields:
             One item for every item found in the response.
         """
+        records = self.parse_raw_records(response)
+        if records is not None:
+            yield from records
+            return
         yield response.json(parse_float=decimal.Decimal)
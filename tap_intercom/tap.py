@@ -2,24 +2,63 @@
 
 from __future__ import annotations
 
+import threading
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
+
 from singer_sdk import Tap
 from singer_sdk import typing as th  # JSON schema typing helpers
+from singer_sdk.exceptions import ConfigValidationError
 
 from tap_intercom import streams
+from tap_intercom.archive import DEFAULT_SEGMENT_BYTES, ResponseArchive
+from tap_intercom.deadline import RunDeadline
+from tap_intercom.interning import StringInterner
+from tap_intercom.memory import MemoryProfiler
+from tap_intercom.ratelimit import AIMDLimiter, TokenBucket
+from tap_intercom.tracing import Tracer
+from tap_intercom.writer import ConcurrentStateWriter, DiscardingWriter, IntercomSingerWriter
 
 
 class TapIntercom(Tap):
     """Intercom tap class."""
 
     name = "tap-intercom"
+    message_writer_class = IntercomSingerWriter
+    message_writer: IntercomSingerWriter
 
     config_jsonschema = th.PropertiesList(
         th.Property(
             "access_token",
             th.StringType,
-            required=True,
             secret=True,  # Flag config as protected.
-            description="The key to authenticate against the API service",
+            description="The key to authenticate against the API service. Required unless `workspaces` is set.",
+        ),
+        th.Property(
+            "workspaces",
+            th.ArrayType(
+                th.ObjectType(
+                    th.Property("workspace_id", th.StringType, required=True),
+                    th.Property("access_token", th.StringType, required=True, secret=True),
+                    th.Property("api_url", th.StringType),
+                    th.Property("filters", th.ObjectType(additional_properties=True)),
+                ),
+            ),
+            description=(
+                "Workspaces to extract concurrently in one run, each with its Intercom `workspace_id`, "
+                "its own `access_token` and optionally its own `api_url` and `filters`. Every record and "
+                "primary key gets the `workspace_id`, and bookmarks are kept per workspace."
+            ),
+        ),
+        th.Property(
+            "api_url",
+            th.StringType,
+            default="https://api.intercom.io",
+            description=(
+                "The API URL root, e.g. `https://api.eu.intercom.io` or `https://api.au.intercom.io` "
+                "for workspaces hosted outside the US region"
+            ),
         ),
         th.Property(
             "start_date",
@@ -57,14 +96,453 @@ class TapIntercom(Tap):
             ),
             description="Filters to apply to the API request (only for search endpoints)",
         ),
+        th.Property(
+            "dedupe_index_dir",
+            th.StringType,
+            description=(
+                "Directory for a persistent index of the `(id, updated_at)` pairs emitted by incremental "
+                "streams. Records replayed by `replication_lookback_window_seconds` that were already "
+                "emitted by a previous run are skipped. Disabled when not set."
+            ),
+        ),
+        th.Property(
+            "dedupe_index_max_entries",
+            th.IntegerType,
+            default=1_000_000,
+            description="Max number of entries kept per stream in the dedupe index (16 bytes each)",
+        ),
+        th.Property(
+            "snapshot_diff_dir",
+            th.StringType,
+            description=(
+                "Directory for a snapshot of the content hashes of `admins`, `teams` and `tags` records. Only "
+                "records that are new or changed since the previous run are emitted. Disabled when not set."
+            ),
+        ),
+        th.Property(
+            "snapshot_diff_tombstones",
+            th.BooleanType,
+            default=False,
+            description=(
+                "With `snapshot_diff_dir`, emit a record with only `id` and `_sdc_deleted_at` for every record "
+                "that disappeared since the previous run"
+            ),
+        ),
+        th.Property(
+            "shard_count",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Number of tap processes the extraction is split across. Search streams are split by "
+                "`updated_at` range (requires `end_date`, and `start_date` without a bookmark), other streams by "
+                "a hash of the record id."
+            ),
+        ),
+        th.Property(
+            "shard_index",
+            th.IntegerType,
+            default=0,
+            description="Zero-based index of the shard extracted by this tap process",
+        ),
+        th.Property(
+            "conversation_parts_body",
+            th.ObjectType(
+                th.Property(
+                    "mode",
+                    th.StringType,
+                    allowed_values=["keep", "truncate", "hash", "spill"],
+                    description="What to do with bodies above `max_bytes`",
+                ),
+                th.Property("max_bytes", th.IntegerType, description="Size limit of bodies, in UTF-8 bytes"),
+                th.Property("spill_dir", th.StringType, description="Directory of the gzip side files of `spill`"),
+            ),
+            description=(
+                "Size limit on the `body` of `conversation_parts`. Larger bodies are truncated, dropped with "
+                "their SHA-256 kept (`hash`), or moved to gzip side files with a `body_ref` (`spill`). "
+                "Defaults to `keep` and 65536 bytes."
+            ),
+        ),
+        th.Property(
+            "work_queue",
+            th.ObjectType(
+                th.Property("path", th.StringType, required=True, description="SQLite file of the queue"),
+                th.Property(
+                    "role",
+                    th.StringType,
+                    required=True,
+                    allowed_values=["producer", "worker"],
+                    description="`producer` queues conversations, `worker` syncs their parts",
+                ),
+                th.Property(
+                    "lease_seconds",
+                    th.NumberType,
+                    description="Seconds a worker holds claimed conversations before others may claim them",
+                ),
+                th.Property("worker_id", th.StringType, description="Name of the worker, random by default"),
+            ),
+            description=(
+                "Distribute `conversation_parts` fetches over several tap processes through a durable queue. "
+                "The producer syncs `conversations` and queues their ids, workers claim them with a lease, "
+                "sync their parts and acknowledge them."
+            ),
+        ),
+        th.Property(
+            "state_checkpoint_records",
+            th.IntegerType,
+            default=10000,
+            description="Write a STATE message after this many records of a stream",
+        ),
+        th.Property(
+            "state_checkpoint_seconds",
+            th.NumberType,
+            description="Write a STATE message after this many seconds of a stream's sync",
+        ),
+        th.Property(
+            "state_checkpoint_pages",
+            th.IntegerType,
+            description="Write a STATE message after this many pages of a stream",
+        ),
+        th.Property(
+            "checkpoint_children_with_parent",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Let child streams, e.g. `conversation_parts`, checkpoint with their parent's STATE messages "
+                "instead of writing one after every parent record"
+            ),
+        ),
+        th.Property(
+            "max_requests_per_minute",
+            th.IntegerType,
+            description=(
+                "Max number of API requests sent per minute, including retries and hedged requests. "
+                "Unlimited when not set."
+            ),
+        ),
+        th.Property(
+            "max_concurrent_requests",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Max number of concurrent `conversation_parts`, `articles_extended` and search requests. "
+                "Above 1, child records are fetched ahead and the number of requests in flight adapts "
+                "between 1 and this value, backing off on 429s and rising latency."
+            ),
+        ),
+        th.Property(
+            "parent_read_ahead_records",
+            th.IntegerType,
+            default=0,
+            description=(
+                "Max number of `conversations` and `articles` records fetched ahead in the background while "
+                "their child records are synced, so parent and child requests overlap. 0, the default, "
+                "disables read-ahead."
+            ),
+        ),
+        th.Property(
+            "max_parallel_streams",
+            th.IntegerType,
+            default=1,
+            description=(
+                "Max number of top-level streams synced concurrently, each with its child streams. "
+                "Search streams start first, so the cheap streams run alongside them."
+            ),
+        ),
+        th.Property(
+            "adaptive_timeouts",
+            th.BooleanType,
+            default=False,
+            description="Derive request timeouts from the observed p99 latency of each endpoint",
+        ),
+        th.Property(
+            "hedge_requests",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Send a duplicate `conversation_parts` request when the first has not answered after the "
+                "endpoint's p95 latency, and use whichever response arrives first"
+            ),
+        ),
+        th.Property(
+            "raw_passthrough",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Write `admins`, `teams`, `tags` and `articles_extended` records as the raw JSON the API sent, "
+                "without decoding them. Records are then not conformed to the stream schema. Ignored when stream "
+                "maps, flattening, deselected properties, `workspaces`, sharding or `batch_config` apply."
+            ),
+        ),
+        th.Property(
+            "archive",
+            th.ObjectType(
+                th.Property("dir", th.StringType, required=True, description="Directory of the archive"),
+                th.Property(
+                    "mode",
+                    th.StringType,
+                    allowed_values=["record", "replay"],
+                    description="`record` archives every response received, `replay` syncs from the archive",
+                ),
+                th.Property("segment_bytes", th.IntegerType, description="Size of the archive's segment files"),
+                th.Property(
+                    "replay_run",
+                    th.StringType,
+                    description="Run to replay, from the archive's `index-<run>.jsonl` files; defaults to the last one",
+                ),
+                th.Property("replay_since", th.NumberType, description="Only replay pages received since this time"),
+                th.Property("replay_until", th.NumberType, description="Only replay pages received until this time"),
+            ),
+            description=(
+                "Archive the raw API responses to gzip segment files, indexed by stream, context and time, "
+                "and replay them later without any API request, e.g. after changing stream maps. "
+                "Defaults to `record`; times are Unix timestamps."
+            ),
+        ),
+        th.Property(
+            "max_run_seconds",
+            th.IntegerType,
+            description=(
+                "Max duration of the run. As it approaches, incremental streams stop requesting new pages, "
+                "streams not started yet are skipped, and the run ends with a resumable STATE message."
+            ),
+        ),
+        th.Property(
+            "intern_strings",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Share one copy of the short strings repeated across records, such as keys, `type`, `state` "
+                "and admin ids. Lowers the memory of buffered pages and prefetched child records, at some "
+                "decoding cost."
+            ),
+        ),
+        th.Property(
+            "trace_file",
+            th.StringType,
+            description=(
+                "Write tracing spans of stream syncs, requests, child syncs, decoding, `post_process` and "
+                "message writes to this file, in the Chrome Trace Event format opened by Perfetto"
+            ),
+        ),
+        th.Property(
+            "memory_profile_file",
+            th.StringType,
+            description=(
+                "Profile memory with `tracemalloc` and write a JSON summary to this file: peak memory per "
+                "stream and pipeline stage, allocation snapshots per stream and the top allocation sites"
+            ),
+        ),
+        th.Property(
+            "estimate_only",
+            th.BooleanType,
+            default=False,
+            description=(
+                "Dry run: send a single `per_page=1` search per selected search stream and log how many "
+                "records a sync would extract, without extracting them or writing any messages"
+            ),
+        ),
+        th.Property(
+            "parquet_row_group_size",
+            th.IntegerType,
+            default=10000,
+            description=(
+                "Max number of rows per row group when `batch_config.encoding.format` is `parquet`. "
+                "Bounds the number of records buffered in memory while writing batch files."
+            ),
+        ),
     ).to_dict()
 
+    def __init__(self, *args: t.Any, **kwargs: t.Any) -> None:
+        """Initialize the tap."""
+        super().__init__(*args, **kwargs)
+        if self.config.get("estimate_only"):
+            self.message_writer = DiscardingWriter()
+        # Streams may update and write state from concurrent threads, see `max_parallel_streams`.
+        self.state_lock = threading.RLock()
+        self._background = threading.local()
+        self._stream_executor: ThreadPoolExecutor | None = None
+        self._parallel_syncs: dict[str, Future] | None = None
+        self._state_writer = ConcurrentStateWriter(self.message_writer, self.state_lock)
+        max_run_seconds = self.config.get("max_run_seconds")
+        self.run_deadline = RunDeadline(max_run_seconds) if max_run_seconds else None
+
+    @property
+    def deadline_reached(self) -> bool:
+        """Return whether the `max_run_seconds` deadline is near enough to stop requesting pages."""
+        return self.run_deadline is not None and self.run_deadline.reached
+
+    @cached_property
+    def workspaces(self) -> dict[str, dict]:
+        """Return the configured workspaces by id."""
+        return {workspace["workspace_id"]: workspace for workspace in self.config.get("workspaces") or []}
+
+    @cached_property
+    def _rate_limiters(self) -> dict[str | None, TokenBucket | None]:
+        return {}
+
+    @cached_property
+    def _concurrency_limiters(self) -> dict[str | None, AIMDLimiter | None]:
+        return {}
+
+    def get_rate_limiter(self, workspace_id: str | None = None) -> TokenBucket | None:
+        """Return the rate limiter of a workspace, if `max_requests_per_minute` is set.
+
+        Args:
+            workspace_id: The workspace, None when extracting a single one.
+
+        Returns:
+            The workspace's rate limiter, shared by all its streams.
+        """
+        if workspace_id not in self._rate_limiters:
+            rate = self.config.get("max_requests_per_minute")
+            self._rate_limiters.setdefault(workspace_id, TokenBucket(rate) if rate else None)
+        return self._rate_limiters[workspace_id]
+
+    def get_concurrency_limiter(self, workspace_id: str | None = None) -> AIMDLimiter | None:
+        """Return the adaptive concurrency limiter of a workspace, if `max_concurrent_requests` is above 1.
+
+        Args:
+            workspace_id: The workspace, None when extracting a single one.
+
+        Returns:
+            The workspace's concurrency limiter, shared by all its streams.
+        """
+        if workspace_id not in self._concurrency_limiters:
+            max_concurrent_requests = self.config.get("max_concurrent_requests") or 1
+            self._concurrency_limiters.setdefault(
+                workspace_id,
+                AIMDLimiter(max_concurrent_requests) if max_concurrent_requests > 1 else None,
+            )
+        return self._concurrency_limiters[workspace_id]
+
+    @cached_property
+    def string_interner(self) -> StringInterner | None:
+        """Return the table of strings shared by all streams' records, if `intern_strings` is set."""
+        return StringInterner() if self.config.get("intern_strings") else None
+
+    @cached_property
+    def tracer(self) -> Tracer | None:
+        """Return the writer of tracing spans, if `trace_file` is set."""
+        path = self.config.get("trace_file")
+        return Tracer(path) if path else None
+
+    @cached_property
+    def memory_profiler(self) -> MemoryProfiler | None:
+        """Return the memory profiler, if `memory_profile_file` is set."""
+        return MemoryProfiler() if self.config.get("memory_profile_file") else None
+
+    @cached_property
+    def response_archive(self) -> ResponseArchive | None:
+        """Return the archive of raw API responses, if `archive` is set."""
+        options = self.config.get("archive")
+        if not options or (options.get("mode") != "replay" and self.config.get("estimate_only")):
+            return None
+        return ResponseArchive(options["dir"], segment_bytes=options.get("segment_bytes") or DEFAULT_SEGMENT_BYTES)
+
+    @cached_property
+    def replay_run(self) -> str | None:
+        """Return the archived run replayed: `archive.replay_run`, or else the last one started."""
+        run = self.config["archive"].get("replay_run")
+        if run is None:
+            runs = t.cast("ResponseArchive", self.response_archive).runs()
+            run = runs[-1] if runs else None
+        self.logger.info("Replaying the archived run '%s'.", run)
+        return run
+
+    @cached_property
+    def request_executor(self) -> ThreadPoolExecutor:
+        """Return the thread pool child records are fetched ahead in."""
+        return ThreadPoolExecutor(
+            max_workers=self.config.get("max_concurrent_requests") or 1,
+            thread_name_prefix="prefetch",
+        )
+
+    @property
+    def in_background_sync(self) -> bool:
+        """Return whether the current thread syncs a stream in the background, see `start_parallel_syncs`."""
+        return getattr(self._background, "active", False)
+
+    def start_parallel_syncs(self, first: streams.IntercomStream) -> None:
+        """Start syncing the other top-level streams in the background, if `max_parallel_streams` is above 1.
+
+        Called when the SDK starts syncing its first top-level stream. Up to
+        `max_parallel_streams - 1` of the others, search streams first as they take the
+        longest, then sync in background threads while the SDK syncs its streams in
+        order, waiting for those already started, see `wait_for_parallel_sync`. The
+        message writer serializes the streams' messages, each stream's stay in order.
+
+        Args:
+            first: The stream the SDK is starting to sync.
+        """
+        max_parallel_streams = self.config.get("max_parallel_streams") or 1
+        if max_parallel_streams <= 1 or self._parallel_syncs is not None:
+            return
+        pending = []
+        for stream in t.cast("dict[str, streams.IntercomStream]", self.streams).values():
+            if not stream.selected and not stream.has_selected_descendents:
+                continue
+            # Create every state entry up front, so concurrent syncs only update their own.
+            for partition in stream.partitions or [{}]:
+                stream.get_context_state(partition or None)
+            if not stream.parent_stream_type and stream is not first:
+                pending.append(stream)
+        pending.sort(key=lambda stream: stream.http_method != "POST")
+
+        self._stream_executor = ThreadPoolExecutor(max_workers=max_parallel_streams - 1, thread_name_prefix="stream")
+        self._parallel_syncs = {
+            stream.name: self._stream_executor.submit(self._sync_in_background, stream) for stream in pending
+        }
+
+    def _sync_in_background(self, stream: streams.IntercomStream) -> None:
+        self._background.active = True
+        stream.sync()
+
+    def wait_for_parallel_sync(self, stream: streams.IntercomStream) -> bool:
+        """Wait for a stream's sync in the background to complete, if it started.
+
+        Args:
+            stream: The top-level stream the SDK is about to sync.
+
+        Returns:
+            Whether the stream was synced in the background, else the SDK syncs it.
+        """
+        future = (self._parallel_syncs or {}).pop(stream.name, None)
+        if future is None or future.cancel():
+            return False
+        future.result()
+        return True
+
+    def finish_sync(self) -> None:
+        """Write out any buffered messages and close the run's files, once the sync ends or fails."""
+        if self._stream_executor is not None:
+            # Let running syncs finish after a failure, but do not start new ones.
+            self._stream_executor.shutdown(cancel_futures=True)
+        self.message_writer.flush()
+        if self.response_archive is not None:
+            self.response_archive.close()
+        if self.tracer is not None:
+            self.tracer.close()
+        if self.memory_profiler is not None:
+            self.memory_profiler.write_summary(self.config["memory_profile_file"], self.logger)
+
     def discover_streams(self) -> list[streams.IntercomStream]:
         """Return a list of discovered streams.
 
         Returns:
             A list of discovered streams.
+
+        Raises:
+            ConfigValidationError: If neither `access_token` nor `workspaces` is set outside replays, or
+                bodies are spilled without `spill_dir`.
         """
+        replaying = (self.config.get("archive") or {}).get("mode") == "replay"
+        if not self.config.get("access_token") and not self.config.get("workspaces") and not replaying:
+            msg = "Either `access_token` or `workspaces` is required."
+            raise ConfigValidationError(msg)
+        body_options = self.config.get("conversation_parts_body") or {}
+        if body_options.get("mode") == "spill" and not body_options.get("spill_dir"):
+            msg = "`conversation_parts_body.spill_dir` is required to spill bodies."
+            raise ConfigValidationError(msg)
         return [
             streams.ConversationsStream(self),
             streams.ConversationPartsStream(self),
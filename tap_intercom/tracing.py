@@ -0,0 +1,98 @@
+"""Tracing spans of a sync, written to a file in the Chrome Trace Event format.
+
+The file is a JSON array of complete ("X") events, one per line, which Perfetto
+(https://ui.perfetto.dev), `chrome://tracing` and other trace viewers open as a
+timeline per thread. Viewers accept the array without its closing bracket, so the
+spans of a crashed sync can be read as well.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class Tracer:
+    """Thread-safe writer of tracing spans."""
+
+    def __init__(self, path: str | Path) -> None:
+        """Open the trace file, replacing any previous trace.
+
+        Args:
+            path: The trace file.
+        """
+        self._file = Path(path).open("w", encoding="utf-8")  # noqa: SIM115
+        self._file.write("[")
+        self._separator = "\n"
+        self._pid = os.getpid()
+        self._origin_ns = time.perf_counter_ns()
+        self._threads: set[int | None] = set()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, **attributes: t.Any) -> Iterator[dict]:
+        """Trace the duration of the block.
+
+        Args:
+            name: Name of the span.
+            category: Category of the span, e.g. the stream name.
+            attributes: Attributes of the span.
+
+        Yields:
+            The attributes, which the block can add to.
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = type(e).__name__
+            raise
+        finally:
+            self._write_span(name, category, start_ns, time.perf_counter_ns(), attributes)
+
+    def _write_span(self, name: str, category: str, start_ns: int, end_ns: int, attributes: dict) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self._origin_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": thread.ident,
+            "args": attributes,
+        }
+        with self._lock:
+            if self._file.closed:
+                return
+            if thread.ident not in self._threads:
+                self._threads.add(thread.ident)
+                self._write_event(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": self._pid,
+                        "tid": thread.ident,
+                        "args": {"name": thread.name},
+                    }
+                )
+            self._write_event(event)
+
+    def _write_event(self, event: dict) -> None:
+        self._file.write(self._separator + json.dumps(event, default=str))
+        self._separator = ",\n"
+
+    def close(self) -> None:
+        """Complete the JSON array and close the file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.write("\n]\n")
+                self._file.close()
@@ -0,0 +1,199 @@
+"""Durable queue of child stream contexts, shared by one producer and several workers.
+
+The queue is a SQLite database. The producer adds the contexts of the child
+records to fetch, e.g. `{"conversation_id": ...}`, and workers claim them in
+batches with a lease. A worker acknowledges a context once its records are
+written, so the contexts of a worker that crashed are claimed again by another
+worker when their lease expires.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import typing as t
+import uuid
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from singer_sdk.helpers.types import Context
+
+DEFAULT_LEASE_SECONDS = 600.0
+DEFAULT_CLAIM_SIZE = 20
+ENQUEUE_BATCH_SIZE = 1000
+DEFAULT_HEARTBEAT_SECONDS = 30.0
+PRODUCER_TIMEOUT_SECONDS = 120.0
+
+_PENDING, _LEASED, _DONE = range(3)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    key TEXT PRIMARY KEY,
+    context TEXT NOT NULL,
+    status INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS items_claimable ON items (status, lease_until);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def context_key(context: Context) -> str:
+    """Return the key of a context in the queue."""
+    return json.dumps(context, sort_keys=True, separators=(",", ":"))
+
+
+class WorkQueue:
+    """SQLite queue of contexts with leases.
+
+    Contexts are enqueued in batches: `flush` must be called before the
+    producer's bookmark moves past them, which `put` does every
+    `ENQUEUE_BATCH_SIZE` contexts.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        worker_id: str | None = None,
+        heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS,
+    ) -> None:
+        """Open the queue, creating it if needed.
+
+        Args:
+            path: The database file.
+            lease_seconds: Seconds a claimed context stays reserved for the worker.
+            worker_id: Name of this worker, random by default.
+            heartbeat_seconds: Seconds between the heartbeats of a producer.
+        """
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self.heartbeat_seconds = heartbeat_seconds
+        self._heartbeat: tuple[threading.Event, threading.Thread] | None = None
+        self._connection = sqlite3.connect(str(path), timeout=60, isolation_level=None, check_same_thread=False)
+        # WAL needs shared memory, so it only works between processes on one host.
+        # The rollback journal only needs file locks, which a shared file system can provide.
+        self._connection.execute("PRAGMA journal_mode=DELETE")
+        self._connection.executescript(_SCHEMA)
+        self._pending: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def put(self, context: Context) -> None:
+        """Add a context to the queue, unless it is already waiting in it.
+
+        Contexts already done are queued again, as their records changed since.
+
+        Args:
+            context: The child context.
+        """
+        with self._lock:
+            self._pending.setdefault(context_key(context), json.dumps(context))
+            full = len(self._pending) >= ENQUEUE_BATCH_SIZE
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the contexts added since the last flush."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if pending:
+                with self._transaction():
+                    self._connection.executemany(
+                        "INSERT INTO items (key, context) VALUES (?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET status = ? WHERE status = ?",
+                        [(key, context, _PENDING, _DONE) for key, context in pending.items()],
+                    )
+
+    def set_producing(self, *, producing: bool) -> None:
+        """Record whether a producer is still adding contexts, for workers to wait on it.
+
+        While producing, a heartbeat renews the record every `heartbeat_seconds`.
+        Workers stop waiting on a producer whose heartbeat is older than
+        `PRODUCER_TIMEOUT_SECONDS`, e.g. because it was killed before it could
+        record that it stopped.
+        """
+        if self._heartbeat is not None:
+            stop, thread = self._heartbeat
+            stop.set()
+            # Wait for a heartbeat being written, so it cannot overwrite the one below.
+            thread.join()
+            self._heartbeat = None
+        self._write_heartbeat(time.time() if producing else 0.0)
+        if producing:
+            stop = threading.Event()
+            thread = threading.Thread(target=self._beat, args=(stop,), name="work-queue-heartbeat", daemon=True)
+            self._heartbeat = stop, thread
+            thread.start()
+
+    def _beat(self, stop: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_seconds):
+            self._write_heartbeat(time.time())
+
+    def _write_heartbeat(self, value: float) -> None:
+        with self._lock, self._transaction():
+            self._connection.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('producing', ?)", (value,))
+
+    @property
+    def producing(self) -> bool:
+        """Return whether a producer is still adding contexts, as of its last heartbeat."""
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE name = 'producing'").fetchone()
+        return row is not None and float(row[0]) > time.time() - PRODUCER_TIMEOUT_SECONDS
+
+    def claim(self, limit: int = DEFAULT_CLAIM_SIZE) -> list[dict]:
+        """Lease up to `limit` pending contexts, or contexts whose lease expired.
+
+        Args:
+            limit: The max number of contexts to claim.
+
+        Returns:
+            The claimed contexts.
+        """
+        now = time.time()
+        with self._lock, self._transaction():
+            rows = self._connection.execute(
+                "SELECT key, context FROM items WHERE status = ? OR (status = ? AND lease_until < ?) LIMIT ?",
+                (_PENDING, _LEASED, now, limit),
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE items SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE key = ?",
+                [(_LEASED, self.worker_id, now + self.lease_seconds, key) for key, _ in rows],
+            )
+        return [json.loads(context) for _, context in rows]
+
+    def ack(self, contexts: t.Iterable[dict]) -> None:
+        """Mark contexts claimed by this worker as done.
+
+        Args:
+            contexts: The contexts whose records were written.
+        """
+        with self._lock, self._transaction():
+            self._connection.executemany(
+                "UPDATE items SET status = ?, lease_until = NULL WHERE key = ? AND worker = ?",
+                [(_DONE, context_key(context), self.worker_id) for context in contexts],
+            )
+
+    def counts(self) -> dict[str, int]:
+        """Return the number of pending, leased and done contexts."""
+        with self._lock:
+            rows = self._connection.execute("SELECT status, COUNT(*) FROM items GROUP BY status").fetchall()
+        counts = dict(rows)
+        return {"pending": counts.get(_PENDING, 0), "leased": counts.get(_LEASED, 0), "done": counts.get(_DONE, 0)}
+
+    def close(self) -> None:
+        """Write any pending contexts, stop any heartbeat and close the database."""
+        self.flush()
+        if self._heartbeat is not None:
+            self.set_producing(producing=False)
+        self._connection.close()
+
+    def _transaction(self) -> sqlite3.Connection:
+        # BEGIN IMMEDIATE takes the write lock upfront, so two workers never claim the same rows.
+        self._connection.execute("BEGIN IMMEDIATE")
+        return self._connection
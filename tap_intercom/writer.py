@@ -0,0 +1,158 @@
+"""Buffered Singer message writer with a fast JSON encoder, and a thread-safe state writer."""
+
+from __future__ import annotations
+
+import datetime as dt
+import sys
+import threading
+import typing as t
+
+from singer_sdk.helpers._state import StateWriter
+from singer_sdk.singerlib import RecordMessage, StateMessage
+from singer_sdk.singerlib.encoding.base import GenericSingerWriter
+from singer_sdk.singerlib.encoding.simple import Message
+from singer_sdk.singerlib.json import serialize_json
+
+if t.TYPE_CHECKING:
+    from singer_sdk.helpers import types
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None  # type: ignore[assignment]
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+def _enc_hook(obj: t.Any) -> t.Any:  # noqa: ANN401
+    return obj.isoformat(sep="T") if isinstance(obj, dt.datetime) else str(obj)
+
+
+def _get_encoder() -> t.Callable[[t.Any], bytes]:
+    """Return msgspec's encoder when installed, else the SDK's simplejson serializer.
+
+    Both write decimals as exact JSON numbers, unlike orjson which would have to
+    round them through float.
+    """
+    if msgspec is not None:
+        return msgspec.json.Encoder(enc_hook=_enc_hook, decimal_format="number").encode
+    return lambda obj: serialize_json(obj).encode()
+
+
+class IntercomSingerWriter(GenericSingerWriter[bytes, Message]):
+    """Singer writer that buffers encoded messages and writes stdout in chunks.
+
+    RECORD messages reuse a pre-encoded envelope per stream and version, so only
+    the record itself and the extraction time are encoded per message. The buffer
+    is flushed when it exceeds `buffer_size`, after every STATE message so the
+    target never sees a state ahead of its records, and when the tap finishes.
+    """
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        """Create a new writer.
+
+        Args:
+            buffer_size: Number of bytes to buffer before writing to stdout.
+        """
+        self.buffer_size = buffer_size
+        self._encode = _get_encoder()
+        self._buffer = bytearray()
+        self._envelopes: dict[tuple[str, int | None], bytes] = {}
+        self._lock = threading.Lock()
+
+    def _record_envelope(self, stream: str, version: int | None) -> bytes:
+        envelope = self._envelopes.get((stream, version))
+        if envelope is None:
+            header = self._encode({"type": "RECORD", "stream": stream})[:-1]
+            if version is not None:
+                header += b',"version":' + self._encode(version)
+            envelope = self._envelopes[stream, version] = header + b',"record":'
+        return envelope
+
+    def serialize_message(self, message: Message) -> bytes:
+        """Serialize a message into a line of json.
+
+        Args:
+            message: A Singer message object.
+
+        Returns:
+            The serialized message, including the trailing newline.
+        """
+        if not isinstance(message, RecordMessage):
+            return self._encode(message.to_dict()) + b"\n"
+
+        parts = [self._record_envelope(message.stream, message.version), self._encode(message.record)]
+        if message.time_extracted is not None:
+            parts.append(b',"time_extracted":"' + message.time_extracted.isoformat(sep="T").encode() + b'"')
+        parts.append(b"}\n")
+        return b"".join(parts)
+
+    def write_message(self, message: Message) -> None:
+        """Buffer a message, writing the buffer to stdout when needed.
+
+        Args:
+            message: The message to write.
+        """
+        data = self.format_message(message)
+        with self._lock:
+            self._buffer += data
+            if isinstance(message, StateMessage) or len(self._buffer) >= self.buffer_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """Write all buffered messages to stdout."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        binary_stdout = getattr(sys.stdout, "buffer", None)
+        if binary_stdout is None:
+            # stdout was replaced by a text-only stream, e.g. when output is captured.
+            sys.stdout.write(self._buffer.decode())
+        else:
+            sys.stdout.flush()
+            binary_stdout.write(self._buffer)
+            binary_stdout.flush()
+        self._buffer.clear()
+
+
+class ConcurrentStateWriter(StateWriter):
+    """State writer for streams synced in concurrent threads.
+
+    Every stream only updates its own entry of the shared state, but any stream
+    can write the whole state. Streams update the state while holding `lock`, and
+    the state is compared to the last one written and serialized while holding it
+    too, so a STATE message never contains a half-updated state.
+    """
+
+    def __init__(self, message_writer: GenericSingerWriter, lock: threading.RLock) -> None:
+        """Create a new state writer.
+
+        Args:
+            message_writer: The message writer of the tap.
+            lock: The lock held by every change to the tap state.
+        """
+        super().__init__(message_writer)
+        self.lock = lock
+
+    def write_state(self, state: types.TapState) -> None:
+        """Write a STATE message if the state changed since the last one.
+
+        Args:
+            state: The tap state.
+        """
+        with self.lock:
+            super().write_state(state)
+
+
+class DiscardingWriter(IntercomSingerWriter):
+    """Singer writer dropping every message, for `estimate_only` dry runs."""
+
+    def write_message(self, message: Message) -> None:
+        """Drop a message.
+
+        Args:
+            message: The message not written.
+        """
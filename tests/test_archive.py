@@ -0,0 +1,107 @@
+"""Tests for the archive of raw API responses and its replay."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+from tap_intercom.archive import ResponseArchive
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tap_intercom.streams import ArticlesExtendedStream, TagsStream
+
+
+def test_pages_are_read_back_per_context(tmp_path: Path) -> None:
+    """Pages are read back in fetch order, per stream and context, across segment files."""
+    archive = ResponseArchive(tmp_path, segment_bytes=1)
+    archive.append("conversation_parts", {"conversation_id": "1"}, b"first")
+    archive.append("conversation_parts", {"conversation_id": "2"}, b"other")
+    archive.append("conversation_parts", {"conversation_id": "1"}, b"second")
+    archive.close()
+
+    replay = ResponseArchive(tmp_path)
+    assert list(replay.pages("conversation_parts", {"conversation_id": "1"})) == [b"first", b"second"]
+    assert list(replay.pages("conversations", None)) == []
+    assert len(list(tmp_path.glob("*.gz"))) == 3
+
+
+def test_pages_are_filtered_by_fetch_time(tmp_path: Path) -> None:
+    """Only pages fetched in the requested time range are replayed."""
+    archive = ResponseArchive(tmp_path)
+    archive.append("tags", None, b"old")
+    archive.close()
+    [index] = tmp_path.glob("index-*.jsonl")
+    fetched_at = json.loads(index.read_text())["fetched_at"]
+    archive = ResponseArchive(tmp_path)
+    archive.append("tags", None, b"new")
+    archive.close()
+
+    replay = ResponseArchive(tmp_path)
+    assert list(replay.pages("tags", None, until=fetched_at)) == [b"old"]
+    assert b"old" not in list(replay.pages("tags", None, since=fetched_at + 1e-6))
+
+
+def test_replay_makes_no_requests(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Replays parse the archived pages without an access token or any API request."""
+    archive = ResponseArchive(tmp_path)
+    archive.append("tags", None, json.dumps({"data": [{"id": "1", "name": "vip"}]}).encode())
+    archive.close()
+
+    tap = TapIntercom(config={"archive": {"dir": str(tmp_path), "mode": "replay"}})
+    tags = t.cast("TagsStream", tap.streams["tags"])
+
+    def fail(*args: t.Any) -> None:  # noqa: ARG001
+        msg = "No requests are sent when replaying"
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(tags, "_request", fail)
+    assert [record["name"] for record in tags.request_records(None)] == ["vip"]
+
+
+def test_replay_reads_a_single_run(
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Replaying an archive of several runs reads the last one, or the configured one, not all of them."""
+    for name in ("first", "last"):
+        archive = ResponseArchive(tmp_path)
+        articles = [{"id": "1", "title": name}, {"id": "2", "title": name}]
+        archive.append("articles", None, json.dumps({"data": articles}).encode())
+        for article in articles:
+            archive.append("articles_extended", {"article_id": article["id"]}, json.dumps(article).encode())
+        archive.close()
+    first_run = ResponseArchive(tmp_path).runs()[0]
+
+    for replay_run, title in ((None, "last"), (first_run, "first")):
+        options = {"dir": str(tmp_path), "mode": "replay", "replay_run": replay_run}
+        tap = TapIntercom(config={"archive": {key: value for key, value in options.items() if value}})
+        tap.streams["articles"].sync()
+        tap.message_writer.flush()
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        extended = [
+            message["record"]
+            for message in records
+            if message["type"] == "RECORD" and message["stream"] == "articles_extended"
+        ]
+        assert sorted(record["id"] for record in extended) == ["1", "2"]
+        assert {record["title"] for record in extended} == {title}
+
+
+def test_child_context_is_replayed_once(tmp_path: Path) -> None:
+    """A parent record replayed again does not replay its children's pages again."""
+    archive = ResponseArchive(tmp_path)
+    archive.append("articles_extended", {"article_id": "1"}, json.dumps({"id": "1"}).encode())
+    archive.close()
+
+    extended = t.cast(
+        "ArticlesExtendedStream",
+        TapIntercom(config={"archive": {"dir": str(tmp_path), "mode": "replay"}}).streams["articles_extended"],
+    )
+    assert [record["id"] for record in extended.replay_records({"article_id": "1"})] == ["1"]
+    assert list(extended.replay_records({"article_id": "1"})) == []
@@ -0,0 +1,107 @@
+"""Tests for the schema-typed Parquet batcher."""
+
+from __future__ import annotations
+
+import contextlib
+import decimal
+import typing as t
+from urllib.parse import unquote, urlparse
+
+import pytest
+from singer_sdk.helpers._batch import BatchConfig
+
+from tap_intercom.batch import IntercomParquetBatcher
+from tap_intercom.schemas import articles_extended_schema
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _local_path(url: str) -> str:
+    return unquote(urlparse(url).path)
+
+
+def test_parquet_batches_are_typed_from_schema(tmp_path: Path) -> None:
+    """Records are split into files and row groups with schema-derived column types."""
+    batch_config = BatchConfig.from_dict(
+        {
+            "encoding": {"format": "parquet"},
+            "storage": {"root": str(tmp_path)},
+            "batch_size": 5,
+        },
+    )
+    batcher = IntercomParquetBatcher(
+        "tap-intercom",
+        "articles_extended",
+        batch_config,
+        schema=articles_extended_schema,
+        row_group_size=2,
+    )
+    records = [
+        {
+            "id": str(i),
+            "parent_ids": [1, 2],
+            "statistics": {"views": i, "happy_reaction_percentage": decimal.Decimal("0.5")},
+            "unknown_field": "dropped",
+        }
+        for i in range(7)
+    ]
+
+    manifests = list(batcher.get_batches(records))
+
+    assert len(manifests) == 2
+    table = pq.read_table(_local_path(manifests[0][0]))
+    assert table.num_rows == 5
+    assert table.schema.field("statistics").type == pa.struct(
+        [
+            ("views", pa.int64()),
+            ("conversions", pa.int64()),
+            ("reactions", pa.int64()),
+            ("happy_reaction_percentage", pa.float64()),
+            ("neutral_reaction_percentage", pa.float64()),
+            ("sad_reaction_percentage", pa.float64()),
+        ],
+    )
+    assert table.schema.field("parent_ids").type == pa.list_(pa.int64())
+    assert "unknown_field" not in table.schema.names
+    assert pq.ParquetFile(_local_path(manifests[0][0])).num_row_groups == 3
+    assert table.column("statistics").to_pylist()[1]["happy_reaction_percentage"] == 0.5
+
+
+def test_parquet_file_is_closed_when_records_fail(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A failure while reading records still completes the Parquet file, on storages keeping partial files."""
+    batch_config = BatchConfig.from_dict(
+        {
+            "encoding": {"format": "parquet"},
+            "storage": {"root": str(tmp_path)},
+            "batch_size": 5,
+        },
+    )
+    batcher = IntercomParquetBatcher(
+        "tap-intercom",
+        "articles_extended",
+        batch_config,
+        schema=articles_extended_schema,
+        row_group_size=2,
+    )
+
+    @contextlib.contextmanager
+    def open_file(filename: str, mode: str) -> t.Iterator[t.IO]:
+        with (tmp_path / filename).open(mode) as f:
+            yield f
+
+    monkeypatch.setattr(batch_config.storage, "open", open_file)
+
+    def records() -> t.Iterator[dict]:
+        yield from ({"id": str(i)} for i in range(3))
+        msg = "Stream failed"
+        raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError, match="Stream failed"):
+        list(batcher.get_batches(records()))
+
+    (path,) = tmp_path.glob("*.parquet")
+    assert pq.read_table(path).column("id").to_pylist() == ["0", "1"]
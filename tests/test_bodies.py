@@ -0,0 +1,61 @@
+"""Tests for the size limits on conversation part bodies."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import typing as t
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_intercom.bodies import BodyLimiter, BodyMode, BodySpillFile, read_spilled_body
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_small_bodies_are_kept() -> None:
+    """Bodies within the limit are left alone in every mode."""
+    record = {"id": "1", "body": "é" * 5}
+    assert BodyLimiter(BodyMode.HASH, max_bytes=10).apply(record) == {"id": "1", "body": "é" * 5}
+
+
+def test_truncate_and_hash() -> None:
+    """Truncated bodies stay valid UTF-8 and both modes keep the original's hash and length."""
+    body = "é" * 10
+    digest = hashlib.sha256(body.encode()).hexdigest()
+
+    truncated = BodyLimiter(BodyMode.TRUNCATE, max_bytes=5).apply({"body": body})
+    assert truncated == {"body": "éé", "body_sha256": digest, "body_length": 20}
+
+    hashed = BodyLimiter(BodyMode.HASH, max_bytes=5).apply({"body": body})
+    assert hashed == {"body": None, "body_sha256": digest, "body_length": 20}
+
+
+def test_spilled_bodies_can_be_read_back(tmp_path: Path) -> None:
+    """Every spilled body is a gzip member that can be read from its reference."""
+    limiter = BodyLimiter(BodyMode.SPILL, max_bytes=5, spill=BodySpillFile(tmp_path))
+    first = limiter.apply({"id": "1", "conversation_id": "c", "body": "a" * 10})
+    second = limiter.apply({"id": "2", "conversation_id": "c", "body": "b" * 10})
+
+    assert first["body"] is None
+    assert read_spilled_body(tmp_path, first["body_ref"]) == "a" * 10
+    assert read_spilled_body(tmp_path, second["body_ref"]) == "b" * 10
+    [path] = tmp_path.iterdir()
+    assert len(gzip.decompress(path.read_bytes()).splitlines()) == 2
+
+
+def test_stream_applies_configured_limit() -> None:
+    """conversation_parts applies the limit after adding the conversation id."""
+    tap = TapIntercom(config={"access_token": "token", "conversation_parts_body": {"mode": "hash", "max_bytes": 1}})
+    row = tap.streams["conversation_parts"].post_process({"id": "1", "body": "ab"}, {"conversation_id": "c"})
+
+    assert row is not None
+    assert row["conversation_id"] == "c"
+    assert row["body"] is None
+    assert row["body_length"] == 2
+
+    with pytest.raises(ConfigValidationError):
+        TapIntercom(config={"access_token": "token", "conversation_parts_body": {"mode": "spill"}})
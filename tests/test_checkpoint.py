@@ -0,0 +1,54 @@
+"""Tests for the state checkpoint policy."""
+
+from __future__ import annotations
+
+import time
+
+from tap_intercom.checkpoint import CheckpointPolicy
+from tap_intercom.tap import TapIntercom
+
+
+def test_checkpoint_after_records_or_pages() -> None:
+    """Whichever limit is reached first makes a checkpoint due."""
+    policy = CheckpointPolicy(records=3, pages=2)
+    policy.record_done()
+    policy.page_done()
+    assert not policy.due
+
+    policy.page_done()
+    assert policy.due
+
+    policy.reset()
+    for _ in range(3):
+        policy.record_done()
+    assert policy.due
+
+
+def test_checkpoint_after_seconds() -> None:
+    """A checkpoint is due once the interval has passed."""
+    policy = CheckpointPolicy(records=None, seconds=0.01)
+    assert not policy.due
+    time.sleep(0.02)
+    assert policy.due
+
+
+def test_search_streams_are_resumable() -> None:
+    """Search results are sorted, so bookmarks advance at every checkpoint."""
+    tap = TapIntercom(config={"access_token": "token"})
+
+    assert tap.streams["contacts"].is_sorted
+    assert tap.streams["conversations"].is_sorted
+
+
+def test_child_streams_can_checkpoint_with_parent() -> None:
+    """Child streams leave STATE messages to their parent when configured to."""
+    tap = TapIntercom(config={"access_token": "token", "checkpoint_children_with_parent": True})
+    parts = tap.streams["conversation_parts"]
+    parts.get_context_state({"conversation_id": "1"})["progress_markers"] = {}
+    parts._is_state_flushed = False  # noqa: SLF001
+
+    parts._write_state_message()  # noqa: SLF001
+    assert not parts._is_state_flushed  # noqa: SLF001
+
+    tap.streams["conversations"]._write_state_message()  # noqa: SLF001
+    assert parts._is_state_flushed  # noqa: SLF001
@@ -0,0 +1,115 @@
+"""Tests for adaptive concurrency and child prefetching."""
+
+from __future__ import annotations
+
+import json
+import threading
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tap_intercom.ratelimit import AIMDLimiter
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from tap_intercom.streams import ConversationPartsStream, ConversationsStream
+
+
+def test_limit_increases_additively_and_halves_on_429() -> None:
+    """Healthy responses raise the limit by about one per round, a 429 halves it."""
+    limiter = AIMDLimiter(8)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(0.1)
+    assert limiter.limit == 4
+
+    limiter.acquire()
+    assert limiter.release(0.1, throttled=True) == 2
+    assert limiter.limit == 2
+
+
+def test_limit_decreases_on_latency_rise() -> None:
+    """A sustained latency rise above the baseline cuts the limit."""
+    limiter = AIMDLimiter(8, initial_limit=8)
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(0.01)
+    limiter.acquire()
+    limiter.release(1.0)
+
+    assert limiter.limit == 4
+
+
+class _ConversationsHandler(BaseHTTPRequestHandler):
+    def _reply(self, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply({"conversations": [{"id": str(i), "updated_at": 100 + i} for i in range(20)]})
+
+    def do_GET(self) -> None:
+        conversation_id = self.path.split("?")[0].split("/")[-1]
+        parts = [{"id": f"{conversation_id}-{i}"} for i in range(2)]
+        self._reply({"id": conversation_id, "conversation_parts": {"conversation_parts": parts}})
+
+    def log_message(self, *args: t.Any) -> None:
+        pass
+
+
+@pytest.fixture
+def conversations_server() -> Iterator[str]:
+    """Serve conversation search and detail endpoints."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ConversationsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_child_records_are_prefetched(conversations_server: str) -> None:
+    """Parts are fetched ahead of the parent records and handed over in order."""
+    tap = TapIntercom(
+        config={"access_token": "token", "api_url": conversations_server, "max_concurrent_requests": 4},
+    )
+    conversations = t.cast("ConversationsStream", tap.streams["conversations"])
+    parts = t.cast("ConversationPartsStream", tap.streams["conversation_parts"])
+
+    synced: list[str] = []
+    for conversation in conversations.get_records(None):
+        assert parts.prefetched
+        context = {"conversation_id": conversation["id"]}
+        synced.extend(part["id"] for part in parts.get_records(context))
+
+    assert synced == [f"{i}-{j}" for i in range(20) for j in range(2)]
+    assert not parts.prefetched
+
+
+def test_parent_pages_are_read_ahead(conversations_server: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Parents with selected children page through in the background when enabled."""
+    for read_ahead, thread_name in ((1000, "conversations-pages"), (None, "MainThread")):
+        config: dict[str, t.Any] = {"access_token": "token", "api_url": conversations_server}
+        if read_ahead is not None:
+            config["parent_read_ahead_records"] = read_ahead
+        tap = TapIntercom(config=config)
+        stream = t.cast("ConversationsStream", tap.streams["conversations"])
+        parse_response = stream.parse_response
+        threads: set[str] = set()
+
+        def parse(
+            response: object, parse_response: t.Callable = parse_response, threads: set = threads
+        ) -> t.Iterable[dict]:
+            threads.add(threading.current_thread().name)
+            return parse_response(response)
+
+        monkeypatch.setattr(stream, "parse_response", parse)
+        assert [record["id"] for record in stream.request_records(None)] == [str(i) for i in range(20)]
+        assert threads == {thread_name}
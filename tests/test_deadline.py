@@ -0,0 +1,107 @@
+"""Tests for the `max_run_seconds` run deadline."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+import requests
+
+from tap_intercom.deadline import RunDeadline
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    import pytest
+
+    from tap_intercom.streams import ContactsStream, ConversationPartsStream, ConversationsStream
+
+
+def test_margin_is_kept_before_the_deadline() -> None:
+    """Pages stop a minute before the deadline, or a tenth of the run time for short runs."""
+    assert RunDeadline(3600).margin == 60
+    assert RunDeadline(100).margin == 10
+    assert not RunDeadline(100).reached
+    assert RunDeadline(100, margin=100).reached
+
+
+def test_incremental_stream_stops_after_current_page(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """The page in flight is completed and bookmarked, and no further page is requested."""
+    tap = TapIntercom(config={"access_token": "token", "start_date": 1, "max_run_seconds": 3600})
+    contacts = t.cast("ContactsStream", tap.streams["contacts"])
+    requested = []
+
+    def request(prepared_request: requests.PreparedRequest, context: dict | None) -> requests.Response:  # noqa: ARG001
+        requested.append(prepared_request)
+        # The deadline passes while the first page is being read.
+        t.cast("RunDeadline", tap.run_deadline).margin = 3600
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(  # noqa: SLF001
+            {
+                "data": [{"id": "1", "updated_at": 10}, {"id": "2", "updated_at": 20}],
+                "pages": {"next": {"starting_after": "next"}},
+            }
+        ).encode()
+        return response
+
+    monkeypatch.setattr(contacts, "_request", request)
+    contacts.sync()
+    tap.message_writer.flush()
+
+    assert len(requested) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [message["record"]["id"] for message in records if message["type"] == "RECORD"] == ["1", "2"]
+    assert tap.state["bookmarks"]["contacts"]["replication_key_value"] == 20
+
+
+def test_streams_are_skipped_after_the_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Top-level streams that did not start before the deadline are skipped without any request or record."""
+    tap = TapIntercom(config={"access_token": "token", "max_run_seconds": 3600})
+    t.cast("RunDeadline", tap.run_deadline).margin = 3600
+    for stream in tap.streams.values():
+        monkeypatch.setattr(stream, "_request", None)
+
+    tap.sync_all()
+
+    assert {json.loads(line)["type"] for line in capsys.readouterr().out.splitlines()} == {"SCHEMA", "STATE"}
+
+
+def test_parents_read_ahead_are_not_synced_after_the_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Conversations already read ahead are dropped at the deadline, except those sharing the last bookmark."""
+    tap = TapIntercom(
+        config={"access_token": "token", "start_date": 1, "max_run_seconds": 3600, "parent_read_ahead_records": 100},
+    )
+    conversations = t.cast("ConversationsStream", tap.streams["conversations"])
+    parts = t.cast("ConversationPartsStream", tap.streams["conversation_parts"])
+    updated_at = [10, 20, 20, 30, 40]
+    monkeypatch.setattr(
+        conversations,
+        "fetch_records",
+        lambda _context: iter([{"id": str(i), "updated_at": value} for i, value in enumerate(updated_at)]),
+    )
+    fetched = []
+
+    def get_records(context: dict) -> t.Iterator[dict]:
+        fetched.append(context["conversation_id"])
+        # The deadline passes while the parts of the second conversation are fetched.
+        if len(fetched) == 2:
+            t.cast("RunDeadline", tap.run_deadline).margin = 3600
+        return iter([])
+
+    monkeypatch.setattr(parts, "get_records", get_records)
+    conversations.sync()
+    tap.message_writer.flush()
+
+    assert fetched == ["0", "1", "2"]
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [message["record"]["id"] for message in records if message["type"] == "RECORD"] == ["0", "1", "2"]
+    assert tap.state["bookmarks"]["conversations"]["replication_key_value"] == 20
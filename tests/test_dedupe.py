@@ -0,0 +1,85 @@
+"""Tests for the dedupe index of lookback-window replays."""
+
+from __future__ import annotations
+
+import typing as t
+
+from singer_sdk.streams.rest import RESTStream
+
+from tap_intercom.dedupe import DedupeIndex, dedupe_index_path
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tap_intercom.streams import ContactsStream
+
+
+def test_index_roundtrip_and_prune(tmp_path: Path) -> None:
+    """Saved entries are seen by the next run, until they fall out of the window."""
+    path = tmp_path / "contacts.idx"
+    index = DedupeIndex(path)
+    index.add("1", 100)
+    index.add("2", 200)
+    assert not index.seen("1", 100)
+    index.save(min_updated_at=150)
+
+    index = DedupeIndex(path)
+    assert len(index) == 1
+    assert index.seen("2", 200)
+    assert not index.seen("2", 201)
+    assert not index.seen("1", 100)
+
+
+def test_index_keeps_newest_entries(tmp_path: Path) -> None:
+    """Only the newest `max_entries` entries are kept."""
+    index = DedupeIndex(tmp_path / "contacts.idx", max_entries=2)
+    for updated_at in range(5):
+        index.add(str(updated_at), updated_at)
+    index.save(min_updated_at=0)
+
+    assert len(index) == 2
+    assert index.seen("4", 4)
+    assert index.seen("3", 3)
+
+
+PAGES = [
+    [{"id": "1", "updated_at": 1000}, {"id": "2", "updated_at": 1010}],
+    [{"id": "1", "updated_at": 1000}, {"id": "2", "updated_at": 1050}, {"id": "3", "updated_at": 1060}],
+]
+
+
+def _sync_pages(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, states: list[dict]) -> list[list[tuple]]:
+    config = {
+        "access_token": "token",
+        "dedupe_index_dir": str(tmp_path),
+        "replication_lookback_window_seconds": 100,
+    }
+    emitted = []
+    for page, state in zip(PAGES, states):
+        stream = t.cast("ContactsStream", TapIntercom(config=config, state=state).streams["contacts"])
+        monkeypatch.setattr(RESTStream, "get_records", lambda _self, _context, page=page: iter(page))
+        emitted.append([(record["id"], record["updated_at"]) for record in stream.get_records(None)])
+    return emitted
+
+
+def test_replayed_records_are_suppressed(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Records already emitted with the same `updated_at` are skipped on the next run."""
+    committed = {"bookmarks": {"contacts": {"replication_key": "updated_at", "replication_key_value": 1010}}}
+
+    emitted = _sync_pages(tmp_path, monkeypatch, [{}, committed])
+
+    assert emitted[1] == [("2", 1050), ("3", 1060)]
+    assert dedupe_index_path(str(tmp_path), "contacts", None).exists()
+
+
+def test_records_of_an_uncommitted_run_are_emitted_again(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A run whose state was never committed saves its index, but does not hide its records from the next run."""
+    previous = {"bookmarks": {"contacts": {"replication_key": "updated_at", "replication_key_value": 900}}}
+
+    emitted = _sync_pages(tmp_path, monkeypatch, [previous, previous])
+
+    assert emitted[0] == [("1", 1000), ("2", 1010)]
+    assert emitted[1] == [("1", 1000), ("2", 1050), ("3", 1060)]
@@ -0,0 +1,49 @@
+"""Tests for the interning of repeated strings in decoded records."""
+
+from __future__ import annotations
+
+import decimal
+import typing as t
+
+import requests
+
+from tap_intercom.interning import StringInterner
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from tap_intercom.streams import ContactsStream, ConversationsStream
+
+
+def test_records_of_different_pages_share_strings() -> None:
+    """Keys and short values are shared across documents, long values and numbers are left alone."""
+    interner = StringInterner(max_length=10)
+    first = interner.loads(b'{"state": "open", "body": "a long message", "score": 1.5}')
+    second = interner.loads(b'{"state": "open", "body": "a long message"}')
+
+    assert first["state"] is second["state"]
+    assert next(iter(first)) is next(iter(second))
+    assert first["body"] is not second["body"]
+    assert first["score"] == decimal.Decimal("1.5")
+
+
+def test_table_is_bounded() -> None:
+    """Once full, strings already in the table are still shared but new ones are not added."""
+    interner = StringInterner(capacity=1)
+    shared = interner.intern(b"open".decode())
+
+    assert interner.intern(b"open".decode()) is shared
+    other = b"closed".decode()
+    assert interner.intern(other) is other
+    assert len(interner) == 1
+
+
+def test_stream_decodes_with_the_tap_interner() -> None:
+    """Streams share the tap's table."""
+    tap = TapIntercom(config={"access_token": "token", "intern_strings": True})
+    response = requests.Response()
+    response._content = b'{"conversations": [{"id": "1", "state": "open"}]}'  # noqa: SLF001
+    [conversation] = t.cast("ConversationsStream", tap.streams["conversations"]).parse_response(response)
+    response._content = b'{"data": [{"id": "2", "state": "open"}]}'  # noqa: SLF001
+    [contact] = t.cast("ContactsStream", tap.streams["contacts"]).parse_response(response)
+
+    assert conversation["state"] is contact["state"]
@@ -0,0 +1,139 @@
+"""Tests for adaptive timeouts, hedged requests and rate limiting."""
+
+from __future__ import annotations
+
+import threading
+import time
+import typing as t
+
+import pytest
+import requests
+
+from tap_intercom.latency import HedgedSender, HedgeSkippedError, LatencyTracker, timed
+from tap_intercom.ratelimit import TokenBucket
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from tap_intercom.streams import ConversationPartsStream
+
+
+def _tracker(latency: float) -> LatencyTracker:
+    tracker = LatencyTracker(min_samples=10)
+    for _ in range(10):
+        tracker.record(latency)
+    return tracker
+
+
+def test_timeout_follows_p99_latency() -> None:
+    """The timeout is the default until enough samples, then a multiple of p99."""
+    tracker = LatencyTracker(min_samples=10)
+    assert tracker.timeout(300) == 300
+
+    for latency in range(1, 11):
+        tracker.record(latency)
+    assert tracker.percentile(0.5) == 6
+    assert tracker.timeout(300) == 50
+    assert tracker.timeout(30) == 30
+
+
+def test_slow_request_is_hedged() -> None:
+    """A request slower than p95 is duplicated and the first response wins."""
+    calls = []
+    release = threading.Event()
+
+    def send(request: requests.PreparedRequest, *, hedge: bool = False) -> requests.Response:  # noqa: ARG001
+        calls.append(hedge)
+        if len(calls) == 1:
+            release.wait(5)
+        response = requests.Response()
+        response.status_code = 200 if len(calls) == 1 else 201
+        return response
+
+    sender = HedgedSender(send, _tracker(0.01))
+    response = sender.send(requests.Request("GET", "http://localhost/conversations/1").prepare())
+    release.set()
+
+    assert response.status_code == 201
+    assert calls == [False, True]
+
+
+def test_no_hedge_while_workers_are_busy() -> None:
+    """While every worker is busy, slow requests are waited for instead of hedged."""
+    calls = []
+
+    def send(request: requests.PreparedRequest, *, hedge: bool = False) -> requests.Response:  # noqa: ARG001
+        calls.append(hedge)
+        time.sleep(0.2)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    sender = HedgedSender(send, _tracker(0.01), max_workers=1)
+    response = sender.send(requests.Request("GET", "http://localhost/conversations/1").prepare())
+
+    assert response.status_code == 200
+    assert calls == [False]
+
+    # The slow request's worker is free again, the next one runs on it.
+    sender.send(requests.Request("GET", "http://localhost/conversations/2").prepare())
+    assert len(calls) == 2
+
+
+def test_skipped_hedge_waits_for_primary() -> None:
+    """A hedge the send function skips leaves the primary's response to be waited for."""
+    calls = []
+
+    def send(request: requests.PreparedRequest, *, hedge: bool = False) -> requests.Response:  # noqa: ARG001
+        calls.append(hedge)
+        if hedge:
+            raise HedgeSkippedError
+        time.sleep(0.2)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    response = HedgedSender(send, _tracker(0.01)).send(requests.Request("GET", "http://localhost").prepare())
+
+    assert response.status_code == 200
+    assert calls == [False, True]
+
+
+def test_hedge_is_skipped_at_the_concurrency_limit() -> None:
+    """A hedge does not wait for its primary's concurrency slot, and is not counted."""
+    tap = TapIntercom(config={"access_token": "token", "max_concurrent_requests": 2})
+    parts = t.cast("ConversationPartsStream", tap.streams["conversation_parts"])
+    limiter = tap.get_concurrency_limiter()
+    assert limiter is not None
+    assert limiter.acquire(blocking=False)
+    assert not limiter.acquire(blocking=False)
+    request = requests.Request("GET", "http://localhost/conversations/1").prepare()
+
+    with pytest.raises(HedgeSkippedError):
+        parts._send_request(request, None, hedge=True)  # noqa: SLF001
+
+    assert parts.calculate_sync_cost(request, requests.Response(), None) == {"requests": 0, "hedged_requests": 0}
+
+
+def test_fast_request_is_not_hedged() -> None:
+    """Requests completing within p95 are sent once and their latency is recorded."""
+    calls = []
+    tracker = _tracker(1)
+
+    def send(request: requests.PreparedRequest) -> requests.Response:
+        calls.append(request)
+        return requests.Response()
+
+    HedgedSender(timed(send, tracker), tracker).send(requests.Request("GET", "http://localhost").prepare())
+
+    assert len(calls) == 1
+    assert (tracker.percentile(0) or 0) < 1
+
+
+def test_token_bucket_limits_burst() -> None:
+    """Requests beyond the burst capacity wait for the bucket to refill."""
+    bucket = TokenBucket(rate_per_minute=600)
+    start = time.monotonic()
+    for _ in range(int(bucket.capacity) + 2):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.15
@@ -0,0 +1,67 @@
+"""Tests for the memory profile of a sync."""
+
+from __future__ import annotations
+
+import json
+import logging
+import tracemalloc
+import typing as t
+
+import requests
+
+from tap_intercom.memory import MemoryProfiler
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tap_intercom.streams import TagsStream
+
+
+def test_summary_attributes_peaks_and_allocations(tmp_path: Path) -> None:
+    """Peaks are recorded per stream and stage, and the largest allocation sites are listed."""
+    profiler = MemoryProfiler()
+    profiler.stream_started()
+    pages = [bytearray(1024 * 1024)]
+    profiler.stage_done("conversations", "decode")
+    pages.clear()
+    profiler.stage_done("conversations", "decode")
+    profiler.stream_done("conversations", {"bookmarks": {}})
+
+    path = tmp_path / "memory.json"
+    profiler.write_summary(path, logging.getLogger(__name__))
+    summary = json.loads(path.read_text())
+
+    [stage] = summary["stages"]
+    assert stage["stream"] == "conversations"
+    assert stage["calls"] == 2
+    assert stage["peak_traced_bytes"] >= 1024 * 1024
+    [stream] = summary["streams"]
+    assert stream["peak_traced_bytes"] >= 1024 * 1024
+    assert stream["state_bytes"] == len('{"bookmarks": {}}')
+    assert summary["top_allocations"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_stream_stages_are_profiled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Requests and decoding are profiled as stages of the stream."""
+    tap = TapIntercom(config={"access_token": "token", "memory_profile_file": "unused.json"})
+    tags = t.cast("TagsStream", tap.streams["tags"])
+
+    def send(prepared_request: requests.PreparedRequest, context: dict | None) -> requests.Response:  # noqa: ARG001
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"data": [{"id": "1"}]}'  # noqa: SLF001
+        return response
+
+    monkeypatch.setattr(tags, "_send_through_breaker", send)
+    try:
+        list(tags.request_records(None))
+        assert tap.memory_profiler is not None
+        stages = {(stage["stream"], stage["stage"]) for stage in tap.memory_profiler.summary()["stages"]}
+    finally:
+        tracemalloc.stop()
+
+    assert stages == {("tags", "request"), ("tags", "decode")}
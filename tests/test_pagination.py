@@ -0,0 +1,71 @@
+"""Tests for cursor loop recovery of search pagination."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+import requests
+
+from tap_intercom.client import IntercomSearchPaginator, SearchPageToken
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from tap_intercom.streams import ContactsStream
+
+
+def _page(updated_ats: list[int], next_token: str | None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    body: dict[str, t.Any] = {"data": [{"id": str(value), "updated_at": value} for value in updated_ats]}
+    if next_token:
+        body["pages"] = {"next": {"starting_after": next_token}}
+    response._content = json.dumps(body).encode()  # noqa: SLF001
+    return response
+
+
+def _paginator() -> IntercomSearchPaginator:
+    return IntercomSearchPaginator(
+        "$.pages.next.starting_after",
+        records_jsonpath="$.data[*]",
+        replication_key="updated_at",
+    )
+
+
+def test_loop_restarts_search_above_highest_value() -> None:
+    """A repeated cursor restarts the search just below the highest value seen."""
+    paginator = _paginator()
+    paginator.advance(_page([100, 110], "a"))
+    paginator.advance(_page([120, 130], "b"))
+    paginator.advance(_page([140], "a"))
+
+    assert not paginator.finished
+    assert paginator.restart_count == 1
+    assert paginator.current_value == SearchPageToken(None, 139)
+
+    paginator.advance(_page([150], "a"))
+    assert paginator.current_value == SearchPageToken("a", 139)
+
+
+def test_loop_without_progress_stops() -> None:
+    """Pagination stops when a restarted search loops again without progress."""
+    paginator = _paginator()
+    paginator.advance(_page([100], "a"))
+    paginator.advance(_page([100], "a"))
+    paginator.advance(_page([100], "a"))
+    paginator.advance(_page([100], "a"))
+
+    assert paginator.finished
+    assert paginator.restart_count == 1
+
+
+def test_restart_token_narrows_search_window() -> None:
+    """The restart floor replaces a lower bookmark and drops the cursor."""
+    stream = t.cast("ContactsStream", TapIntercom(config={"access_token": "token"}).streams["contacts"])
+
+    body = stream.prepare_request_payload(None, SearchPageToken(None, 139))
+
+    assert body is not None
+    assert {"field": "updated_at", "operator": ">", "value": 139} in body["query"]["value"]
+    assert body["sort"] == {"field": "updated_at", "order": "ascending"}
+    assert "pagination" not in body
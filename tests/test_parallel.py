@@ -0,0 +1,54 @@
+"""Tests for concurrent syncs of top-level streams."""
+
+from __future__ import annotations
+
+import threading
+import typing as t
+
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    import pytest
+
+
+def test_top_level_streams_sync_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Top-level streams run in parallel threads, search streams first, then in discovery order."""
+    tap = TapIntercom(config={"access_token": "token", "max_parallel_streams": 3})
+    barrier = threading.Barrier(3, timeout=5)
+    started = []
+
+    def get_records(name: str) -> t.Callable[[dict | None], t.Iterator[dict]]:
+        def run(context: dict | None) -> t.Iterator[dict]:  # noqa: ARG001
+            started.append(name)
+            barrier.wait()
+            return iter([])
+
+        return run
+
+    for stream in tap.streams.values():
+        monkeypatch.setattr(stream, "get_records", get_records(stream.name))
+    tap.sync_all()
+
+    assert sorted(started) == ["admins", "articles", "contacts", "conversations", "tags", "teams"]
+    assert set(started[:3]) == {"contacts", "conversations", "admins"}
+    assert set(tap.state["bookmarks"]) == set(tap.streams)
+
+
+def test_state_is_not_changed_while_written() -> None:
+    """Streams wait for a STATE message being written before updating their bookmark."""
+    tap = TapIntercom(config={"access_token": "token", "max_parallel_streams": 2})
+    contacts = tap.streams["contacts"]
+    contacts._write_starting_replication_value(None)  # noqa: SLF001
+    thread = threading.Thread(
+        target=contacts._increment_stream_state,  # noqa: SLF001
+        args=({"id": "1", "updated_at": 100},),
+    )
+
+    with tap.state_lock:
+        thread.start()
+        thread.join(0.1)
+        assert thread.is_alive()
+        assert "replication_key_value" not in tap.state["bookmarks"]["contacts"]
+    thread.join(5)
+
+    assert tap.state["bookmarks"]["contacts"]["replication_key_value"] == 100
@@ -0,0 +1,84 @@
+"""Tests for the raw record passthrough."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+import pytest
+import requests
+
+from tap_intercom.passthrough import RawRecord, get_raw_decoder
+from tap_intercom.tap import TapIntercom
+from tap_intercom.writer import IntercomSingerWriter
+
+if t.TYPE_CHECKING:
+    from tap_intercom.streams import AdminsStream, ConversationsStream
+
+
+def _response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content  # noqa: SLF001
+    return response
+
+
+def test_decoder_slices_records_out_of_the_response() -> None:
+    """Records are the exact bytes the API sent for them."""
+    pytest.importorskip("msgspec")
+    decode = get_raw_decoder("$.admins[*]")
+    assert decode is not None
+    raws = decode(b'{"type": "admin.list", "admins": [{"id": "1", "x": 0.10}, {"id": "2"}]}')
+
+    assert [bytes(raw) for raw in raws] == [b'{"id": "1", "x": 0.10}', b'{"id": "2"}']
+    assert get_raw_decoder("$.data[*].item") is None
+
+
+def test_raw_records_are_written_as_sent() -> None:
+    """The writer embeds raw records, with any keys added by the sync merged in."""
+    pytest.importorskip("msgspec")
+    tap = TapIntercom(config={"access_token": "token", "raw_passthrough": True})
+    stream = t.cast("AdminsStream", tap.streams["admins"])
+    records = stream.parse_raw_records(_response(b'{"admins": [{"id": "1", "x": 0.10}]}'))
+    assert records is not None
+    writer = IntercomSingerWriter()
+
+    [message] = stream._generate_record_messages(records[0])  # noqa: SLF001
+    assert b'"record":{"id": "1", "x": 0.10},' in writer.serialize_message(message)
+
+    record = RawRecord(records[0].raw)
+    record["workspace_id"] = "w"
+    assert record.to_message_record() == {"id": "1", "x": 0.1, "workspace_id": "w"}
+
+
+def test_passthrough_only_without_transformations() -> None:
+    """Flattening, deselected properties and multi-line responses fall back to decoding."""
+    content = b'{"admins": [{"id": "1"}]}'
+    assert (
+        t.cast("AdminsStream", TapIntercom(config={"access_token": "token"}).streams["admins"]).parse_raw_records(
+            _response(content)
+        )
+        is None
+    )
+
+    tap = TapIntercom(
+        config={"access_token": "token", "raw_passthrough": True, "flattening_enabled": True, "flattening_max_depth": 1}
+    )
+    assert t.cast("AdminsStream", tap.streams["admins"]).parse_raw_records(_response(content)) is None
+
+    tap = TapIntercom(config={"access_token": "token", "raw_passthrough": True})
+    assert t.cast("ConversationsStream", tap.streams["conversations"]).parse_raw_records(_response(content)) is None
+    assert (
+        t.cast("AdminsStream", tap.streams["admins"]).parse_raw_records(
+            _response(json.dumps({"admins": [{"id": "1"}]}, indent=1).encode())
+        )
+        is None
+    )
+
+    catalog = tap.catalog.to_dict()
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if metadata["breadcrumb"] == ["properties", "name"]:
+                metadata["metadata"]["selected"] = False
+    tap = TapIntercom(config={"access_token": "token", "raw_passthrough": True}, catalog=catalog)
+    assert t.cast("AdminsStream", tap.streams["admins"]).parse_raw_records(_response(content)) is None
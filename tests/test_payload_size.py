@@ -0,0 +1,66 @@
+"""Tests for the response payload size analyzer."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+from collections import Counter
+
+from tap_intercom.archive import ResponseArchive
+from tap_intercom.payload_size import StreamPayload, analyze, field_sizes, main
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+CONVERSATION = {
+    "id": "1",
+    "updated_at": 1,
+    "source": {"body": "x" * 200, "author": {"id": "2"}},
+    "tags": {"tags": [{"id": "3", "name": "vip"}]},
+}
+
+
+def test_field_sizes_include_keys_and_nested_fields() -> None:
+    """Every field's size covers its key and encoded value, nested fields and array items included."""
+    sizes: Counter[str] = Counter()
+    for path, size in field_sizes({"id": "1", "tags": [{"name": "a"}, {"name": "bc"}]}):
+        sizes[path] += size
+    assert sizes["id"] == len('"id":"1"') + 1
+    assert sizes["tags[].name"] == len('"name":"a"') + 1 + len('"name":"bc"') + 1
+    assert sizes["tags"] == len('"tags":[{"name":"a"},{"name":"bc"}]') + 1
+
+
+def test_fixtures_and_archives_are_analyzed(tmp_path: Path) -> None:
+    """Fixtures are named after their stream and archives are read per stream."""
+    fixture = tmp_path / "conversations.json"
+    fixture.write_text(json.dumps({"conversations": [CONVERSATION, CONVERSATION]}))
+    archive = ResponseArchive(tmp_path / "archive")
+    archive.append("contacts", None, json.dumps({"data": [{"id": "1", "custom_attributes": {"a": "b"}}]}).encode())
+    archive.close()
+
+    payloads = analyze([fixture, tmp_path / "archive"])
+
+    assert payloads["conversations"].records == 2
+    assert payloads["contacts"].fields["custom_attributes.a"] == [len('"a":"b"') + 1, 1]
+
+
+def test_recommends_largest_deselectable_fields() -> None:
+    """The body dominates `source`, so it is recommended rather than `source`; keys never are."""
+    payload = StreamPayload("conversations")
+    payload.add(CONVERSATION)
+    payload.add({**CONVERSATION, "id": "x" * 500})
+    assert payload.recommend_deselections(0.2) == ["source.body"]
+
+
+def test_main_prints_report(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """The command reads the tap's own output as well."""
+    output = tmp_path / "output.jsonl"
+    output.write_text(json.dumps({"type": "RECORD", "stream": "conversations", "record": CONVERSATION}) + "\n")
+
+    main([str(output), "--json", "--min-share", "0.3"])
+
+    [report] = json.loads(capsys.readouterr().out)
+    assert report["stream"] == "conversations"
+    assert report["recommended_deselections"] == ["source.body"]
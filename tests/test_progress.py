@@ -0,0 +1,106 @@
+"""Tests for progress reporting and estimates of search streams."""
+
+from __future__ import annotations
+
+import json
+import typing as t
+
+import requests
+
+from tap_intercom.client import IntercomSearchPaginator, SearchPageToken
+from tap_intercom.progress import SearchProgress
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    import pytest
+
+    from tap_intercom.streams import AdminsStream, ContactsStream, ConversationsStream
+
+
+def _page(ids: list[int], next_token: str | None, total_count: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    body = {"data": [{"id": str(i), "updated_at": i} for i in ids], "total_count": total_count}
+    if next_token:
+        body["pages"] = {"next": {"starting_after": next_token}}
+    response._content = json.dumps(body).encode()  # noqa: SLF001
+    return response
+
+
+def test_paginator_counts_total_once_per_search() -> None:
+    """Only the first page of a search adds its total_count."""
+    progress = SearchProgress()
+    paginator = IntercomSearchPaginator(
+        "$.pages.next.starting_after",
+        records_jsonpath="$.data[*]",
+        replication_key="updated_at",
+        progress=progress,
+    )
+    paginator.advance(_page([1, 2], "a", total_count=3))
+    paginator.advance(_page([3], None, total_count=3))
+
+    assert (progress.done, progress.total, progress.pages) == (3, 3, 2)
+
+
+def test_restarted_search_rebases_total() -> None:
+    """Records read again after a restart never take the progress above the total."""
+    progress = SearchProgress()
+    paginator = IntercomSearchPaginator(
+        "$.pages.next.starting_after",
+        records_jsonpath="$.data[*]",
+        replication_key="updated_at",
+        progress=progress,
+    )
+    paginator.advance(_page([1, 2], "a", total_count=5))
+    paginator.advance(_page([3, 4], "b", total_count=5))
+    paginator.advance(_page([1, 2], "a", total_count=5))
+    assert paginator.restart_count == 1
+    assert (progress.done, progress.total) == (6, 6)
+
+    # The restarted search matches the records above 3.
+    paginator.advance(_page([4, 5], None, total_count=2))
+    assert (progress.done, progress.total) == (8, 8)
+
+
+def test_eta_from_average_rate() -> None:
+    """The ETA extrapolates the rate so far and reports are throttled."""
+    reports: list[SearchProgress] = []
+    progress = SearchProgress(on_report=reports.append, report_seconds=3600)
+    progress.add_total(100)
+    assert progress.eta_seconds is None
+
+    progress.page_done(25)
+    progress._started_at -= 10  # type: ignore[operator]  # noqa: SLF001
+    assert progress.eta_seconds is not None
+    assert round(progress.eta_seconds) == 30
+    assert progress.pages_per_minute is not None
+    assert round(progress.pages_per_minute) == 6
+    assert reports == []
+
+
+def test_estimate_requests_a_single_record() -> None:
+    """Estimates search for one record and keep the sync's search window."""
+    tap = TapIntercom(config={"access_token": "token", "start_date": 100, "end_date": 200})
+    stream = t.cast("ConversationsStream", tap.streams["conversations"])
+
+    body = stream.prepare_request_payload(None, SearchPageToken(None, per_page=1))
+
+    assert body is not None
+    assert body["pagination"] == {"per_page": 1}
+    assert {"field": "updated_at", "operator": "<", "value": 201} in body["query"]["value"]
+    assert t.cast("AdminsStream", tap.streams["admins"]).estimate_record_count(None) is None
+
+
+def test_estimate_only_syncs_nothing(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    """Dry runs only estimate the selected search streams, without any record request or message."""
+    tap = TapIntercom(config={"access_token": "token", "estimate_only": True})
+    counts = {"conversations": 10, "contacts": 5}
+    for stream in tap.streams.values():
+        monkeypatch.setattr(stream, "get_records", None)
+        monkeypatch.setattr(stream, "estimate_record_count", lambda _context, name=stream.name: counts.get(name))
+
+    tap.sync_all()
+
+    assert capsys.readouterr().out == ""
+    assert t.cast("ContactsStream", tap.streams["contacts"]).log_record_estimate() == 5
+    assert t.cast("AdminsStream", tap.streams["admins"]).log_record_estimate() is None
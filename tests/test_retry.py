@@ -0,0 +1,151 @@
+"""Tests for the retry policy and circuit breakers."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import threading
+import time
+import typing as t
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+
+from tap_intercom.retry import CircuitBreaker, CircuitOpenError, decorrelated_jitter, retry_after_seconds
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from tap_intercom.streams import ContactsStream, ConversationsStream
+
+
+def _response(headers: dict[str, str]) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 429
+    response.headers.update(headers)
+    return response
+
+
+def test_retry_after_headers() -> None:
+    """`Retry-After` takes precedence over the rate-limit reset time."""
+    assert retry_after_seconds(_response({"Retry-After": "7"}), now=0) == 7
+    assert retry_after_seconds(_response({"Retry-After": "Thu, 01 Jan 1970 00:00:30 GMT"}), now=10) == 20
+    assert retry_after_seconds(_response({"X-RateLimit-Reset": "105"}), now=100) == 5
+    assert retry_after_seconds(_response({}), now=0) is None
+
+
+def test_decorrelated_jitter_stays_within_bounds() -> None:
+    """Waits never drop below the base nor exceed the cap."""
+    waits = decorrelated_jitter(base=1, cap=10)
+    assert all(1 <= next(waits) <= 10 for _ in range(100))
+
+
+def test_circuit_opens_and_probes() -> None:
+    """The circuit opens at the threshold and lets a single probe through once reset."""
+    breaker = CircuitBreaker("/conversations/{conversation_id}", failure_threshold=2, reset_seconds=0)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.is_open
+
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert not breaker.is_open
+
+
+class _RateLimitedHandler(BaseHTTPRequestHandler):
+    requests: t.ClassVar[int] = 0
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).requests += 1
+        if self.requests == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"data": [{"id": "1", "updated_at": 100}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: t.Any) -> None:
+        pass
+
+
+@pytest.fixture
+def rate_limited_server() -> Iterator[str]:
+    """Serve a search endpoint that rate-limits the first request."""
+    _RateLimitedHandler.requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimitedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_rate_limit_is_retried_without_tripping_breaker(rate_limited_server: str) -> None:
+    """A 429 is retried after `Retry-After` and does not count against the endpoint."""
+    tap = TapIntercom(config={"access_token": "token", "api_url": rate_limited_server})
+    contacts = t.cast("ContactsStream", tap.streams["contacts"])
+
+    assert [record["id"] for record in contacts.get_records(None)] == ["1"]
+    assert _RateLimitedHandler.requests == 2
+    assert not contacts.circuit_breaker.is_open
+    assert contacts.circuit_breaker is not t.cast("ConversationsStream", tap.streams["conversations"]).circuit_breaker
+
+
+def test_retries_stop_at_max_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Retries give up once `backoff_max_time` is spent, whatever the number of tries left."""
+    contacts = t.cast("ContactsStream", TapIntercom(config={"access_token": "token"}).streams["contacts"])
+    monkeypatch.setattr(contacts, "backoff_max_tries", lambda: 100)
+    monkeypatch.setattr(contacts, "backoff_max_time", lambda: 0.2)
+    endpoint = contacts.path
+    calls = []
+
+    def fail() -> None:
+        calls.append(time.monotonic())
+        raise CircuitOpenError(endpoint, retry_after=0.05)
+
+    with pytest.raises(CircuitOpenError):
+        contacts.request_decorator(fail)()
+
+    assert 2 <= len(calls) < 10
+    assert calls[-1] - calls[0] < 1
+
+
+@pytest.mark.parametrize(
+    ("status_code", "error"),
+    [(429, RetriableAPIError), (404, FatalAPIError)],
+    ids=["rate-limited", "fatal"],
+)
+def test_probe_neither_succeeding_nor_failing_lets_the_next_one_through(
+    status_code: int,
+    error: type[Exception],
+) -> None:
+    """A rate-limited or fatal probe does not leave the circuit open for the rest of the run."""
+    contacts = t.cast("ContactsStream", TapIntercom(config={"access_token": "token"}).streams["contacts"])
+    breaker = CircuitBreaker(contacts.path, failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    request = requests.Request("GET", "https://api.intercom.io/contacts").prepare()
+
+    def send() -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.request = request
+        response.elapsed = dt.timedelta(seconds=0.1)
+        return response
+
+    with pytest.raises(error):
+        contacts._call_through_breaker(breaker, send, request, None)  # noqa: SLF001
+
+    assert breaker.is_open
+    assert breaker.before_request()
@@ -0,0 +1,106 @@
+"""Tests for sharded extraction."""
+
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_intercom.sharding import merge_states, shard_range
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from tap_intercom.streams import ArticlesStream, ContactsStream
+
+
+def test_shard_ranges_cover_window_exactly() -> None:
+    """Shard ranges are contiguous, disjoint and cover the whole window."""
+    ranges = [shard_range(101, 200, index, 3) for index in range(3)]
+
+    assert ranges[0][0] == 101
+    assert ranges[-1][1] == 200
+    for (_, last), (first, _) in zip(ranges, ranges[1:]):
+        assert first == last + 1
+
+
+def test_search_payload_is_narrowed_to_shard() -> None:
+    """Each shard searches its own part of the `updated_at` window."""
+    bounds = []
+    for index in range(2):
+        tap = TapIntercom(
+            config={
+                "access_token": "token",
+                "start_date": 100,
+                "end_date": 200,
+                "shard_count": 2,
+                "shard_index": index,
+            },
+            state={"bookmarks": {"contacts": {"starting_replication_value": 100}}},
+        )
+        body = t.cast("ContactsStream", tap.streams["contacts"]).prepare_request_payload(None, None)
+        assert body is not None
+        bounds.append([clause["value"] for clause in body["query"]["value"]])
+
+    assert bounds == [[100, 151], [150, 201]]
+
+
+def test_first_run_is_split_from_start_date() -> None:
+    """Without a bookmark, shards split the window from `start_date`, which is then required."""
+    config = {"access_token": "token", "start_date": 100, "end_date": 200, "shard_count": 2, "shard_index": 0}
+    contacts = t.cast("ContactsStream", TapIntercom(config=config).streams["contacts"])
+    contacts._write_starting_replication_value(None)  # noqa: SLF001
+    assert contacts.get_search_window(None) == (100, 150)
+
+    contacts = t.cast("ContactsStream", TapIntercom(config={**config, "start_date": None}).streams["contacts"])
+    contacts._write_starting_replication_value(None)  # noqa: SLF001
+    with pytest.raises(ConfigValidationError, match="start_date"):
+        contacts.get_search_window(None)
+
+
+def test_full_table_records_are_hashed_to_one_shard() -> None:
+    """Every record of a full-table stream is kept by exactly one shard."""
+    taps = [TapIntercom(config={"access_token": "token", "shard_count": 3, "shard_index": index}) for index in range(3)]
+    for record_id in map(str, range(50)):
+        owners = [tap for tap in taps if tap.streams["tags"].post_process({"id": record_id}) is not None]
+        assert len(owners) == 1
+
+
+def test_merge_states_takes_highest_bookmark() -> None:
+    """Merged state holds the highest bookmark of every stream."""
+    merged = merge_states(
+        [
+            {"bookmarks": {"contacts": {"replication_key": "updated_at", "replication_key_value": 150}}},
+            {
+                "bookmarks": {
+                    "contacts": {"replication_key": "updated_at", "replication_key_value": 200},
+                    "tags": {},
+                },
+            },
+        ],
+    )
+
+    assert merged["bookmarks"]["contacts"]["replication_key_value"] == 200
+    assert merged["bookmarks"]["tags"] == {}
+
+
+def test_children_of_other_shards_records_are_not_prefetched(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Only the articles kept by this shard have their extended records fetched ahead."""
+    tap = TapIntercom(
+        config={"access_token": "token", "shard_count": 2, "shard_index": 0, "max_concurrent_requests": 4},
+    )
+    articles = t.cast("ArticlesStream", tap.streams["articles"])
+    extended = tap.streams["articles_extended"]
+    records = [{"id": str(i)} for i in range(20)]
+    prefetched: list[dict] = []
+
+    def prefetch(context: dict) -> tuple:
+        prefetched.append(context)
+        return ()
+
+    monkeypatch.setattr(extended, "prefetch", prefetch)
+
+    assert list(articles._prefetch_children(iter(records), None)) == records  # noqa: SLF001
+    assert prefetched
+    assert all(not articles.owned_by_other_shard({"id": context["article_id"]}) for context in prefetched)
+    assert len(prefetched) == sum(not articles.owned_by_other_shard(record) for record in records)
@@ -0,0 +1,92 @@
+"""Tests for change-only emission of full-table reference streams."""
+
+from __future__ import annotations
+
+import copy
+import json
+import typing as t
+
+import requests
+
+from tap_intercom.snapshot import RecordSnapshot
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tap_intercom.streams import ContactsStream, TagsStream
+
+
+def test_snapshot_tracks_changes_between_runs(tmp_path: Path) -> None:
+    """Only changes since the committed run are reported, and a new version starts over."""
+    first = RecordSnapshot(tmp_path, version="1", committed=None)
+    assert first.changed({"id": "1", "name": "Support"})
+    assert first.changed({"id": "2", "name": "Sales"})
+    first.save()
+
+    second = RecordSnapshot(tmp_path, version="1", committed=first.run)
+    assert not second.changed({"id": "1", "name": "Support"})
+    assert second.changed({"id": "3", "name": "Billing"})
+    assert second.removed() == ["2"]
+    second.save()
+    assert sorted(path.stem for path in tmp_path.iterdir()) == sorted([first.run, second.run])
+
+    assert len(RecordSnapshot(tmp_path, version="2", committed=first.run)) == 0
+    assert len(RecordSnapshot(tmp_path, version="1", committed=None)) == 0
+
+
+def _sync_tags(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, page: list, state: dict) -> tuple[list, dict]:
+    config = {"access_token": "token", "snapshot_diff_dir": str(tmp_path), "snapshot_diff_tombstones": True}
+    tap = TapIntercom(config=config, state=copy.deepcopy(state))
+    tags = t.cast("TagsStream", tap.streams["tags"])
+
+    def send(*args: object) -> requests.Response:  # noqa: ARG001
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"data": page}).encode()  # noqa: SLF001
+        return response
+
+    monkeypatch.setattr(tags, "_send_through_breaker", send)
+    records = list(tags.get_records(None))
+    assert "_sdc_deleted_at" in tags.schema["properties"]
+    return records, dict(tap.state)
+
+
+def test_stream_emits_changes_and_tombstones(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Unchanged tags are skipped on the next run, and removed tags come back as tombstones."""
+    pages = [
+        [{"id": "1", "name": "vip"}, {"id": "2", "name": "churned"}],
+        [{"id": "1", "name": "vip"}, {"id": "2", "name": "churned"}],
+        [{"id": "1", "name": "VIP"}],
+    ]
+    runs: list[list] = []
+    state: dict = {}
+    for page in pages:
+        records, state = _sync_tags(tmp_path, monkeypatch, page, state)
+        runs.append(records)
+
+    assert [record["id"] for record in runs[0]] == ["1", "2"]
+    assert runs[1] == []
+    assert runs[2][0] == {"id": "1", "name": "VIP"}
+    assert runs[2][1]["id"] == "2"
+    assert "_sdc_deleted_at" in runs[2][1]
+
+
+def test_changes_of_an_uncommitted_run_are_emitted_again(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """When a target fails to load a run's changes, the next run from the committed state emits them again."""
+    _, committed = _sync_tags(tmp_path, monkeypatch, [{"id": "1", "name": "vip"}], {})
+    failed, _ = _sync_tags(tmp_path, monkeypatch, [{"id": "1", "name": "VIP"}], committed)
+    retried, _ = _sync_tags(tmp_path, monkeypatch, [{"id": "1", "name": "VIP"}], committed)
+
+    assert failed == retried == [{"id": "1", "name": "VIP"}]
+
+
+def test_disabled_with_activate_version_messages(tmp_path: Path) -> None:
+    """Targets delete records missing from an activated version, so every record must be emitted."""
+    tap = TapIntercom(
+        config={"access_token": "token", "snapshot_diff_dir": str(tmp_path), "emit_activate_version_messages": True}
+    )
+    assert t.cast("TagsStream", tap.streams["tags"]).get_record_snapshot(None) is None
+    assert t.cast("ContactsStream", tap.streams["contacts"]).get_record_snapshot(None) is None
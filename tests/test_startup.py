@@ -0,0 +1,61 @@
+"""Tests that keep CLI startup fast."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+
+# Modules that must only be imported when a feature actually needs them.
+DEFERRED_MODULES = ("boto3", "botocore", "fs_s3fs", "s3fs", "pyarrow", "tap_intercom.schemas")
+
+# Budget in microseconds for the self time of the tap's own modules, excluding the SDK.
+IMPORT_TIME_BUDGET_US = 100_000
+
+
+def _import_profile(code: str) -> tuple[set[str], int]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    own_time = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        if not self_time.strip().isdigit():
+            continue
+        name = name.strip()
+        modules.add(name)
+        if name.split(".")[0] == "tap_intercom":
+            own_time += int(self_time)
+    return modules, own_time
+
+
+def test_tap_import_defers_heavy_modules() -> None:
+    """Importing the tap loads no schema definitions or optional dependencies."""
+    modules, own_time = _import_profile("import tap_intercom.tap")
+
+    assert not modules.intersection(DEFERRED_MODULES)
+    assert own_time < IMPORT_TIME_BUDGET_US
+
+
+def test_about_defers_heavy_modules() -> None:
+    """`--about` does not load any stream schema or optional dependency."""
+    modules, _ = _import_profile(
+        "import sys; from tap_intercom.tap import TapIntercom; "
+        "sys.argv = ['tap-intercom', '--about']; TapIntercom.cli(standalone_mode=False)",
+    )
+
+    assert not modules.intersection(DEFERRED_MODULES)
+
+
+def test_precompiled_schemas_match_definitions() -> None:
+    """The JSON schemas are up to date with `tap_intercom/schemas.py`."""
+    from tap_intercom.client import SCHEMAS_DIR  # noqa: PLC0415
+    from tap_intercom.schemas import SCHEMAS  # noqa: PLC0415
+
+    for name, schema in SCHEMAS.items():
+        assert SCHEMAS_DIR.fetch_schema(name) == schema, f"Run `python -m tap_intercom.schemas` to update {name}"
@@ -0,0 +1,67 @@
+"""Tests for tracing spans in the Chrome Trace Event format."""
+
+from __future__ import annotations
+
+import json
+import threading
+import typing as t
+
+import pytest
+import requests
+
+from tap_intercom.tap import TapIntercom
+from tap_intercom.tracing import Tracer
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    from tap_intercom.streams import TagsStream
+
+
+def test_spans_are_complete_events_per_thread(tmp_path: Path) -> None:
+    """Spans are written as complete events, with the name of every thread they ran in."""
+    path = tmp_path / "trace.json"
+    tracer = Tracer(path)
+    with tracer.span("conversations.request", "conversations", endpoint="/conversations/search") as attributes:
+        attributes["status_code"] = 200
+
+    def sync() -> None:
+        with tracer.span("tags.sync", "tags"):
+            pass
+
+    thread = threading.Thread(target=sync, name="stream_0")
+    thread.start()
+    thread.join()
+    with pytest.raises(ValueError, match="boom"), tracer.span("tags.decode", "tags"):
+        raise ValueError("boom")  # noqa: EM101
+    tracer.close()
+
+    events = json.loads(path.read_text())
+    spans = [event for event in events if event["ph"] == "X"]
+    assert [span["name"] for span in spans] == ["conversations.request", "tags.sync", "tags.decode"]
+    assert spans[0]["args"] == {"endpoint": "/conversations/search", "status_code": 200}
+    assert spans[2]["args"] == {"error": "ValueError"}
+    assert spans[0]["tid"] != spans[1]["tid"]
+    assert [event["args"]["name"] for event in events if event["ph"] == "M"] == ["MainThread", "stream_0"]
+
+
+def test_stream_traces_requests_and_decoding(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Requests are traced with their endpoint template, status and size, decoding with its record count."""
+    path = tmp_path / "trace.json"
+    tap = TapIntercom(config={"access_token": "token", "trace_file": str(path)})
+    tags = t.cast("TagsStream", tap.streams["tags"])
+
+    def send(prepared_request: requests.PreparedRequest, context: dict | None) -> requests.Response:  # noqa: ARG001
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"data": [{"id": "1"}, {"id": "2"}]}'  # noqa: SLF001
+        return response
+
+    monkeypatch.setattr(tags, "_send_through_breaker", send)
+    assert len(list(tags.request_records(None))) == 2
+    assert tap.tracer is not None
+    tap.tracer.close()
+
+    spans = {event["name"]: event["args"] for event in json.loads(path.read_text()) if event["ph"] == "X"}
+    assert spans["tags.request"] == {"endpoint": "/tags", "method": "GET", "status_code": 200, "bytes": 36}
+    assert spans["tags.decode"] == {"bytes": 36, "records": 2}
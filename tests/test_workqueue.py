@@ -0,0 +1,115 @@
+"""Tests for the work queue distributing conversation part fetches."""
+
+from __future__ import annotations
+
+import time
+import typing as t
+
+from tap_intercom.tap import TapIntercom
+from tap_intercom.workqueue import PRODUCER_TIMEOUT_SECONDS, WorkQueue
+
+if t.TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+    from tap_intercom.streams import ConversationsStream
+
+
+def test_expired_leases_are_claimed_again(tmp_path: Path) -> None:
+    """A crashed worker's contexts go to another worker once their lease expires."""
+    crashed = WorkQueue(tmp_path / "queue.db", lease_seconds=0.05, worker_id="crashed")
+    for i in range(3):
+        crashed.put({"conversation_id": str(i)})
+    crashed.flush()
+    assert len(crashed.claim(2)) == 2
+
+    worker = WorkQueue(tmp_path / "queue.db", worker_id="worker")
+    assert worker.claim() == [{"conversation_id": "2"}]
+    time.sleep(0.1)
+    reclaimed = worker.claim()
+    assert reclaimed == [{"conversation_id": "0"}, {"conversation_id": "1"}]
+
+    worker.ack([*reclaimed, {"conversation_id": "2"}])
+    crashed.ack([{"conversation_id": "0"}])
+    assert worker.counts() == {"pending": 0, "leased": 0, "done": 3}
+
+    worker.put({"conversation_id": "1"})
+    worker.flush()
+    assert worker.counts() == {"pending": 1, "leased": 0, "done": 2}
+
+
+def test_producer_queues_child_contexts(tmp_path: Path) -> None:
+    """The producer queues conversations instead of syncing their parts."""
+    tap = TapIntercom(
+        config={"access_token": "token", "work_queue": {"path": str(tmp_path / "queue.db"), "role": "producer"}},
+    )
+    conversations = t.cast("ConversationsStream", tap.streams["conversations"])
+
+    assert list(conversations.generate_child_contexts({"id": "1"}, None)) == []
+    conversations.work_queue.flush()
+    assert conversations.work_queue.claim() == [{"conversation_id": "1"}]
+
+
+def test_producer_does_not_prefetch_children(tmp_path: Path) -> None:
+    """Parts are fetched by the workers, the producer does not fetch them ahead."""
+    tap = TapIntercom(
+        config={
+            "access_token": "token",
+            "max_concurrent_requests": 4,
+            "work_queue": {"path": str(tmp_path / "queue.db"), "role": "producer"},
+        },
+    )
+
+    assert t.cast("ConversationsStream", tap.streams["conversations"]).prefetched_children == []
+
+
+def test_producer_heartbeat_expires(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Workers stop waiting on a producer that was killed without recording it stopped."""
+    producer = WorkQueue(tmp_path / "queue.db", heartbeat_seconds=0.01)
+    worker = WorkQueue(tmp_path / "queue.db")
+    started = time.time()
+    producer.set_producing(producing=True)
+    time.sleep(0.1)
+
+    # Kill the producer: its heartbeat stops without recording that it stopped producing.
+    heartbeat = producer._heartbeat  # noqa: SLF001
+    assert heartbeat is not None
+    stop, thread = heartbeat
+    stop.set()
+    thread.join()
+
+    # The heartbeat was renewed after the producer started.
+    monkeypatch.setattr(time, "time", lambda: started + PRODUCER_TIMEOUT_SECONDS + 0.05)
+    assert worker.producing
+
+    monkeypatch.setattr(time, "time", lambda: started + 2 * PRODUCER_TIMEOUT_SECONDS)
+    assert not worker.producing
+
+
+def test_worker_syncs_and_acks_queued_conversations(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Workers sync the children of every queued conversation, then drain the queue."""
+    path = tmp_path / "queue.db"
+    producer = WorkQueue(path)
+    for i in range(25):
+        producer.put({"conversation_id": str(i)})
+    producer.flush()
+
+    tap = TapIntercom(config={"access_token": "token", "work_queue": {"path": str(path), "role": "worker"}})
+    conversations = t.cast("ConversationsStream", tap.streams["conversations"])
+    synced: list[dict] = []
+    monkeypatch.setattr(conversations, "_sync_children", synced.append)
+    conversations.sync()
+
+    assert sorted(int(context["conversation_id"]) for context in synced) == list(range(25))
+    assert producer.counts() == {"pending": 0, "leased": 0, "done": 25}
+
+
+def test_queue_does_not_use_wal(tmp_path: Path) -> None:
+    """WAL needs shared memory, so processes on other hosts could not share the queue."""
+    queue = WorkQueue(tmp_path / "queue.db")
+    queue.put({"conversation_id": "1"})
+    queue.flush()
+
+    assert queue._connection.execute("PRAGMA journal_mode").fetchone() == ("delete",)  # noqa: SLF001
+    assert not (tmp_path / "queue.db-wal").exists()
@@ -0,0 +1,65 @@
+"""Tests for extracting several workspaces in one run."""
+
+from __future__ import annotations
+
+import typing as t
+
+import pytest
+from singer_sdk.exceptions import ConfigValidationError
+
+from tap_intercom.tap import TapIntercom
+
+if t.TYPE_CHECKING:
+    from tap_intercom.streams import ContactsStream
+
+WORKSPACES = [
+    {"workspace_id": "eu", "access_token": "eu-token", "api_url": "https://api.eu.intercom.io"},
+    {
+        "workspace_id": "us",
+        "access_token": "us-token",
+        "filters": {"contacts": [{"field": "role", "operator": "=", "value": "user"}]},
+    },
+]
+
+
+def test_streams_are_partitioned_by_workspace() -> None:
+    """Top-level streams get one partition per workspace and `workspace_id` in keys and schema."""
+    tap = TapIntercom(config={"workspaces": WORKSPACES})
+    contacts = t.cast("ContactsStream", tap.streams["contacts"])
+
+    assert contacts.partitions == [{"workspace_id": "eu"}, {"workspace_id": "us"}]
+    assert tap.streams["conversation_parts"].partitions is None
+    assert contacts.primary_keys == ["workspace_id", "id"]
+    assert "workspace_id" in tap.streams["tags"].schema["properties"]
+    assert "workspace_id" not in TapIntercom(config={"access_token": "token"}).streams["tags"].schema["properties"]
+
+
+def test_requests_use_workspace_credentials() -> None:
+    """Requests go to the workspace's API URL, with its token and filters."""
+    contacts = t.cast("ContactsStream", TapIntercom(config={"workspaces": WORKSPACES}).streams["contacts"])
+
+    eu = contacts.prepare_request({"workspace_id": "eu"}, None)
+    us = contacts.prepare_request({"workspace_id": "us"}, None)
+
+    assert eu.url == "https://api.eu.intercom.io/contacts/search"
+    assert eu.headers["Authorization"] == "Bearer eu-token"
+    assert us.url == "https://api.intercom.io/contacts/search"
+    assert us.headers["Authorization"] == "Bearer us-token"
+    body = contacts.prepare_request_payload({"workspace_id": "us"}, None)
+    assert body is not None
+    assert {"field": "role", "operator": "=", "value": "user"} in body["query"]["value"]
+
+
+def test_child_contexts_carry_workspace() -> None:
+    """Child streams are synced in the workspace of their parent record."""
+    conversations = TapIntercom(config={"workspaces": WORKSPACES}).streams["conversations"]
+
+    contexts = list(conversations.generate_child_contexts({"id": "1"}, {"workspace_id": "eu"}))
+
+    assert contexts == [{"conversation_id": "1", "workspace_id": "eu"}]
+
+
+def test_credentials_are_required() -> None:
+    """Either a top-level token or workspaces must be configured."""
+    with pytest.raises(ConfigValidationError):
+        TapIntercom(config={})
@@ -0,0 +1,43 @@
+"""Tests for the buffered Singer message writer."""
+
+from __future__ import annotations
+
+import datetime as dt
+import decimal
+import json
+import typing as t
+
+from singer_sdk.singerlib import RecordMessage, StateMessage
+
+from tap_intercom.writer import IntercomSingerWriter
+
+if t.TYPE_CHECKING:
+    import pytest
+
+
+def test_records_are_buffered_until_state(capsysbinary: pytest.CaptureFixture[bytes]) -> None:
+    """Records stay buffered until a STATE message and encode like the SDK messages."""
+    writer = IntercomSingerWriter()
+    extracted = dt.datetime(2025, 1, 1, tzinfo=dt.timezone.utc)
+    record = RecordMessage(
+        stream="conversations",
+        record={"id": "1", "score": decimal.Decimal("0.1"), "title": "café"},
+        version=3,
+        time_extracted=extracted,
+    )
+
+    writer.write_message(record)
+    assert capsysbinary.readouterr().out == b""
+
+    writer.write_message(StateMessage(value={"bookmarks": {}}))
+    lines = capsysbinary.readouterr().out.splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0], parse_float=decimal.Decimal) == {
+        "type": "RECORD",
+        "stream": "conversations",
+        "version": 3,
+        "record": {"id": "1", "score": decimal.Decimal("0.1"), "title": "café"},
+        "time_extracted": "2025-01-01T00:00:00+00:00",
+    }
+    assert json.loads(lines[1]) == {"type": "STATE", "value": {"bookmarks": {}}}